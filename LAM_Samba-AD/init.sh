@@ -935,8 +935,8 @@ validateLAMConfiguration () {
 	else
 		echo "✓ Application config exists (config.cfg)"
 		
-		# Validate JSON syntax
-		if ! python3 -m json.tool /var/www/html/lam/config/config.cfg > /dev/null 2>&1; then
+		# Validate JSON syntax (jq starts in milliseconds; no Python on the boot path)
+		if ! jq empty /var/www/html/lam/config/config.cfg > /dev/null 2>&1; then
 			echo "ERROR: Application config has invalid JSON syntax"
 			((config_errors++))
 		else
@@ -974,14 +974,29 @@ validateLAMConfiguration () {
 	else
 		echo "✓ Server profile exists (${clean_profile_name}.conf)"
 		
-		# Validate JSON syntax  
-		if ! python3 -m json.tool "$profile_file" > /dev/null 2>&1; then
+		# Validate JSON syntax
+		if ! jq empty "$profile_file" > /dev/null 2>&1; then
 			echo "ERROR: Server profile has invalid JSON syntax"
 			((config_errors++))
 		else
 			echo "✓ Server profile has valid JSON syntax"
 		fi
 		
+		# Schema validation results, if a watch_lam_config.py watcher keeps a status file
+		# (--status-file); read with jq so boot never waits for Python to start
+		local status_file="${LAM_VALIDATION_STATUS:-/run/lam-validate.json}"
+		local profile_status
+		if [[ -f "$status_file" ]] && \
+		   profile_status=$(jq -er --arg name "${clean_profile_name}.conf" '.files[$name].exit_status' "$status_file" 2>/dev/null); then
+			if [[ "$profile_status" == "0" ]]; then
+				echo "✓ Server profile passes schema validation (watcher status)"
+			else
+				echo "ERROR: Server profile fails schema validation (watcher status):"
+				jq -r --arg name "${clean_profile_name}.conf" '.files[$name].errors[]' "$status_file" | sed 's/^/  /'
+				((config_errors++))
+			fi
+		fi
+		
 		# Check required fields in server profile
 		local required_fields=("ServerURL" "treesuffix" "Passwd" "activeTypes" "typeSettings")
 		for field in "${required_fields[@]}"; do
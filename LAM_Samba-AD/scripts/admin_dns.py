@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Resolve the LAM Admins DNs against the directory before a typo locks everyone out
+All DNs of a run are looked up in batched OR searches and cached with a TTL
+"""
+
+import hashlib
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from directory_stats import DirectoryStatsCache
+from ldap_session import canonical_dn, escape_filter_value, parse_dn
+from validation_results import error, json_pointer, warning
+
+ADMIN_CACHE_FILE = "docs/reference/.cache/admin-dns.json"
+DEFAULT_TTL = 900
+
+# distinguishedName terms per OR filter; keeps requests well under AD's MaxQueryDuration
+BATCH_SIZE = 100
+
+# userAccountControl ACCOUNTDISABLE flag
+ACCOUNT_DISABLED = 0x2
+
+def split_unescaped(text: str, separator: str) -> List[str]:
+    """Split on separator characters that are not escaped with a backslash"""
+    parts = []
+    current = []
+    escaped = False
+    for char in text:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == separator:
+            parts.append(''.join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append(''.join(current))
+    return parts
+
+def split_admins(admins) -> List[str]:
+    """Split the Admins string on ';' separators that are not escaped ('\\;')"""
+    if not isinstance(admins, str):
+        return []
+    return [dn.strip() for dn in split_unescaped(admins, ';') if dn.strip()]
+
+def _domain_base(dn: str) -> str:
+    """The trailing DC= components of a canonical DN, used as the search base"""
+    rdns = parse_dn(dn)
+    tail = []
+    for rdn in reversed(rdns):
+        if len(rdn) != 1 or rdn[0][0].lower() != "dc":
+            break
+        tail.append(f"dc={rdn[0][1]}")
+    return ','.join(reversed(tail))
+
+class AdminDNResolver:
+    """Looks up admin DNs over one session, answering repeats from the TTL cache
+
+    Results are keyed by the canonical DN, so every spelling of the same DN
+    across a fleet of profiles costs at most one lookup per ttl.
+    """
+
+    def __init__(self, session, cache: Optional[DirectoryStatsCache] = None,
+                 batch_size: int = BATCH_SIZE):
+        self.session = session
+        self.cache = cache if cache is not None else DirectoryStatsCache(None, DEFAULT_TTL)
+        self.batch_size = batch_size
+        self.lookups = 0  # LDAP searches sent, for reporting
+
+    def _key(self, dn: str) -> str:
+        return hashlib.sha256(f"{self.session.url}\n{dn}".encode('utf-8')).hexdigest()[:16]
+
+    def resolve(self, dns: Iterable[str]) -> Dict[str, Dict]:
+        """Map each canonical DN to {"found", "disabled"}; malformed DNs are skipped"""
+        results: Dict[str, Dict] = {}
+        missing: Dict[str, List[str]] = {}  # search base -> uncached canonical DNs
+        for dn in dns:
+            try:
+                canonical = canonical_dn(dn)
+            except ValueError:
+                continue
+            if canonical in results:
+                continue
+            cached = self.cache.get(self._key(canonical))
+            if cached:
+                results[canonical] = cached
+            else:
+                results[canonical] = None
+                missing.setdefault(_domain_base(canonical), []).append(canonical)
+
+        fetched = {}
+        now = time.time()
+        for base, pending in missing.items():
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                found = self._search(base, batch)
+                for canonical in batch:
+                    entry = found.get(canonical, {"found": False, "disabled": False})
+                    entry = dict(entry, dn=canonical, collected_at=now)
+                    results[canonical] = entry
+                    fetched[self._key(canonical)] = entry
+        if fetched:
+            self.cache.update(fetched)
+        return results
+
+    def _search(self, base: str, batch: List[str]) -> Dict[str, Dict]:
+        """One OR search on distinguishedName for a batch of canonical DNs"""
+        terms = ''.join(f"(distinguishedName={escape_filter_value(dn)})" for dn in batch)
+        search_filter = terms if len(batch) == 1 else f"(|{terms})"
+        self.lookups += 1
+        found = {}
+        for dn, attrs in self.session.search(base, search_filter,
+                                             ["distinguishedName", "userAccountControl"],
+                                             scope="sub", page_size=len(batch)):
+            try:
+                canonical = canonical_dn(dn)
+            except ValueError:
+                continue
+            flags = next((v for k, v in attrs.items() if k.lower() == "useraccountcontrol"), [])
+            control = int(flags[0]) if flags and str(flags[0]).isdigit() else 0
+            found[canonical] = {"found": True, "disabled": bool(control & ACCOUNT_DISABLED)}
+        return found
+
+def admin_dn_findings(admins, resolutions: Dict[str, Dict]) -> Tuple[List[str], List[str]]:
+    """Errors for malformed or unknown admin DNs, warnings for duplicates and disabled accounts"""
+    errors = []
+    warnings = []
+    pointer = json_pointer("Admins")
+    seen: Dict[str, str] = {}
+    usable = 0
+
+    dns = split_admins(admins)
+    for dn in dns:
+        try:
+            canonical = canonical_dn(dn)
+        except ValueError as e:
+            errors.append(error("login.admin_dn_syntax", pointer,
+                f"❌ Admins entry is not a valid DN: {dn}\n"
+                f"   {e}",
+                fix="Escape ',', '+', ';' and '\\' inside RDN values (RFC 4514)"
+            ))
+            continue
+        if canonical in seen:
+            warnings.append(warning("login.admin_duplicate", pointer,
+                f"⚠️  Admins lists the same DN twice: {dn}\n"
+                f"   Same entry as: {seen[canonical]}",
+                fix=f"Remove the duplicate {dn}"
+            ))
+            continue
+        seen[canonical] = dn
+
+        resolution = resolutions.get(canonical)
+        if resolution is None:
+            continue  # Not looked up (no directory session)
+        if not resolution["found"]:
+            errors.append(error("login.admin_not_found", pointer,
+                f"❌ Admins DN does not exist in the directory: {dn}\n"
+                f"   LAM will reject logins for this entry",
+                fix="Correct the DN (copy distinguishedName from the user object)"
+            ))
+        elif resolution["disabled"]:
+            warnings.append(warning("login.admin_disabled", pointer,
+                f"⚠️  Admins DN belongs to a disabled account: {dn}",
+                fix="Enable the account or remove it from Admins"
+            ))
+        else:
+            usable += 1
+
+    looked_up = [c for c in seen if resolutions.get(c) is not None]
+    if looked_up and not usable:
+        errors.append(error("login.admins_unresolved", pointer,
+            f"❌ None of the {len(dns)} Admins DN(s) is an enabled account\n"
+            f"   Nobody will be able to log in to LAM with this profile",
+            fix="Add at least one existing, enabled admin DN"
+        ))
+    return errors, warnings
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Benchmark the extraction and validation pipeline on synthetic inputs
+Runs offline (no containers), records throughput and peak memory, and compares to a baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from extract_lam_schema import extract_lam_config_constants, extract_module_schema
+from extract_samba_schema import get_default_user_attributes
+from ldif_reader import Entry, iter_ldif_entries
+from schema_binary import write_binary_schema
+from schema_index import SchemaIndex, load_schema_index
+from validate_lam_config import (run_batch, validate_attributes, validate_login_config,
+                                 validate_module_settings, validate_structure)
+
+BASELINE_FILE = "docs/reference/benchmark-baseline.json"
+DEFAULT_THRESHOLD = 0.25
+# Differences below these are timer/allocator noise on tiny cases, never regressions
+MIN_DELTA = {"seconds": 0.001, "peak_memory_kb": 64}
+
+# Input sizes per scale: (LAM options, LAM modules, LDIF users, profile batch)
+SCALES = {
+    "small": {"options": [50, 500], "modules": [20], "users": [1000, 10000], "profiles": [10, 100]},
+    "medium": {"options": [50, 500, 5000], "modules": [20, 200], "users": [1000, 10000, 100000],
+               "profiles": [10, 100, 1000]},
+    "large": {"options": [50, 500, 5000], "modules": [20, 200, 500],
+              "users": [1000, 10000, 100000, 1000000], "profiles": [10, 100, 1000]},
+}
+
+USER_ATTRIBUTES = ["givenName", "sn", "mail", "displayName", "description", "telephoneNumber",
+                   "department", "title", "employeeID", "physicalDeliveryOfficeName"]
+
+# -- Synthetic inputs ------------------------------------------------------
+
+def generate_lam_source(root: Path, options: int, modules: int):
+    """lib/config.inc with N profile options plus a lib/modules tree of M modules"""
+    lib = root / "lib"
+    (lib / "modules").mkdir(parents=True, exist_ok=True)
+    (lib / "types").mkdir(parents=True, exist_ok=True)
+
+    lines = ["<?php", "/** Synthetic LAM configuration */", "class LAMConfig {",
+             "\tconst LOGIN_LIST = 'list';", "\tconst LOGIN_SEARCH = 'search';",
+             "\tconst ACCESS_ALL = 100;", "\tconst ACCESS_PASSWORD_CHANGE = 200;",
+             "\tconst ACCESS_READ_ONLY = 0;"]
+    for i in range(options):
+        if i % 3 == 0:
+            lines.append(f"\t/** Option {i}; with a ; in the comment */\n\tpublic $option{i} = 'value{i};x';")
+        elif i % 3 == 1:
+            lines.append(f"\tpublic $option{i} = array(\n\t\t'key' => {i},\n\t\t'list' => ['a', 'b']\n\t);")
+        else:
+            lines.append(f"\tpublic $option{i};")
+        if i % 10 == 0:
+            lines.append(f"\tpublic function validate_option{i}($value) {{\n"
+                         f"\t\tif ($value == '}}') {{ return false; }}\n\t\treturn true;\n\t}}")
+    lines.append("}")
+    (lib / "config.inc").write_text("\n".join(lines) + "\n")
+    (lib / "types.inc").write_text("<?php\n$attrs = array('cn', 'mail', 'description');\n")
+
+    (lib / "types" / "user.inc").write_text(
+        "<?php\nclass user extends baseType {\n"
+        "\tpublic function getListAttributeDescriptions(): array {\n"
+        "\t\treturn array('cn' => _('Name'), 'mail' => _('Email'));\n\t}\n}\n"
+    )
+    for m in range(modules):
+        name = f"module{m}"
+        attrs = ", ".join(f"'attr{m}_{a}'" for a in range(20))
+        options_php = "\n".join(
+            f"\t\t$row->add(new htmlResponsiveInputCheckbox('{name}_hide{a}', false, _('Hide'), null, true), 12);"
+            for a in range(10)
+        )
+        (lib / "modules" / f"{name}.inc").write_text(
+            f"<?php\nclass {name} extends baseModule {{\n"
+            f"\tpublic function can_manage() {{\n\t\treturn in_array($this->get_scope(), array('user'));\n\t}}\n"
+            f"\tpublic function get_metaData() {{\n\t\t$return = array();\n"
+            f"\t\t$return['attributes'] = array({attrs});\n\t\treturn $return;\n\t}}\n"
+            f"\tpublic function get_configOptions($scopes, $allScopes) {{\n\t\t$row = new htmlResponsiveRow();\n"
+            f"{options_php}\n\t\treturn $row;\n\t}}\n"
+            + "".join(f"\tpublic function helper{h}() {{ return '{{' . {h}; }}\n" for h in range(30))
+            + "}\n"
+        )
+
+def generate_user_ldif(path: Path, users: int):
+    """LDIF dump of N users, written in a stream; attribute fill varies per user"""
+    with open(path, 'w') as f:
+        for i in range(users):
+            f.write(f"dn: CN=User {i},CN=Users,DC=bench,DC=internal\n"
+                    f"objectClass: top\nobjectClass: person\nobjectClass: user\n"
+                    f"cn: User {i}\nsAMAccountName: user{i}\n")
+            for n, attr in enumerate(USER_ATTRIBUTES):
+                if (i + n) % (n + 1) == 0:
+                    f.write(f"{attr}: {attr} of user {i}\n")
+            if i % 50 == 0:
+                f.write("description:: QmluYXJ5IHZhbHVl\n")
+            f.write("\n")
+
+def generate_profile(index_no: int) -> Dict[str, Any]:
+    return {
+        "ServerURL": "ldaps://dc.bench.internal:636",
+        "Admins": "CN=Administrator,CN=Users,DC=bench,DC=internal",
+        "loginMethod": "list",
+        "accessLevel": 100,
+        "treesuffix": "DC=bench,DC=internal",
+        "typeSettings": {
+            "suffix_user": "CN=Users,DC=bench,DC=internal",
+            "attr_user": "#sAMAccountName;#givenName;#sn;#mail" + (";#employeeNumber" if index_no % 7 == 0 else ""),
+            "modules_user": "windowsUser,inetOrgPerson",
+            "suffix_group": "CN=Users,DC=bench,DC=internal",
+            "attr_group": "#cn;#description;#member",
+            "modules_group": "windowsGroup"
+        },
+        "moduleSettings": {
+            **{f"module{m}_hide{a}": ["false"] for m in range(5) for a in range(10)},
+            "module1_unknown": ["x"],
+        }
+    }
+
+def synthetic_samba_schema() -> Dict[str, Any]:
+    safe_user = ["sAMAccountName", "cn", "givenName", "sn", "displayName", "mail", "description"]
+    return {
+        "all_attributes": safe_user + USER_ATTRIBUTES + [f"attr{i}" for i in range(1500)],
+        "safe_attr_user": safe_user,
+        "safe_attr_group": ["cn", "description", "member", "sAMAccountName"],
+        "warnings": {"employeeNumber": "Not in default Samba AD schema, may cause errors"},
+    }
+
+class LDIFStreamSession:
+    """Streams an LDIF file per search, like the docker exec pipe does"""
+
+    def __init__(self, ldif_file: Path):
+        self.url = f"ldif-stream://{ldif_file}"
+        self.ldif_file = ldif_file
+
+    def search(self, base: str, search_filter: str, attributes: List[str],
+               scope: str = "sub", page_size: int = 1000) -> Iterator[Entry]:
+        with open(self.ldif_file, 'r', encoding='utf-8') as f:
+            yield from iter_ldif_entries(f)
+
+# -- Measurement -----------------------------------------------------------
+
+def measure(fn: Callable[[], Any], items: int, repeat: int) -> Dict[str, float]:
+    """Best-of-N wall time, then one traced run for peak Python memory"""
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    best = min(timings)
+    return {
+        "seconds": best,
+        "items": items,
+        "items_per_second": items / best if best > 0 else 0.0,
+        "peak_memory_kb": peak / 1024,
+    }
+
+def build_cases(work_dir: Path, scale: Dict[str, List[int]]) -> List[Tuple[str, Callable, int]]:
+    """(case name, zero-argument callable, items processed) for every benchmark"""
+    cases = []
+
+    for options in scale["options"]:
+        root = work_dir / f"lam-{options}-opts"
+        if not (root / "lib" / "config.inc").exists():
+            generate_lam_source(root, options, 0)
+        cases.append((f"extract_lam_config_constants[{options} options]",
+                      lambda root=root: extract_lam_config_constants(root), options))
+
+    for modules in scale["modules"]:
+        root = work_dir / f"lam-{modules}-modules"
+        if not (root / "lib" / "modules").exists():
+            generate_lam_source(root, 10, modules)
+        cases.append((f"extract_module_schema[{modules} modules]",
+                      lambda root=root: extract_module_schema(root, jobs=1), modules))
+
+    for users in scale["users"]:
+        ldif_file = work_dir / f"users-{users}.ldif"
+        if not ldif_file.exists():
+            generate_user_ldif(ldif_file, users)
+        session = LDIFStreamSession(ldif_file)
+        cases.append((f"get_default_user_attributes[{users} users]",
+                      lambda session=session: get_default_user_attributes(
+                          session=session, base_dn="DC=bench,DC=internal"), users))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        lam_schema = extract_lam_config_constants(work_dir / f"lam-{scale['options'][0]}-opts")
+        lam_schema.update(extract_module_schema(work_dir / f"lam-{scale['modules'][0]}-modules", jobs=1))
+    samba_schema = synthetic_samba_schema()
+    index = SchemaIndex(lam_schema, samba_schema)
+
+    # Schema load at boot: parsing the JSON vs mapping the binary form
+    lam_file = work_dir / "lam-config-schema.json"
+    samba_file = work_dir / "samba-schema.json"
+    full_schema = dict(samba_schema, attribute_metadata={
+        name: {"syntax": "2.5.5.12", "om_syntax": "64", "multi_valued": False}
+        for name in samba_schema["all_attributes"]
+    })
+    with open(lam_file, 'w') as f:
+        json.dump(lam_schema, f, indent=2)
+    with open(samba_file, 'w') as f:
+        json.dump(full_schema, f, indent=2)
+    write_binary_schema(full_schema, str(samba_file))
+    attributes = len(full_schema["all_attributes"])
+    for mode, use_binary in (("json", False), ("binary", True)):
+        cases.append((f"load_schema_index[{mode}, {attributes} attributes]",
+                      lambda use_binary=use_binary: load_schema_index(
+                          str(lam_file), str(samba_file), None, use_binary), attributes))
+    config = generate_profile(0)
+    calls = 1000
+    for name, check in (
+        ("validate_login_config", lambda: validate_login_config(config, {}, index)),
+        ("validate_structure", lambda: validate_structure(config)),
+        ("validate_attributes", lambda: validate_attributes(config, {}, index)),
+        ("validate_module_settings", lambda: validate_module_settings(config, index)),
+    ):
+        cases.append((f"{name}[x{calls}]",
+                      lambda check=check: [check() for _ in range(calls)], calls))
+
+    for profiles in scale["profiles"]:
+        profile_dir = work_dir / f"profiles-{profiles}"
+        if not profile_dir.exists():
+            profile_dir.mkdir()
+            for i in range(profiles):
+                with open(profile_dir / f"profile{i}.conf", 'w') as f:
+                    json.dump(generate_profile(i), f, indent=2)
+        paths = sorted(profile_dir.glob("*.conf"))
+        cases.append((f"run_batch[{profiles} profiles, 1 worker]",
+                      lambda paths=paths: run_batch(paths, index, 1), profiles))
+
+    return cases
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Regression messages for cases slower or bigger than baseline * (1 + threshold)"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric, label in (("seconds", "time"), ("peak_memory_kb", "peak memory")):
+            old, new = previous.get(metric, 0), result[metric]
+            if old > 0 and new > old * (1 + threshold) and new - old > MIN_DELTA[metric]:
+                regressions.append(f"{name}: {label} {new / old - 1:+.0%} "
+                                   f"({old:.4g} -> {new:.4g} {'s' if metric == 'seconds' else 'KB'})")
+    return regressions
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark LAM/Samba schema extraction and config validation offline"
+    )
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small",
+                        help="Input sizes (small: quick check, large: up to 1M LDIF users)")
+    parser.add_argument("--cases", default="",
+                        help="Only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is kept)")
+    parser.add_argument("--work-dir",
+                        help="Keep generated inputs here and reuse them (default: temporary directory)")
+    parser.add_argument("--baseline", default=BASELINE_FILE,
+                        help=f"Baseline JSON to compare against (default: {BASELINE_FILE})")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write this run's results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown/memory growth before failing (default: 0.25 = 25%%)")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    with contextlib.ExitStack() as stack:
+        if args.work_dir:
+            work_dir = Path(args.work_dir)
+            work_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            work_dir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="lam-bench-")))
+
+        print(f"Generating synthetic inputs ({args.scale}) in {work_dir}...")
+        cases = [c for c in build_cases(work_dir, SCALES[args.scale]) if args.cases in c[0]]
+
+        results: Dict[str, Dict] = {}
+        for name, fn, items in cases:
+            result = measure(fn, items, args.repeat)
+            results[name] = result
+            print(f"  • {name}: {result['seconds'] * 1000:.1f} ms, "
+                  f"{result['items_per_second']:,.0f} items/s, "
+                  f"peak {result['peak_memory_kb'] / 1024:.1f} MB")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "scale": args.scale,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baseline_file = Path(args.baseline)
+    if args.save_baseline:
+        baseline_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Saved baseline to {baseline_file}")
+        return
+
+    if not baseline_file.exists():
+        print(f"\n⚠️  No baseline at {baseline_file}; run with --save-baseline to create one")
+        return
+
+    with open(baseline_file, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get("machine") != report["machine"] or baseline.get("python") != report["python"]:
+        print(f"\n⚠️  Baseline was recorded on {baseline.get('machine')} / Python "
+              f"{baseline.get('python')}; timings may not be comparable")
+
+    regressions = compare(results, baseline.get("results", {}), args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for message in regressions:
+            print(f"   {message}")
+        sys.exit(1)
+    print(f"\n✓ No regressions beyond {args.threshold:.0%} against {baseline_file}")
+
+if __name__ == "__main__":
+    main()
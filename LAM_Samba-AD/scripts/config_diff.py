@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Diff two LAM profiles (or schema versions) and re-run only the checks whose inputs changed
+Fleet mode keeps per-check input fingerprints and findings, so re-validation scales with the change
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from schema_index import CACHE_DIR, load_schema_index, schema_hash
+from validate_lam_config import (LAM_SCHEMA_FILE, REGISTRY, SAMBA_SCHEMA_FILE, available_checks,
+                                 expand_config_paths, load_rule_dirs, validator_key)
+from validation_results import Finding, error, json_pointer
+
+FLEET_STATE_FILE = "docs/reference/.cache/fleet-state.json"
+STATE_VERSION = 1
+
+_MISSING = object()
+
+# -- Structural diff -------------------------------------------------------
+
+def diff_json(old: Any, new: Any, pointer: str = "") -> List[Dict[str, Any]]:
+    """Changes between two JSON documents as {pointer, change, old, new}
+
+    Objects are compared key by key; lists and scalars are compared as a whole.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in sorted(old.keys() | new.keys(), key=str):
+            child = pointer + json_pointer(key)
+            if key not in new:
+                changes.append({"pointer": child, "change": "removed", "old": old[key], "new": None})
+            elif key not in old:
+                changes.append({"pointer": child, "change": "added", "old": None, "new": new[key]})
+            else:
+                changes.extend(diff_json(old[key], new[key], child))
+        return changes
+    if old != new:
+        return [{"pointer": pointer, "change": "changed", "old": old, "new": new}]
+    return []
+
+def _touches(changed: str, watched: str, subtree: bool = True) -> bool:
+    """Does a change at pointer changed affect the input at pointer watched?"""
+    if changed == watched or watched.startswith(changed + "/") or changed == "":
+        return True  # The input itself, or an object containing it, changed
+    return subtree and changed.startswith(watched + "/")
+
+def affected_checks(config_changes: Iterable[str], lam_changes: Iterable[str] = (),
+                    samba_changes: Iterable[str] = ()) -> Dict[str, List[str]]:
+    """Check name -> the changed pointers that make it need a re-run"""
+    sources = {"config": list(config_changes), "lam_schema": list(lam_changes),
+               "samba_schema": list(samba_changes)}
+    affected: Dict[str, List[str]] = {}
+    for check, rule in REGISTRY.rules.items():
+        inputs = rule.inputs
+        reasons = []
+        for source, changed_pointers in sources.items():
+            prefix = "" if source == "config" else f"{source}:"
+            for changed in changed_pointers:
+                if any(_touches(changed, watched) for watched in inputs.get(source, [])) or (
+                        source == "config" and any(_touches(changed, watched, subtree=False)
+                                                   for watched in inputs.get("config_presence", []))):
+                    reasons.append(prefix + (changed or "/"))
+        if reasons:
+            affected[check] = reasons
+    return affected
+
+# -- Input fingerprints (fleet mode) ---------------------------------------
+
+def resolve_pointer(document: Any, pointer: str) -> Any:
+    """Value at an RFC 6901 pointer, or _MISSING"""
+    value = document
+    for part in pointer.split('/')[1:]:
+        part = part.replace('~1', '/').replace('~0', '~')
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+def _digest(values: List[Any]) -> str:
+    raw = json.dumps([None if v is _MISSING else ["v", v] for v in values], sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+def config_input_hashes(config: Dict) -> Dict[str, str]:
+    """Per check: hash of the config values it reads"""
+    hashes = {}
+    for check, rule in REGISTRY.rules.items():
+        values = [resolve_pointer(config, p) for p in rule.inputs.get("config", [])]
+        values += [resolve_pointer(config, p) is not _MISSING
+                   for p in rule.inputs.get("config_presence", [])]
+        hashes[check] = _digest(values)
+    return hashes
+
+def schema_input_hashes(lam_schema: Dict, samba_schema: Dict, engine_key: str = "") -> Dict[str, str]:
+    """Per check: hash of the schema sections it reads, the validator code (engine_key)
+    and, for site rules, the plugin source"""
+    schemas = {"lam_schema": lam_schema, "samba_schema": samba_schema}
+    return {
+        check: _digest([engine_key, rule.fingerprint()] + [resolve_pointer(schemas[source], p)
+                                               for source in ("lam_schema", "samba_schema")
+                                               for p in rule.inputs.get(source, [])])
+        for check, rule in REGISTRY.rules.items()
+    }
+
+def _read_json(path: str) -> Dict:
+    if not Path(path).exists():
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+# -- Finding comparison ----------------------------------------------------
+
+def _finding_key(finding: str) -> Tuple[str, str, str]:
+    return (getattr(finding, "check", ""), getattr(finding, "pointer", ""), str(finding))
+
+def compare_findings(old: List[str], new: List[str]) -> Tuple[List[str], List[str]]:
+    """(introduced, resolved) findings between two runs"""
+    old_keys = {_finding_key(f) for f in old}
+    new_keys = {_finding_key(f) for f in new}
+    return ([f for f in new if _finding_key(f) not in old_keys],
+            [f for f in old if _finding_key(f) not in new_keys])
+
+def run_checks(config: Dict, index, checks: Iterable[str]) -> Dict[str, Tuple[List[str], List[str]]]:
+    """(errors, warnings) per check, for the named checks the index supports"""
+    return REGISTRY.run_each(config, index, checks=checks)
+
+def _flatten(results: Dict[str, Tuple[List[str], List[str]]]) -> Tuple[List[str], List[str]]:
+    errors, warnings = [], []
+    for check_errors, check_warnings in results.values():
+        errors.extend(check_errors)
+        warnings.extend(check_warnings)
+    return errors, warnings
+
+def _print_findings(label: str, icon: str, findings: List[str]):
+    for finding in findings:
+        first, *rest = str(finding).split('\n')
+        print(f"  {icon} {label}: {first.lstrip('❌⚠️ ').strip()}")
+        for line in rest:
+            print(f"      {line.strip()}")
+
+# -- Pair mode -------------------------------------------------------------
+
+def _short(value: Any) -> str:
+    text = json.dumps(value)
+    return text if len(text) <= 60 else text[:57] + "..."
+
+def main_pair(args: argparse.Namespace):
+    for path in (args.old, args.new):
+        if not Path(path).exists():
+            print(f"❌ Config file not found: {path}")
+            sys.exit(2)
+    try:
+        old_config, new_config = _read_json(args.old), _read_json(args.new)
+    except json.JSONDecodeError as e:
+        print(f"❌ Invalid JSON: {e}")
+        sys.exit(2)
+
+    old_lam = args.old_lam_schema or args.lam_schema
+    old_samba = args.old_samba_schema or args.samba_schema
+    config_changes = diff_json(old_config, new_config)
+    lam_changes = diff_json(_read_json(old_lam), _read_json(args.lam_schema)) \
+        if old_lam != args.lam_schema else []
+    samba_changes = diff_json(_read_json(old_samba), _read_json(args.samba_schema)) \
+        if old_samba != args.samba_schema else []
+    affected = affected_checks([c["pointer"] for c in config_changes],
+                               [c["pointer"] for c in lam_changes],
+                               [c["pointer"] for c in samba_changes])
+
+    cache_dir = None if args.no_index_cache else CACHE_DIR
+    new_index = load_schema_index(args.lam_schema, args.samba_schema, cache_dir)
+    old_index = load_schema_index(old_lam, old_samba, cache_dir) \
+        if (old_lam, old_samba) != (args.lam_schema, args.samba_schema) else new_index
+    if new_index is None or old_index is None:
+        print("❌ No schemas found. Run extraction scripts first")
+        sys.exit(2)
+
+    started = time.perf_counter()
+    old_results = run_checks(old_config, old_index, affected)
+    new_results = run_checks(new_config, new_index, affected)
+    elapsed = time.perf_counter() - started
+    old_errors, old_warnings = _flatten(old_results)
+    new_errors, new_warnings = _flatten(new_results)
+    introduced_errors, resolved_errors = compare_findings(old_errors, new_errors)
+    introduced_warnings, resolved_warnings = compare_findings(old_warnings, new_warnings)
+
+    print(f"\n{'='*70}")
+    print(f"Config Diff: {args.old} -> {args.new}")
+    print(f"{'='*70}\n")
+    for label, changes in (("config", config_changes), ("LAM schema", lam_changes),
+                           ("Samba schema", samba_changes)):
+        if label != "config" and not changes:
+            continue
+        print(f"{label.capitalize() if label == 'config' else label} changes: {len(changes)}")
+        for change in changes[:args.max_changes]:
+            if change["change"] == "changed":
+                print(f"  ~ {change['pointer'] or '/'}: {_short(change['old'])} -> {_short(change['new'])}")
+            elif change["change"] == "added":
+                print(f"  + {change['pointer']}: {_short(change['new'])}")
+            else:
+                print(f"  - {change['pointer']}: {_short(change['old'])}")
+        if len(changes) > args.max_changes:
+            print(f"  ... {len(changes) - args.max_changes} more")
+        print()
+
+    all_checks = available_checks(new_index)
+    skipped = [name for name in all_checks if name not in affected]
+    print(f"Re-ran {len(new_results)} of {len(all_checks)} check(s) in {elapsed * 1000:.1f} ms")
+    for name in new_results:
+        print(f"  • {name}: {', '.join(affected[name][:5])}")
+    if skipped:
+        print(f"  • Skipped (inputs unchanged): {', '.join(skipped)}")
+    print()
+
+    if not any((introduced_errors, resolved_errors, introduced_warnings, resolved_warnings)):
+        print("✓ No new or resolved findings")
+    _print_findings("new error", "❌", introduced_errors)
+    _print_findings("new warning", "⚠️ ", introduced_warnings)
+    _print_findings("resolved error", "✓", resolved_errors)
+    _print_findings("resolved warning", "✓", resolved_warnings)
+    print(f"{'='*70}\n")
+    sys.exit(1 if introduced_errors else 0)
+
+# -- Fleet mode ------------------------------------------------------------
+
+def _encode(findings: Iterable[str]) -> List[List[str]]:
+    return [[str(f), getattr(f, "check", "unknown"), getattr(f, "severity", ""),
+             getattr(f, "pointer", ""), getattr(f, "fix", "")] for f in findings]
+
+def _decode(rows: List[List[str]]) -> List[Finding]:
+    return [Finding(*row) for row in rows]
+
+def load_state(path: Path) -> Dict:
+    try:
+        with open(path, 'r') as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return state
+    except (OSError, json.JSONDecodeError):
+        pass
+    return {"version": STATE_VERSION, "schema": {}, "files": {}}
+
+def save_state(path: Path, state: Dict):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_name(path.name + '.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(state, f)
+        tmp_file.replace(path)
+    except OSError as e:
+        print(f"⚠️  Could not write fleet state {path}: {e}", file=sys.stderr)
+
+def revalidate_file(path: Path, index, checks: List[str], previous: Optional[Dict],
+                    schema_hashes: Dict[str, str]) -> Tuple[Dict, List[str]]:
+    """New state record for one config and the checks that were re-run"""
+    record = {"stat": [0, 0], "inputs": {}, "findings": {}}
+    try:
+        stat = path.stat()
+        record["stat"] = [stat.st_mtime_ns, stat.st_size]
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except json.JSONDecodeError as e:
+        record["findings"]["file"] = _encode([error("file.json", "", f"❌ Invalid JSON in config file: {e}")])
+        return record, ["file"]
+    except (OSError, UnicodeDecodeError) as e:
+        record["findings"]["file"] = _encode([error("file.read", "", f"❌ Cannot read config file: {e}")])
+        return record, ["file"]
+
+    old_inputs = previous.get("inputs", {}) if previous else {}
+    old_findings = previous.get("findings", {}) if previous else {}
+    config_hashes = config_input_hashes(config)
+    rerun = []
+    for check in checks:
+        key = f"{config_hashes[check]}:{schema_hashes[check]}"
+        record["inputs"][check] = key
+        if old_inputs.get(check) == key and check in old_findings:
+            record["findings"][check] = old_findings[check]
+        else:
+            rerun.append(check)
+    for check, (errors, warnings) in run_checks(config, index, rerun).items():
+        record["findings"][check] = _encode(errors + warnings)
+    return record, rerun
+
+def main_fleet(args: argparse.Namespace):
+    paths = expand_config_paths(args.fleet)
+    if not paths:
+        print(f"❌ No config files matched: {' '.join(args.fleet)}")
+        sys.exit(2)
+    state_file = Path(args.state)
+    state = load_state(state_file)
+
+    started = time.perf_counter()
+    # A new or edited site rule, or an upgraded validator, changes the per-check
+    # schema fingerprints too, so every check's cached findings are re-run
+    engine_key = validator_key()
+    files_hash = f"{schema_hash(args.lam_schema, args.samba_schema)}:{REGISTRY.fingerprint()}:{engine_key}"
+    schema_state = state["schema"]
+    if schema_state.get("files_hash") != files_hash:
+        schema_state["files_hash"] = files_hash
+        schema_state["inputs"] = schema_input_hashes(_read_json(args.lam_schema),
+                                                     _read_json(args.samba_schema), engine_key)
+    schema_hashes = schema_state["inputs"]
+    index = load_schema_index(args.lam_schema, args.samba_schema,
+                              None if args.no_index_cache else CACHE_DIR)
+    if index is None:
+        print("❌ No schemas found. Run extraction scripts first")
+        sys.exit(2)
+    checks = available_checks(index)
+
+    files = {}
+    unchanged = rechecked = checks_run = 0
+    failed = []
+    print(f"\n{'='*70}")
+    print("Fleet Re-validation")
+    print(f"{'='*70}\n")
+    for path in paths:
+        name = str(path)
+        previous = state["files"].get(name)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        fresh = previous and previous["stat"] == [stat.st_mtime_ns, stat.st_size] and all(
+            previous["inputs"].get(c, "").endswith(":" + schema_hashes[c]) for c in checks)
+        if fresh:
+            record, rerun = previous, []
+            unchanged += 1
+        else:
+            record, rerun = revalidate_file(path, index, checks, previous, schema_hashes)
+            rechecked += 1
+            checks_run += len(rerun)
+        files[name] = record
+
+        current = [f for rows in record["findings"].values() for f in _decode(rows)]
+        if any(f.severity == "error" for f in current):
+            failed.append(name)
+        if not rerun:
+            continue
+        before = [f for rows in (previous or {}).get("findings", {}).values() for f in _decode(rows)]
+        introduced, resolved = compare_findings(before, current)
+        if introduced or resolved or args.verbose:
+            print(f"• {name}: re-ran {', '.join(rerun)}")
+            _print_findings("new", "❌", [f for f in introduced if f.severity == "error"])
+            _print_findings("new", "⚠️ ", [f for f in introduced if f.severity != "error"])
+            _print_findings("resolved", "✓", resolved)
+
+    # Keep records of configs outside this run (another --fleet target); drop deleted ones
+    for name in sorted(n for n in state["files"] if n not in files and not Path(n).exists()):
+        print(f"• {name}: removed")
+    kept = {k: v for k, v in state["files"].items() if k not in files and Path(k).exists()}
+    state["files"] = {**kept, **files}
+    save_state(state_file, state)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n  • Configs: {len(files)} ({unchanged} unchanged, {rechecked} re-checked)")
+    print(f"  • Checks run: {checks_run} of {len(files) * len(checks)}")
+    print(f"  • Wall time: {elapsed:.3f}s")
+    if failed:
+        print(f"\n❌ {len(failed)} config(s) with errors: {', '.join(failed[:10])}"
+              + (f" (+{len(failed) - 10} more)" if len(failed) > 10 else ""))
+    else:
+        print("\n✅ No config has errors")
+    print(f"{'='*70}\n")
+    sys.exit(1 if failed else 0)
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Diff two LAM profiles or schema versions and re-run only the affected checks"
+    )
+    parser.add_argument("old", nargs="?", help="Old config (pair mode)")
+    parser.add_argument("new", nargs="?", help="New config (pair mode)")
+    parser.add_argument("--lam-schema", default=LAM_SCHEMA_FILE, help="(New) LAM schema")
+    parser.add_argument("--samba-schema", default=SAMBA_SCHEMA_FILE, help="(New) Samba schema")
+    parser.add_argument("--old-lam-schema", help="Old LAM schema to diff against (default: --lam-schema)")
+    parser.add_argument("--old-samba-schema", help="Old Samba schema to diff against "
+                                                   "(default: --samba-schema)")
+    parser.add_argument("--max-changes", type=int, default=20,
+                        help="Changes to list per document (default: 20)")
+    parser.add_argument("--no-index-cache", action="store_true",
+                        help="Rebuild the compiled schema index instead of using the on-disk cache")
+    parser.add_argument("--rules-dir", action="append", default=[], metavar="DIR",
+                        help="Load site rules from the *.py files in this directory (repeatable)")
+
+    fleet = parser.add_argument_group("fleet mode")
+    fleet.add_argument("--fleet", nargs="+", metavar="CONFIG",
+                       help="Config files, globs or directories to re-validate incrementally")
+    fleet.add_argument("--state", default=FLEET_STATE_FILE,
+                       help=f"Per-check fingerprints and findings (default: {FLEET_STATE_FILE})")
+    fleet.add_argument("-v", "--verbose", action="store_true",
+                       help="List every re-checked config, not only those whose findings changed")
+    args = parser.parse_args()
+    if not args.fleet and not (args.old and args.new):
+        parser.error("give OLD and NEW configs, or --fleet CONFIG...")
+    return args
+
+def main():
+    args = parse_args()
+    load_rule_dirs(args.rules_dir)
+    if args.fleet:
+        main_fleet(args)
+    else:
+        main_pair(args)
+
+if __name__ == "__main__":
+    main()
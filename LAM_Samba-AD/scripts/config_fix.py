@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Deterministic rewrites for the config problems validate_lam_config.py reports
+All fixes run in one pass per profile; files are replaced atomically with key order kept
+"""
+
+import difflib
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from schema_index import SchemaIndex
+from validate_lam_config import split_comma_admins
+
+Fix = Callable[[Dict, SchemaIndex], List[str]]
+
+# LAM's standard ports for plain LDAP and LDAPS
+LDAP_PORT = 389
+LDAPS_PORT = 636
+
+def _replace_key(config: Dict, old_keys: List[str], new_key: str, value: Any) -> Dict:
+    """Copy of config with old_keys dropped and new_key placed where the first of them was"""
+    result = {}
+    for key, current in config.items():
+        if key in old_keys:
+            if new_key not in result:
+                result[new_key] = value
+        elif key != new_key:
+            result[key] = current
+        elif new_key not in result:
+            result[new_key] = value
+    return result
+
+def fix_admins(config: Dict, index: SchemaIndex) -> List[str]:
+    """Admins as one ';'-separated string (from an array or comma-joined DNs)"""
+    admins = config.get("Admins")
+    if isinstance(admins, list):
+        config["Admins"] = ';'.join(str(dn).strip() for dn in admins if str(dn).strip())
+        return [f"Admins: joined {len(admins)} array entries with ';'"]
+    if isinstance(admins, str) and ';' not in admins and ',' in admins:
+        dns = split_comma_admins(admins)
+        if len(dns) > 1:
+            config["Admins"] = ';'.join(dns)
+            return [f"Admins: separated {len(dns)} DNs with ';' instead of ','"]
+    return []
+
+def _join_attributes(value: Any) -> str:
+    if isinstance(value, list):
+        return ';'.join(str(v) for v in value)
+    return str(value)
+
+def _join_modules(value: Any) -> str:
+    if isinstance(value, list):
+        return ','.join(str(v) for v in value)
+    return str(value)
+
+def fix_structure(config: Dict, index: SchemaIndex) -> List[str]:
+    """Move the pre-9.x 'types'/'modules' sections into typeSettings
+
+    types.<type>.suffix/attr/modules become suffix_<type>/attr_<type>/modules_<type>;
+    modules.<type> lists fill modules_<type> when types did not set it. Values
+    already in typeSettings win.
+    """
+    if "types" not in config and "modules" not in config:
+        return []
+    existing = config.get("typeSettings")
+    type_settings = dict(existing) if isinstance(existing, dict) else {}
+    added = []
+
+    def put(key: str, value: str):
+        if key not in type_settings:
+            type_settings[key] = value
+            added.append(key)
+
+    types = config.get("types")
+    if isinstance(types, dict):
+        for type_name, settings in types.items():
+            if not isinstance(settings, dict):
+                continue
+            if "suffix" in settings:
+                put(f"suffix_{type_name}", str(settings["suffix"]))
+            if "attr" in settings:
+                put(f"attr_{type_name}", _join_attributes(settings["attr"]))
+            if "modules" in settings:
+                put(f"modules_{type_name}", _join_modules(settings["modules"]))
+    modules = config.get("modules")
+    if isinstance(modules, dict):
+        for type_name, module_list in modules.items():
+            put(f"modules_{type_name}", _join_modules(module_list))
+
+    removed = [key for key in ("types", "modules") if key in config]
+    new_config = _replace_key(config, removed, "typeSettings", type_settings)
+    config.clear()
+    config.update(new_config)
+    return [f"typeSettings: moved {', '.join(removed)} into "
+            f"{', '.join(added) if added else 'typeSettings'}"]
+
+def fix_server_url(config: Dict, index: SchemaIndex) -> List[str]:
+    """ldap://host[:389] -> ldaps://host[:636]; other explicit ports are kept"""
+    server_url = config.get("ServerURL")
+    if not isinstance(server_url, str) or not server_url.lower().startswith("ldap://"):
+        return []
+    rest = server_url[len("ldap://"):]
+    rest = re.sub(rf':{LDAP_PORT}(?=$|/)', f':{LDAPS_PORT}', rest)
+    config["ServerURL"] = f"ldaps://{rest}"
+    return [f"ServerURL: {server_url} -> {config['ServerURL']}"]
+
+def _fix_attribute_list(setting: str, value: str, safe: frozenset, safe_lower: Dict[str, str],
+                        index: SchemaIndex, drop_problematic: bool) -> Tuple[str, List[str]]:
+    kept = []
+    changes = []
+    for entry in value.split(';'):
+        name = entry.lstrip('#')
+        if not name or not safe or name in safe:
+            kept.append(entry)
+            continue
+        prefix = entry[:len(entry) - len(name)]
+        spelling = safe_lower.get(name.lower()) or \
+            (None if index.attribute_warning(name) else index.canonical_attribute(name))
+        if spelling == name:
+            kept.append(entry)
+        elif spelling:
+            kept.append(prefix + spelling)
+            changes.append(f"{setting}: {name} -> {spelling}")
+        elif drop_problematic and index.attribute_warning(name):
+            changes.append(f"{setting}: removed {name} ({index.attribute_warning(name)})")
+        else:
+            kept.append(entry)
+    return ';'.join(kept), changes
+
+def fix_attributes(config: Dict, index: SchemaIndex) -> List[str]:
+    """Schema spelling for attr_user/attr_group columns; drop known-problem attr_user columns"""
+    type_settings = config.get("typeSettings")
+    if not isinstance(type_settings, dict) or not index.has_samba_schema:
+        return []
+    changes = []
+    for setting, safe, safe_lower, drop in (
+            ("attr_user", index.safe_attr_user, index.safe_attr_user_lower, True),
+            ("attr_group", index.safe_attr_group, index.safe_attr_group_lower, False)):
+        value = type_settings.get(setting)
+        if not isinstance(value, str) or not value:
+            continue
+        fixed, setting_changes = _fix_attribute_list(setting, value, safe, safe_lower, index, drop)
+        if fixed != value:
+            type_settings[setting] = fixed
+            changes.extend(setting_changes)
+    return changes
+
+def fix_module_settings(config: Dict, index: SchemaIndex) -> List[str]:
+    """moduleSettings values as arrays; nested pre-9.x objects flattened to <module>_<option>"""
+    module_settings = config.get("moduleSettings")
+    if not isinstance(module_settings, dict):
+        return []
+    fixed = {}
+    changes = []
+    for key, value in module_settings.items():
+        if isinstance(value, list):
+            fixed[key] = value
+        elif isinstance(value, dict):
+            for option, option_value in value.items():
+                flat = option_value if isinstance(option_value, list) else [str(option_value)]
+                fixed[f"{key}_{option}"] = flat
+            changes.append(f"moduleSettings: flattened {key} into {len(value)} key(s)")
+        else:
+            fixed[key] = [value if isinstance(value, str) else json.dumps(value)]
+            changes.append(f"moduleSettings: wrapped {key} in an array")
+    if changes:
+        config["moduleSettings"] = fixed
+    return changes
+
+# Applied in this order, each on the result of the previous one
+FIXES: Dict[str, Fix] = {
+    "structure": fix_structure,
+    "admins": fix_admins,
+    "server_url": fix_server_url,
+    "attributes": fix_attributes,
+    "module_settings": fix_module_settings,
+}
+
+def fix_config(config: Dict, index: SchemaIndex) -> Tuple[Dict, List[str]]:
+    """Apply every fix to a copy of config; returns (fixed config, change descriptions)"""
+    fixed = json.loads(json.dumps(config))
+    changes = []
+    for fix in FIXES.values():
+        changes.extend(fix(fixed, index))
+    return fixed, changes
+
+def _detect_indent(text: str):
+    """Indent of the first indented line: a tab, a number of spaces, or None (compact)"""
+    match = re.search(r'\n([ \t]+)\S', text)
+    if not match:
+        return None
+    indent = match.group(1)
+    return '\t' if indent.startswith('\t') else len(indent)
+
+def render_config(config: Dict, original_text: str) -> str:
+    """Serialize in the original file's indentation, with its trailing newline"""
+    text = json.dumps(config, indent=_detect_indent(original_text), ensure_ascii=False)
+    return text + "\n" if original_text.endswith("\n") else text
+
+def write_atomic(path: Path, text: str):
+    """Replace path via a temp file in the same directory, keeping mode and owner"""
+    stat = path.stat()
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_name, stat.st_mode & 0o7777)
+        try:
+            os.chown(tmp_name, stat.st_uid, stat.st_gid)
+        except (PermissionError, AttributeError):
+            pass  # Not root (or not POSIX); the file keeps the caller's owner
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+def fix_file(config_path: Path, index: SchemaIndex, dry_run: bool = False) -> Dict:
+    """Fix one profile; the record holds the changes, a unified diff and any error"""
+    record = {"path": str(config_path), "changes": [], "diff": "", "error": ""}
+    try:
+        original = config_path.read_text(encoding='utf-8')
+        config = json.loads(original)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        record["error"] = str(e)
+        return record
+    if not isinstance(config, dict):
+        record["error"] = "config is not a JSON object"
+        return record
+
+    fixed, changes = fix_config(config, index)
+    if not changes:
+        return record
+    text = render_config(fixed, original)
+    record["changes"] = changes
+    record["diff"] = ''.join(difflib.unified_diff(
+        original.splitlines(keepends=True), text.splitlines(keepends=True),
+        fromfile=f"a/{config_path}", tofile=f"b/{config_path}"
+    ))
+    if not dry_run:
+        try:
+            write_atomic(config_path, text)
+        except OSError as e:
+            record["error"] = f"write failed: {e}"
+    return record
+
+# The compiled index is handed to each pool worker once, not once per config
+_worker_index: Optional[SchemaIndex] = None
+
+def _init_worker(index: SchemaIndex):
+    global _worker_index
+    _worker_index = index
+
+def _fix_file_worker(task: Tuple[Path, bool]) -> Dict:
+    return fix_file(task[0], _worker_index, task[1])
+
+def fix_paths(paths: List[Path], index: SchemaIndex, jobs: int = 1,
+              dry_run: bool = False) -> List[Dict]:
+    """Fix many profiles, across a process pool when jobs > 1"""
+    if jobs <= 1 or len(paths) <= 1:
+        return [fix_file(path, index, dry_run) for path in paths]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(index,)) as pool:
+        return list(pool.map(_fix_file_worker, [(path, dry_run) for path in paths],
+                             chunksize=chunksize))
+
+def print_fix_report(records: List[Dict], dry_run: bool, stream=sys.stdout):
+    """Diffs (dry run) or applied changes per profile, then a one-line summary"""
+    changed = [r for r in records if r["changes"]]
+    for record in records:
+        if record["error"]:
+            print(f"❌ {record['path']}: {record['error']}", file=stream)
+        elif record["changes"] and dry_run:
+            stream.write(record["diff"])
+        elif record["changes"]:
+            print(f"🔧 {record['path']}", file=stream)
+            for change in record["changes"]:
+                print(f"   • {change}", file=stream)
+    verb = "would change" if dry_run else "fixed"
+    print(f"\n{verb.capitalize()}: {len(changed)} of {len(records)} config(s), "
+          f"{sum(len(r['changes']) for r in changed)} change(s)", file=stream)
@@ -0,0 +1,62 @@
+"""
+Shared fixtures for the tests next to the scripts: a small directory served by the ldif:// stand-in
+Run with: python -m pytest LAM_Samba-AD/scripts
+"""
+
+from pathlib import Path
+
+import pytest
+
+BASE_DN = "DC=example,DC=com"
+SCHEMA_DN = f"CN=Schema,CN=Configuration,{BASE_DN}"
+BIG_GROUP_MEMBERS = 3200  # Above two 1500-value ranges
+
+def _entry(dn: str, **attrs) -> str:
+    lines = [f"dn: {dn}"]
+    for name, values in attrs.items():
+        for value in values if isinstance(values, list) else [values]:
+            lines.append(f"{name}: {value}")
+    return '\n'.join(lines) + '\n\n'
+
+def directory_entries() -> str:
+    """Schema partition, ten users (mail on three), admins and one very large group"""
+    parts = [
+        _entry(f"CN=Mail,{SCHEMA_DN}", objectClass=["top", "attributeSchema"],
+               lDAPDisplayName="mail", attributeSyntax="2.5.5.12", oMSyntax="64",
+               isSingleValued="TRUE", uSNChanged="10"),
+        _entry(f"CN=Telephone-Number,{SCHEMA_DN}", objectClass=["top", "attributeSchema"],
+               lDAPDisplayName="telephoneNumber", attributeSyntax="2.5.5.12", oMSyntax="64",
+               isSingleValued="TRUE", uSNChanged="12"),
+        _entry(f"CN=User,{SCHEMA_DN}", objectClass=["top", "classSchema"],
+               lDAPDisplayName="user", subClassOf="organizationalPerson",
+               systemMayContain=["mail", "telephoneNumber"], uSNChanged="11"),
+    ]
+    for n in range(10):
+        attrs = {"objectClass": ["top", "person", "user"], "cn": f"user{n}",
+                 "sAMAccountName": f"user{n}"}
+        if n < 3:
+            attrs["mail"] = f"user{n}@example.com"
+        parts.append(_entry(f"CN=user{n},CN=Users,{BASE_DN}", **attrs))
+    parts.append(_entry(f"CN=Smith\\, John,CN=Users,{BASE_DN}",
+                        objectClass=["top", "person", "user"], cn="Smith, John",
+                        userAccountControl="512"))
+    parts.append(_entry(f"CN=Former Admin,CN=Users,{BASE_DN}",
+                        objectClass=["top", "person", "user"], cn="Former Admin",
+                        userAccountControl="514"))
+    parts.append(_entry(f"CN=Big Group,CN=Users,{BASE_DN}", objectClass=["top", "group"],
+                        cn="Big Group",
+                        member=[f"CN=member{n},CN=Users,{BASE_DN}" for n in range(BIG_GROUP_MEMBERS)]))
+    parts.append(_entry(f"CN=Small Group,CN=Users,{BASE_DN}", objectClass=["top", "group"],
+                        cn="Small Group", member=[f"CN=user0,CN=Users,{BASE_DN}"]))
+    return ''.join(parts)
+
+@pytest.fixture
+def directory_ldif(tmp_path: Path) -> Path:
+    path = tmp_path / "directory.ldif"
+    path.write_text(directory_entries(), encoding='utf-8')
+    return path
+
+@pytest.fixture
+def directory(directory_ldif: Path):
+    from ldap_session import LDIFDirectory
+    return LDIFDirectory(str(directory_ldif))
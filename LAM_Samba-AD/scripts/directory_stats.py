@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Per-attribute fill rates and value sizes measured on live directory entries
+Stats are sampled over a pooled LDAP session and cached on disk with a TTL
+"""
+
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from ldif_reader import Entry, Value, base_attribute
+from validation_results import json_pointer, warning
+
+STATS_CACHE_FILE = "docs/reference/.cache/directory-stats.json"
+DEFAULT_TTL = 3600
+
+USER_FILTER = "(&(objectClass=user)(!(objectClass=computer)))"
+GROUP_FILTER = "(objectClass=group)"
+
+# Thresholds for list-view columns that LAM fetches for every row
+SPARSE_FILL_RATE = 0.10
+LARGE_VALUE_BYTES = 4096
+MANY_VALUES = 500
+
+def _value_size(value: Value) -> int:
+    return len(value) if isinstance(value, bytes) else len(value.encode('utf-8'))
+
+def measure_attributes(entries: Iterable[Entry], attributes: List[str],
+                       sample: int = 0) -> Dict:
+    """Fill rate, value count and value size per attribute over up to sample entries"""
+    wanted = {name.lower(): name for name in attributes}
+    stats = {name: {"populated": 0, "values": 0, "max_values": 0, "bytes": 0, "max_bytes": 0}
+             for name in attributes}
+    total = 0
+
+    iterator = iter(entries)
+    try:
+        for _, attrs in iterator:
+            total += 1
+            for description, values in attrs.items():
+                name = wanted.get(base_attribute(description).lower())
+                if name is None or not values:
+                    continue
+                entry_bytes = sum(_value_size(v) for v in values)
+                record = stats[name]
+                record["populated"] += 1
+                record["values"] += len(values)
+                record["max_values"] = max(record["max_values"], len(values))
+                record["bytes"] += entry_bytes
+                record["max_bytes"] = max(record["max_bytes"], entry_bytes)
+            if sample and total >= sample:
+                break
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close:
+            close()  # Abandon remaining pages
+
+    for record in stats.values():
+        populated = record["populated"]
+        record["fill_rate"] = populated / total if total else 0.0
+        record["avg_values"] = record["values"] / populated if populated else 0.0
+        record["avg_bytes"] = record.pop("bytes") / populated if populated else 0.0
+    return {"entries": total, "attributes": stats}
+
+def _cache_key(url: str, base: str, search_filter: str, attributes: List[str], sample: int) -> str:
+    raw = json.dumps([url, base.lower(), search_filter, sorted(a.lower() for a in attributes), sample])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+class DirectoryStatsCache:
+    """JSON file of measured results keyed by lookup, each entry valid for ttl seconds"""
+
+    def __init__(self, cache_file: Optional[str] = STATS_CACHE_FILE, ttl: int = DEFAULT_TTL):
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.ttl = ttl
+        self.entries: Dict[str, Dict] = {}
+        if self.cache_file and self.cache_file.exists():
+            try:
+                with open(self.cache_file, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.entries = {}  # Corrupt cache, measure again
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self.entries.get(key)
+        if entry and time.time() - entry["collected_at"] < self.ttl:
+            return entry
+        return None
+
+    def put(self, key: str, entry: Dict):
+        self.update({key: entry})
+
+    def update(self, entries: Dict[str, Dict]):
+        """Store several entries with one write of the cache file"""
+        self.entries.update(entries)
+        if not self.cache_file:
+            return
+        now = time.time()
+        self.entries = {k: v for k, v in self.entries.items() if now - v["collected_at"] < self.ttl}
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            tmp_file.replace(self.cache_file)
+        except OSError as e:
+            print(f"⚠️  Could not write cache {self.cache_file}: {e}", file=sys.stderr)
+
+def get_attribute_stats(session, base: str, search_filter: str, attributes: List[str],
+                        sample: int = 500, page_size: int = 500,
+                        cache: Optional[DirectoryStatsCache] = None) -> Dict:
+    """Return cached stats for the search, measuring them over the session on a miss"""
+    key = _cache_key(session.url, base, search_filter, attributes, sample)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached:
+            return dict(cached, cached=True)
+
+    entries = session.search(base, search_filter, attributes, scope="sub",
+                             page_size=min(page_size, sample) if sample else page_size)
+    entry = dict(measure_attributes(entries, attributes, sample),
+                 base=base, filter=search_filter, collected_at=time.time())
+    if cache is not None:
+        cache.put(key, entry)
+    return dict(entry, cached=False)
+
+def attribute_stat_warnings(setting: str, stats: Dict,
+                            sparse_fill_rate: float = SPARSE_FILL_RATE,
+                            large_value_bytes: int = LARGE_VALUE_BYTES,
+                            many_values: int = MANY_VALUES) -> List[str]:
+    """Warnings for list columns that are mostly empty or expensive to fetch"""
+    warnings = []
+    pointer = json_pointer("typeSettings", setting)
+    sampled = stats["entries"]
+    if not sampled:
+        return [warning("live.no_entries", pointer,
+                        f"⚠️  {setting}: no entries found under {stats['base']}, live checks skipped")]
+
+    for name, record in stats["attributes"].items():
+        if record["fill_rate"] < sparse_fill_rate:
+            warnings.append(warning("live.sparse_column", pointer,
+                f"⚠️  {setting} column is sparse: {name}\n"
+                f"   Populated on {record['populated']} of {sampled} sampled entries "
+                f"({record['fill_rate']:.0%})\n"
+                f"   LAM will render a mostly blank column",
+                fix=f"Remove #{name} from {setting} or populate it"
+            ))
+        if record["avg_bytes"] > large_value_bytes or record["max_values"] > many_values:
+            warnings.append(warning("live.expensive_column", pointer,
+                f"⚠️  {setting} column is expensive to load: {name}\n"
+                f"   Average {record['avg_bytes'] / 1024:.1f} KB per entry, "
+                f"up to {record['max_values']} value(s) on one entry\n"
+                f"   Every list page fetches it for each row",
+                fix=f"Remove #{name} from {setting}"
+            ))
+    return warnings
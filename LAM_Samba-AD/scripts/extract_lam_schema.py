@@ -4,16 +4,59 @@ Extract LAM configuration schema from source code
 This creates a JSON schema of all valid configuration options
 """
 
+import argparse
+import hashlib
 import re
 import json
+import os
 import sys
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from typing import Dict, List, Any
 
-def extract_lam_config_constants(lam_source_path: Path) -> Dict[str, Any]:
-    """Extract all configuration constants from LAM source code"""
+from lam_modules import SCAN_DIRS, scan_lam_tree
+from php_lexer import parse_php_classes
+from schema_history import record_snapshot
+
+OUTPUT_FILE = "docs/reference/lam-config-schema.json"
+LAM_SOURCE_DIR = "docs/lam/source"
+LAM_CONTAINER = "Samba-AD-LAM"
+LAM_WEB_ROOT = "/var/www/html/lam"
+PROFILE_CLASS = "LAMConfig"
+
+# Schema sections produced from each source file, for incremental re-extraction
+CONFIG_SECTIONS = ["version", "loginMethods", "accessLevels", "configOptions",
+                   "typeSettings", "validationRules", "profileClass", "classes"]
+MODULE_SECTIONS = ["typeAttributes", "modules", "moduleSettings"]
+SOURCE_FILES = ["lib/config.inc", "lib/types.inc"] + SCAN_DIRS
+# Release trees carry a VERSION file; git checkouts and some images only have LAMVersion()
+VERSION_FILE = "VERSION"
+
+# function LAMVersion() { return '9.3'; } in lib/config.inc, also with a return
+# type (': string', ': ?string'), any line breaks between tokens, or any case
+LAM_VERSION_RE = re.compile(
+    r'function\s+LAMVersion\s*\(\s*\)\s*(?::\s*\??\s*\\?\w+\s*)?\{\s*'
+    r'return\s*\(?\s*[\'"]\s*([^\'"\s]+)\s*[\'"]',
+    re.IGNORECASE)
+
+def extract_lam_version(config_source: str, lam_source_path: Path) -> str:
+    """LAM version from LAMVersion() in config.inc, else the VERSION file; empty if neither has one"""
+    match = LAM_VERSION_RE.search(config_source)
+    if match:
+        return match.group(1)
+    version_file = lam_source_path / VERSION_FILE
+    if version_file.exists():
+        return version_file.read_text(encoding='utf-8', errors='ignore').strip()
+    return ""
+
+def extract_lam_config_constants(lam_source_path: Path, version: str = "") -> Dict[str, Any]:
+    """Extract all configuration constants from LAM source code
+
+    config.inc is tokenized once; constants, properties and validate_*
+    methods are read per class rather than matched across the whole file.
+    The version is read from LAMVersion() unless given.
+    """
     schema = {
-        "version": "9.3",
+        "version": version or "unknown",
         "loginMethods": [],
         "accessLevels": [],
         "configOptions": {},
@@ -25,33 +68,53 @@ def extract_lam_config_constants(lam_source_path: Path) -> Dict[str, Any]:
     
     if not config_file.exists():
         print(f"❌ Config file not found: {config_file}", file=sys.stderr)
-        print("   Run: docker cp Samba-AD-LAM:/var/www/html/lam {lam_source_path}", file=sys.stderr)
+        print(f"   Run extract_lam_schema.py to fetch it from the {LAM_CONTAINER} container", file=sys.stderr)
         return schema
     
     with open(config_file, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-        
-        # Extract LOGIN constants
-        login_methods = re.findall(r'const\s+LOGIN_(\w+)\s*=\s*[\'"](\w+)[\'"]', content)
-        schema["loginMethods"] = [method[1] for method in login_methods]
-        
-        # Extract ACCESS constants  
-        access_levels = re.findall(r'const\s+ACCESS_(\w+)\s*=\s*(\d+)', content)
-        schema["accessLevels"] = [int(level[1]) for level in access_levels]
-        
-        # Extract public properties (configuration options)
-        # Match: public $propertyName = defaultValue;
-        config_opts = re.findall(r'public\s+\$(\w+)(?:\s*=\s*([^;]+))?;', content)
-        for opt, default in config_opts:
-            default_val = default.strip() if default else None
-            schema["configOptions"][opt] = {
-                "default": default_val,
-                "required": default is None or 'null' in str(default).lower()
-            }
-        
-        # Extract validation methods
-        validation_methods = re.findall(r'function\s+validate_(\w+)\s*\([^)]*\)', content)
-        schema["validationRules"] = {method: True for method in validation_methods}
+        source = f.read()
+    classes = parse_php_classes(source)
+    if not version:
+        schema["version"] = extract_lam_version(source, lam_source_path) or "unknown"
+    
+    # LAM's server profile options live in LAMConfig; other classes in
+    # config.inc (LAMCfgMain, ...) must not leak into the profile schema
+    profile_class = PROFILE_CLASS if PROFILE_CLASS in classes else next(
+        (name for name, cls in classes.items()
+         if any(const.startswith("LOGIN_") for const in cls["constants"])),
+        None
+    )
+    if profile_class is None:
+        print(f"⚠️  No {PROFILE_CLASS} class found in {config_file}", file=sys.stderr)
+        return schema
+    profile = classes[profile_class]
+    
+    # Extract LOGIN and ACCESS constants
+    schema["loginMethods"] = [
+        value for const, value in profile["constants"].items() if const.startswith("LOGIN_")
+    ]
+    schema["accessLevels"] = [
+        value for const, value in profile["constants"].items()
+        if const.startswith("ACCESS_") and isinstance(value, int)
+    ]
+    
+    # Extract public properties (configuration options) with parsed defaults
+    for opt, prop in profile["properties"].items():
+        if prop["visibility"] != "public" or prop["static"]:
+            continue
+        schema["configOptions"][opt] = {
+            "default": prop["default"],
+            "required": prop["default"] is None
+        }
+    
+    # Extract validation methods
+    schema["validationRules"] = {
+        method[len("validate_"):]: True
+        for method in profile["methods"] if method.startswith("validate_")
+    }
+    
+    schema["profileClass"] = profile_class
+    schema["classes"] = classes
     
     return schema
 
@@ -82,44 +145,232 @@ def extract_type_attributes(lam_source_path: Path) -> Dict[str, List[str]]:
     
     return attributes
 
+def extract_module_schema(lam_source_path: Path, jobs: int = 0) -> Dict[str, Any]:
+    """Per-type attributes and moduleSettings keys from the lib/modules and lib/types trees
+
+    Falls back to the lib/types.inc scan when the module tree is not available.
+    """
+    if not any((lam_source_path / directory).is_dir() for directory in SCAN_DIRS):
+        print(f"⚠️  No {' or '.join(SCAN_DIRS)} under {lam_source_path}, "
+              f"using lib/types.inc only", file=sys.stderr)
+        return {"typeAttributes": extract_type_attributes(lam_source_path)}
+    return scan_lam_tree(lam_source_path, jobs)
+
+def fingerprint_tree(path: Path, previous: Dict = None) -> Dict[str, Any]:
+    """Fingerprint a source directory: stat signature first, content hash only if it moved"""
+    files = sorted(p for p in path.rglob("*") if p.is_file())
+    stat_digest = hashlib.sha256()
+    for file in files:
+        stat = file.stat()
+        stat_digest.update(f"{file.relative_to(path)}\0{stat.st_size}\0{stat.st_mtime}\0".encode())
+    signature = stat_digest.hexdigest()
+    if previous and previous.get("signature") == signature:
+        return previous
+    content_digest = hashlib.sha256()
+    for file in files:
+        content_digest.update(str(file.relative_to(path)).encode() + b'\0')
+        content_digest.update(file.read_bytes())
+    return {"files": len(files), "signature": signature, "sha256": content_digest.hexdigest()}
+
+def fingerprint_file(path: Path, previous: Dict = None) -> Dict[str, Any]:
+    """mtime/size/sha256 of a source file; reuses the previous hash if mtime and size match"""
+    if not path.exists():
+        return {}
+    if path.is_dir():
+        return fingerprint_tree(path, previous)
+    stat = path.stat()
+    if previous and previous.get("mtime") == stat.st_mtime and previous.get("size") == stat.st_size:
+        return previous
+    return {
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "sha256": hashlib.sha256(path.read_bytes()).hexdigest()
+    }
+
+def load_previous_schema(output_file: Path) -> Dict:
+    if not output_file.exists():
+        return {}
+    try:
+        with open(output_file, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def save_schema(schema: Dict, output_file: Path):
+    """Write the JSON through a temp file so readers (watch_lam_config.py) never see half a schema"""
+    tmp_file = output_file.with_name(output_file.name + '.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump(schema, f, indent=2)
+    tmp_file.replace(output_file)
+
+def _is_wanted(name: str, wanted: List[str]) -> bool:
+    """Accept archive members that are, or live under, a whitelisted relative path"""
+    path = PurePosixPath(name)
+    if path.is_absolute() or '..' in path.parts:
+        return False
+    normalized = str(path)
+    return any(normalized == w or normalized.startswith(w.rstrip('/') + '/') for w in wanted)
+
+def fetch_lam_sources(container: str, dest: Path, paths: List[str],
+                      optional: List[str] = ()) -> bool:
+    """Stream only the whitelisted LAM paths out of the container as a tar archive
+
+    Copies a few KB instead of `docker cp` of the whole web root. optional
+    paths are included only if they exist in the container.
+    """
+    import shlex
+    import shutil
+    import subprocess
+    import tarfile
+    import tempfile
+    
+    command = ["docker", "exec", container, "tar", "-C", LAM_WEB_ROOT, "-cf", "-"] + paths
+    if optional:
+        # tar fails on a missing member, so let the container's shell drop absent optional paths
+        present = f"$(for p in {' '.join(map(shlex.quote, optional))}; do [ -e \"$p\" ] && echo \"$p\"; done)"
+        command = ["docker", "exec", container, "sh", "-c",
+                   f"cd {shlex.quote(LAM_WEB_ROOT)} && tar -cf - {' '.join(map(shlex.quote, paths))} {present}"]
+    wanted = list(paths) + list(optional)
+    fetched = 0
+    new_paths = [dest / p for p in wanted if not (dest / p).exists()]
+    archive_ok = True
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            with tarfile.open(fileobj=process.stdout, mode='r|') as archive:
+                for member in archive:
+                    if not member.isfile() or not _is_wanted(member.name, wanted):
+                        continue
+                    target = dest / member.name
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    target.write_bytes(archive.extractfile(member).read())
+                    fetched += member.size
+        except tarfile.TarError as e:
+            # A truncated or corrupt stream is a failure even when tar itself exits 0
+            print(f"❌ Failed to read LAM source archive: {e}", file=sys.stderr)
+            archive_ok = False
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+        
+        if returncode != 0:
+            stderr.seek(0)
+            print(f"❌ Failed to extract LAM source: {stderr.read().decode(errors='replace')}",
+                  file=sys.stderr)
+        if returncode != 0 or not archive_ok:
+            # Partial sources would look present to the next run and never be re-fetched
+            for path in new_paths:
+                if path.is_dir():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink(missing_ok=True)
+            return False
+    
+    received = list(paths) + [p for p in optional if (dest / p).exists()]
+    print(f"✓ Fetched {', '.join(received)} from {container} ({fetched / 1024:.1f} KB)")
+    return True
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract LAM configuration schema from source code")
+    parser.add_argument("--lam-source", default=LAM_SOURCE_DIR,
+                        help="LAM install to read from: a local copy, or a mounted image "
+                             "layer/volume (default: docs/lam/source)")
+    parser.add_argument("--container", default=LAM_CONTAINER,
+                        help="Container to fetch missing source files from")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-parse lib/config.inc / the module tree if they changed "
+                             "since the last extraction (mtime, then sha256)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for the lib/modules scan (default: CPU count)")
+    parser.add_argument("--lam-version",
+                        help="Version to record; required when neither LAMVersion() in "
+                             "lib/config.inc nor a VERSION file gives one")
+    parser.add_argument("--history-only", action="store_true",
+                        help="Only record a snapshot in the schema history and keep "
+                             f"{OUTPUT_FILE} (e.g. a LAM release that is not deployed yet)")
+    return parser.parse_args()
+
 def main():
-    # Check if LAM source exists
-    lam_source_path = Path("docs/lam/source")
+    args = parse_args()
+    
+    # Check if the LAM source files we parse exist; fetch only those that are missing
+    lam_source_path = Path(args.lam_source)
+    missing = [name for name in SOURCE_FILES if not (lam_source_path / name).exists()]
     
-    if not lam_source_path.exists():
-        print("LAM source not found. Extracting from container...")
-        import subprocess
+    if missing:
+        print("LAM source not found. Fetching required files from container...")
         lam_source_path.mkdir(parents=True, exist_ok=True)
-        result = subprocess.run([
-            "docker", "cp", 
-            "Samba-AD-LAM:/var/www/html/lam/.",
-            str(lam_source_path)
-        ], capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            print(f"❌ Failed to extract LAM source: {result.stderr}")
+        optional = [] if (lam_source_path / VERSION_FILE).exists() else [VERSION_FILE]
+        if not fetch_lam_sources(args.container, lam_source_path, missing, optional):
             sys.exit(1)
     
-    print("Extracting LAM schema from source code...")
-    schema = extract_lam_config_constants(lam_source_path)
+    output_file = Path(OUTPUT_FILE)
+    previous = load_previous_schema(output_file) if args.incremental and not args.history_only else {}
+    old_fingerprints = previous.get("source_fingerprint", {})
+    # VERSION is optional: fingerprinted when present, and appearing or disappearing is a change
+    fingerprints = {
+        name: fingerprint_file(lam_source_path / name, old_fingerprints.get(name))
+        for name in SOURCE_FILES + [VERSION_FILE]
+    }
+    if not fingerprints[VERSION_FILE]:
+        del fingerprints[VERSION_FILE]
+    changed = {
+        name for name in SOURCE_FILES + [VERSION_FILE]
+        if (name in SOURCE_FILES and not fingerprints[name])
+        or fingerprints.get(name, {}).get("sha256") != old_fingerprints.get(name, {}).get("sha256")
+    }
+    
+    if not changed:
+        if fingerprints != old_fingerprints:
+            # Touched but identical content: remember the new mtimes
+            previous["source_fingerprint"] = fingerprints
+            save_schema(previous, output_file)
+        print(f"✓ LAM sources unchanged, keeping {output_file}")
+        record_snapshot("lam", previous)
+        return
     
-    print("Extracting type attributes...")
-    attributes = extract_type_attributes(lam_source_path)
-    schema["typeAttributes"] = attributes
+    if changed & {"lib/config.inc", VERSION_FILE}:
+        print("Extracting LAM schema from source code...")
+        schema = extract_lam_config_constants(lam_source_path, args.lam_version)
+    else:
+        print("lib/config.inc unchanged, reusing previous config schema")
+        schema = {key: previous[key] for key in CONFIG_SECTIONS if key in previous}
+        if args.lam_version:
+            schema["version"] = args.lam_version
     
-    # Save schema
-    output_file = Path("docs/reference/lam-config-schema.json")
-    output_file.parent.mkdir(parents=True, exist_ok=True)
+    if changed & {"lib/types.inc", *SCAN_DIRS}:
+        print("Scanning LAM modules and types...")
+        schema.update(extract_module_schema(lam_source_path, args.jobs))
+    else:
+        print("LAM module tree unchanged, reusing previous type attributes and module settings")
+        schema.update({key: previous[key] for key in MODULE_SECTIONS if key in previous})
+    attributes = schema.setdefault("typeAttributes", {})
+    schema["source_fingerprint"] = fingerprints
     
-    with open(output_file, 'w') as f:
-        json.dump(schema, f, indent=2)
+    if schema.get("version", "unknown") == "unknown":
+        # An unlabelled schema would be recorded in the history as lam:unknown
+        print("❌ Could not detect the LAM version (no LAMVersion() in lib/config.inc, "
+              f"no {VERSION_FILE} file)", file=sys.stderr)
+        print("   Pass --lam-version, e.g. --lam-version 9.3", file=sys.stderr)
+        sys.exit(2)
+    
+    # Save schema
+    if args.history_only:
+        print(f"\n✓ Extracted LAM {schema.get('version', 'unknown')} schema (history only)")
+    else:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        save_schema(schema, output_file)
+        print(f"\n✓ Extracted LAM {schema.get('version', 'unknown')} schema to {output_file}")
     
     # Print summary
-    print(f"\n✓ Extracted LAM schema to {output_file}")
     print(f"  • Config options: {len(schema['configOptions'])}")
     print(f"  • Login methods: {', '.join(schema['loginMethods']) if schema['loginMethods'] else 'None found'}")
     print(f"  • Access levels: {', '.join(map(str, schema['accessLevels'])) if schema['accessLevels'] else 'None found'}")
     print(f"  • Type attributes: {', '.join(attributes.keys())}")
+    if "moduleSettings" in schema:
+        print(f"  • Modules: {len(schema.get('modules', {}))}, "
+              f"moduleSettings keys: {len(schema['moduleSettings'])}")
+    record_snapshot("lam", schema)
     
     if not schema['loginMethods']:
         print("\n⚠️  Warning: No login methods found. Check LAM source extraction.")
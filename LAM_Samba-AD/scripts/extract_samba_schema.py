@@ -4,14 +4,39 @@ Extract Samba AD schema attributes from running container
 This creates a reference of all available LDAP attributes
 """
 
+import argparse
+import hashlib
 import json
-import subprocess
+import os
 import sys
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ldap_session import LDAPError
+from ldif_reader import (Entry, iter_ldif_entries, non_negative_int, positive_int,
+                         sample_attribute_occurrences, stream_command_lines)
+from schema_binary import BinarySchemaError, binary_is_current, binary_path, write_binary_schema
+from schema_history import record_snapshot
+
+OUTPUT_FILE = "docs/reference/samba-schema.json"
+DEFAULT_CONTAINER = "Samba-AD"
+DEFAULT_BASE_DN = "DC=haver,DC=internal"
+SAM_LDB = "/var/lib/samba/private/sam.ldb"
+
+SCHEMA_FILTER = "(|(objectClass=attributeSchema)(objectClass=classSchema))"
+SCHEMA_ATTRIBUTES = [
+    "objectClass", "lDAPDisplayName", "attributeSyntax", "oMSyntax",
+    "isSingleValued", "rangeUpper", "subClassOf",
+    "systemAuxiliaryClass", "auxiliaryClass",
+    "systemMustContain", "mustContain", "systemMayContain", "mayContain",
+    "uSNChanged"
+]
 
 def run_docker_command(container: str, command: List[str]) -> str:
     """Execute command in Docker container and return output"""
+    import subprocess
+    
     full_cmd = ["docker", "exec", container] + command
     result = subprocess.run(full_cmd, capture_output=True, text=True)
     
@@ -36,37 +61,207 @@ def get_samba_attributes(container: str = "Samba-AD") -> List[str]:
     attributes = [line.strip() for line in output.split('\n') if line.strip()]
     return sorted(attributes)
 
-def get_default_user_attributes(container: str = "Samba-AD", domain_pass: str = "") -> Set[str]:
-    """Get attributes available on default Samba AD user objects"""
-    print("Querying actual user objects for available attributes...")
+def schema_dn(base_dn: str) -> str:
+    return f"CN=Schema,CN=Configuration,{base_dn}"
+
+def parse_schema_partition(entries: Iterable[Entry]) -> Dict[str, Dict]:
+    """Split attributeSchema/classSchema entries into attribute and class tables"""
+    attributes = {}
+    classes = {}
+    highest_usn = 0
     
-    if not domain_pass:
-        print("⚠️  No domain password provided, using placeholder", file=sys.stderr)
-        domain_pass = "PLACEHOLDER"
+    for _, attrs in entries:
+        for usn in attrs.get("uSNChanged", []):
+            highest_usn = max(highest_usn, int(usn))
+        name = (attrs.get("lDAPDisplayName") or [None])[0]
+        if not name:
+            continue
+        object_classes = {oc.lower() for oc in attrs.get("objectClass", [])}
+        
+        if "attributeschema" in object_classes:
+            single = (attrs.get("isSingleValued") or ["FALSE"])[0].upper() == "TRUE"
+            info = {
+                "syntax": (attrs.get("attributeSyntax") or [""])[0],
+                "om_syntax": (attrs.get("oMSyntax") or [""])[0],
+                "multi_valued": not single
+            }
+            if attrs.get("rangeUpper"):
+                info["range_upper"] = int(attrs["rangeUpper"][0])
+            attributes[name] = info
+        elif "classschema" in object_classes:
+            classes[name] = {
+                "sub_class_of": (attrs.get("subClassOf") or [""])[0],
+                "auxiliary": attrs.get("systemAuxiliaryClass", []) + attrs.get("auxiliaryClass", []),
+                "must": attrs.get("systemMustContain", []) + attrs.get("mustContain", []),
+                "may": attrs.get("systemMayContain", []) + attrs.get("mayContain", [])
+            }
     
-    output = run_docker_command(container, [
-        "ldapsearch", "-LLL",
-        "-H", "ldaps://127.0.0.1:636",
-        "-D", "CN=Administrator,CN=Users,DC=haver,DC=internal",
-        "-w", domain_pass,
-        "-b", "CN=Users,DC=haver,DC=internal",
-        "-s", "one",
-        "(&(objectClass=user)(!(objectClass=computer)))",
-        "*"
-    ])
+    return {"attributes": attributes, "classes": classes, "highest_usn": highest_usn}
+
+def partition_hash(partition: Dict[str, Dict]) -> str:
+    """Content hash of the schema partition, for DCs that do not expose uSNChanged"""
+    content = json.dumps([partition["attributes"], partition["classes"]], sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def schema_changed_since(usn: int, container: str, base_dn: str, session=None) -> bool:
+    """Probe the schema partition for any object changed after the recorded USN
+
+    Reads at most one entry, so an unchanged schema costs a single tiny search.
+    """
+    probe = f"(uSNChanged>={usn + 1})"
+    if session is not None:
+        entries = session.search(schema_dn(base_dn), probe, ["uSNChanged"], scope="one", page_size=1)
+    else:
+        entries = iter_ldif_entries(stream_command_lines(["docker", "exec", container,
+            "ldbsearch", "-H", SAM_LDB, "-b", schema_dn(base_dn), "-s", "one",
+            probe, "uSNChanged"
+        ]))
     
-    if not output:
-        return set()
+    for _ in entries:
+        entries.close()
+        return True
+    return False
+
+def load_previous_schema(output_file: Path) -> Dict:
+    if not output_file.exists():
+        return {}
+    try:
+        with open(output_file, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def save_schema(schema: Dict, output_file: Path):
+    """Write the JSON through a temp file so readers (watch_lam_config.py) never see half a schema"""
+    tmp_file = output_file.with_name(output_file.name + '.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump(schema, f, indent=2)
+    tmp_file.replace(output_file)
+
+def save_binary_schema(schema: Dict, output_file: Path):
+    """Write samba-schema.bin next to the JSON; the validator falls back to JSON without it"""
+    try:
+        write_binary_schema(schema, str(output_file))
+    except (OSError, BinarySchemaError) as e:
+        print(f"⚠️  Could not write binary schema {binary_path(str(output_file))}: {e}",
+              file=sys.stderr)
+
+def ensure_binary_schema(schema: Dict, output_file: Path):
+    """Rebuild the .bin for an unchanged schema if it is missing or older than the JSON"""
+    if not binary_is_current(str(output_file)):
+        save_binary_schema(schema, output_file)
+
+def resolve_class_attributes(classes: Dict[str, Dict], class_name: str) -> Tuple[Set[str], Set[str]]:
+    """Collect must/may attributes of a class including superclasses and auxiliaries"""
+    must, may = set(), set()
+    pending = [class_name]
+    seen = set()
+    
+    while pending:
+        name = pending.pop()
+        if name in seen or name not in classes:
+            continue
+        seen.add(name)
+        info = classes[name]
+        must.update(info["must"])
+        may.update(info["may"])
+        if info["sub_class_of"] and info["sub_class_of"] != name:
+            pending.append(info["sub_class_of"])
+        pending.extend(info["auxiliary"])
+    
+    return must, may
+
+def get_schema_via_ldap(session, base_dn: str) -> Dict[str, Dict]:
+    """Read the whole schema partition in one paged search over a pooled session"""
+    print(f"Reading schema partition over LDAP ({session.url})...")
+    return parse_schema_partition(session.search(
+        schema_dn(base_dn), SCHEMA_FILTER, SCHEMA_ATTRIBUTES, scope="one"
+    ))
+
+def get_schema_via_docker(container: str, base_dn: str) -> Dict[str, Dict]:
+    """Read the whole schema partition with a single ldbsearch inside the container"""
+    print("Reading schema partition via docker exec (ldbsearch)...")
+    lines = stream_command_lines(["docker", "exec", container,
+        "ldbsearch", "-H", SAM_LDB,
+        "-b", schema_dn(base_dn), "-s", "one",
+        SCHEMA_FILTER
+    ] + SCHEMA_ATTRIBUTES)
+    
+    return parse_schema_partition(iter_ldif_entries(lines))
+
+def build_user_attribute_table(partition: Dict[str, Dict],
+                               common_attrs: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Overlay real multi_valued/required data from the schema onto the common table"""
+    must, _ = resolve_class_attributes(partition["classes"], "user")
+    table = {}
+    
+    for name, info in common_attrs.items():
+        entry = dict(info)
+        schema_info = partition["attributes"].get(name)
+        if schema_info:
+            entry["multi_valued"] = schema_info["multi_valued"]
+            entry["required"] = name in must
+        table[name] = entry
     
-    # Parse LDIF output to extract available attributes
-    attributes = set()
-    for line in output.split('\n'):
-        if ':' in line and not line.startswith('#'):
-            attr = line.split(':', 1)[0].strip()
-            if attr and not attr.startswith('dn'):
-                attributes.add(attr)
+    return table
+
+def get_user_attribute_counts(container: str = "Samba-AD", domain_pass: str = "",
+                              session=None, base_dn: str = DEFAULT_BASE_DN,
+                              bases: Optional[List[str]] = None, scope: str = "one",
+                              page_size: int = 1000, max_entries: int = 0,
+                              stable_pages: int = 0) -> Tuple[int, Counter]:
+    """Count how many user objects populate each attribute
+
+    Entries are parsed as they arrive from the pipe or session, so memory use
+    does not grow with the number of users. Searches use the paged results
+    control; max_entries/stable_pages stop each base early once the sample
+    is representative. bases defaults to CN=Users under base_dn.
+    """
+    user_filter = "(&(objectClass=user)(!(objectClass=computer)))"
+    total = 0
+    counts: Counter = Counter()
     
-    return attributes
+    if session is None and not domain_pass:
+        print("⚠️  No domain password provided, using placeholder", file=sys.stderr)
+        domain_pass = "PLACEHOLDER"
+    
+    for search_base in bases or [f"CN=Users,{base_dn}"]:
+        if session is not None:
+            entries = session.search(search_base, user_filter, ["*"],
+                                     scope=scope, page_size=page_size)
+        else:
+            entries = iter_ldif_entries(stream_command_lines(["docker", "exec", container,
+                "ldapsearch", "-LLL",
+                "-H", "ldaps://127.0.0.1:636",
+                "-D", f"CN=Administrator,CN=Users,{base_dn}",
+                "-w", domain_pass,
+                "-E", f"pr={page_size}/noprompt",
+                "-b", search_base,
+                "-s", scope,
+                user_filter,
+                "*"
+            ]))
+        
+        try:
+            seen, base_counts, reason = sample_attribute_occurrences(
+                entries, page_size, max_entries, stable_pages
+            )
+        except LDAPError as e:
+            # A base that cannot be searched only loses its occurrence counts
+            print(f"⚠️  {search_base}: search failed, skipping ({e})", file=sys.stderr)
+            continue
+        print(f"  • {search_base}: {seen} user(s), {len(base_counts)} attribute(s) - {reason}")
+        total += seen
+        counts.update(base_counts)
+    
+    return total, counts
+
+def get_default_user_attributes(container: str = "Samba-AD", domain_pass: str = "",
+                                session=None, base_dn: str = DEFAULT_BASE_DN) -> Set[str]:
+    """Get attributes available on default Samba AD user objects"""
+    print("Querying actual user objects for available attributes...")
+    _, counts = get_user_attribute_counts(container, domain_pass, session, base_dn)
+    return set(counts)
 
 def get_common_user_attributes() -> Dict[str, Dict[str, str]]:
     """Return list of common AD user attributes with descriptions"""
@@ -141,38 +336,154 @@ def get_common_user_attributes() -> Dict[str, Dict[str, str]]:
         }
     }
 
-def main():
-    container = "Samba-AD"
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract Samba AD schema attributes")
+    parser.add_argument("--container", default=DEFAULT_CONTAINER,
+                        help="Samba AD container for the docker exec backend")
+    parser.add_argument("--base-dn", default=DEFAULT_BASE_DN)
+    parser.add_argument("--ldap-url",
+                        help="Read over one pooled LDAP session (ldaps://dc:636, or ldif://dump.ldif) "
+                             "instead of docker exec")
+    parser.add_argument("--bind-dn", help="Default: CN=Administrator,CN=Users,<base-dn>")
+    parser.add_argument("--password", default=os.environ.get("DOMAINPASS", ""),
+                        help="Bind password (default: $DOMAINPASS)")
+    parser.add_argument("--tls-ca-file", help="CA certificate to verify the DC against")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip extraction when the schema is unchanged since the last run "
+                             "(uSNChanged probe, content hash as fallback)")
+    
+    discovery = parser.add_argument_group("user attribute discovery")
+    discovery.add_argument("--user-base", action="append", dest="user_bases",
+                           help="Search base for user objects; repeat for OU-based layouts "
+                                "(default: CN=Users,<base-dn>)")
+    discovery.add_argument("--scope", choices=["one", "sub"], default="one",
+                           help="Search scope below each user base (default: one)")
+    discovery.add_argument("--page-size", type=positive_int, default=1000,
+                           help="Paged results control page size (default: 1000)")
+    discovery.add_argument("--sample", type=non_negative_int, default=0,
+                           help="Stop each base after N users (default: scan all)")
+    discovery.add_argument("--stable-pages", type=non_negative_int, default=0,
+                           help="Stop each base once the attribute set is unchanged for K pages")
+    return parser.parse_args()
+
+def open_session(args: argparse.Namespace):
+    """Open the pooled LDAP session, or return None to fall back to docker exec"""
+    if not args.ldap_url:
+        return None
+    
+    from ldap_session import get_session
+    bind_dn = args.bind_dn or f"CN=Administrator,CN=Users,{args.base_dn}"
+    try:
+        return get_session(args.ldap_url, bind_dn, args.password, args.tls_ca_file)
+    except LDAPError as e:
+        print(f"⚠️  LDAP session unavailable ({e}), falling back to docker exec", file=sys.stderr)
+        return None
+
+def container_running(container: str) -> bool:
+    import subprocess
     
-    # Check if container is running
     result = subprocess.run(
         ["docker", "ps", "--filter", f"name={container}", "--format", "{{.Names}}"],
         capture_output=True,
         text=True
     )
+    return container in result.stdout
+
+def main():
+    args = parse_args()
+    container = args.container
+    session = open_session(args)
     
-    if container not in result.stdout:
+    if session is None and not container_running(container):
         print(f"❌ Container '{container}' is not running", file=sys.stderr)
         print("   Start the container and try again", file=sys.stderr)
         sys.exit(1)
     
-    print(f"Extracting Samba AD schema from container '{container}'...")
+    output_file = Path(OUTPUT_FILE)
+    previous = load_previous_schema(output_file) if args.incremental else {}
+    fingerprint = previous.get("source_fingerprint", {})
+    
+    try:
+        if fingerprint.get("schema_usn") and not schema_changed_since(
+                fingerprint["schema_usn"], container, args.base_dn, session):
+            print(f"✓ Samba schema unchanged since USN {fingerprint['schema_usn']}, "
+                  f"keeping {output_file}")
+            ensure_binary_schema(previous, output_file)
+            record_snapshot("samba", previous)
+            return
+        
+        if session is not None:
+            print(f"Extracting Samba AD schema from {session.url}...")
+            partition = get_schema_via_ldap(session, args.base_dn)
+        else:
+            print(f"Extracting Samba AD schema from container '{container}'...")
+            partition = get_schema_via_docker(container, args.base_dn)
+    except LDAPError as e:
+        print(f"❌ Could not read the schema partition: {e}", file=sys.stderr)
+        print(f"   Keeping {output_file} unchanged", file=sys.stderr)
+        sys.exit(1)
+    
+    content_hash = partition_hash(partition)
+    if partition["attributes"] and fingerprint.get("schema_hash") == content_hash:
+        if fingerprint.get("schema_usn") != partition["highest_usn"]:
+            # Record the new USN so the next run can use the cheap probe
+            fingerprint["schema_usn"] = partition["highest_usn"]
+            save_schema(previous, output_file)
+        ensure_binary_schema(previous, output_file)
+        print(f"✓ Samba schema content unchanged, keeping {output_file}")
+        record_snapshot("samba", previous)
+        return
     
     # Get all attributes
-    all_attributes = get_samba_attributes(container)
+    if partition["attributes"]:
+        all_attributes = sorted(partition["attributes"])
+    elif session is None:
+        all_attributes = get_samba_attributes(container)
+    else:
+        all_attributes = []
+    
+    if not all_attributes:
+        # An empty read (refused search, wrong --base-dn) must not replace a good schema
+        print(f"❌ No attributes found in {schema_dn(args.base_dn)}", file=sys.stderr)
+        print(f"   Check --base-dn and the bind account; keeping {output_file} unchanged",
+              file=sys.stderr)
+        sys.exit(1)
     
     # Get attributes from actual user objects (requires password)
-    user_attributes = get_default_user_attributes(container)
+    print("Querying actual user objects for available attributes...")
+    user_count, user_attribute_counts = get_user_attribute_counts(
+        container, args.password, session=session, base_dn=args.base_dn,
+        bases=args.user_bases, scope=args.scope, page_size=args.page_size,
+        max_entries=args.sample, stable_pages=args.stable_pages
+    )
+    user_attributes = set(user_attribute_counts)
     
-    # Get common attribute definitions
+    # Get common attribute definitions, with real schema data where available
     common_attrs = get_common_user_attributes()
+    if partition["attributes"]:
+        common_attrs = build_user_attribute_table(partition, common_attrs)
+    
+    user_must, user_may = resolve_class_attributes(partition["classes"], "user")
     
     # Build schema
     schema = {
         "version": "4.x",
+        "source_fingerprint": {
+            "schema_usn": partition["highest_usn"],
+            "schema_hash": content_hash
+        },
         "all_attributes": all_attributes,
         "default_user_attributes": sorted(list(user_attributes)) if user_attributes else [],
+        "user_attribute_counts": {
+            "users_scanned": user_count,
+            "populated": dict(sorted(user_attribute_counts.items()))
+        },
         "common_user_attributes": common_attrs,
+        "attribute_metadata": partition["attributes"],
+        "user_class": {
+            "must": sorted(user_must),
+            "may": sorted(user_may)
+        },
         "safe_attr_user": [
             "sAMAccountName",
             "cn",
@@ -196,19 +507,23 @@ def main():
     }
     
     # Save schema
-    output_file = Path("docs/reference/samba-schema.json")
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_file, 'w') as f:
-        json.dump(schema, f, indent=2)
+    save_schema(schema, output_file)
+    save_binary_schema(schema, output_file)
     
     # Print summary
     print(f"\n✓ Extracted Samba schema to {output_file}")
     print(f"  • Total attributes: {len(all_attributes)}")
     if user_attributes:
-        print(f"  • User object attributes: {len(user_attributes)}")
+        print(f"  • User object attributes: {len(user_attributes)} (across {user_count} users)")
+        sparse = [a for a in schema["safe_attr_user"]
+                  if user_attribute_counts.get(a, 0) * 10 < user_count]
+        if sparse:
+            print(f"  • Safe attr_user attributes populated on <10% of users: {', '.join(sparse)}")
     print(f"  • Safe attr_user attributes: {', '.join(schema['safe_attr_user'])}")
     print(f"  • Attributes with warnings: {len(schema['warnings'])}")
+    record_snapshot("samba", schema)
     
     if not user_attributes:
         print("\n⚠️  Note: Could not query actual user objects (needs domain password)")
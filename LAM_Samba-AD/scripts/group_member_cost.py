@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Estimate what attr_group columns cost LAM group list views
+Counts group memberships with range retrieval, so huge groups are never read in one piece
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ldif_reader import Entry, Value, iter_ldif_entries, parse_range, positive_int, \
+    split_attribute_description, stream_command_lines
+
+DEFAULT_CONTAINER = "Samba-AD"
+DEFAULT_BASE_DN = "DC=haver,DC=internal"
+GROUP_FILTER = "(objectClass=group)"
+
+# LAM shows 30 rows per list page unless the user changes it
+DEFAULT_PAGE_ROWS = 30
+# Above this a single list page transfers more than LAM can render quickly
+EXPENSIVE_PAGE_BYTES = 1024 * 1024
+RANGE_STEP = 1500  # AD MaxValRange default
+
+def _value_size(value: Value) -> int:
+    return len(value) if isinstance(value, bytes) else len(value.encode('utf-8'))
+
+class DockerSearch:
+    """ldapsearch inside the Samba container, streamed; used when no --ldap-url is given"""
+
+    def __init__(self, container: str, bind_dn: str, password: str):
+        self.url = f"docker://{container}"
+        self.container = container
+        self.bind_dn = bind_dn
+        self.password = password
+
+    def search(self, base: str, search_filter: str, attributes: List[str],
+               scope: str = "sub", page_size: int = 1000) -> Iterator[Entry]:
+        return iter_ldif_entries(stream_command_lines([
+            "docker", "exec", self.container, "ldapsearch", "-LLL",
+            "-H", "ldaps://127.0.0.1:636",
+            "-D", self.bind_dn,
+            "-w", self.password,
+            "-E", f"pr={page_size}/noprompt",
+            "-b", base,
+            "-s", scope,
+            search_filter
+        ] + attributes))
+
+    def close(self):
+        pass
+
+def _read_remaining_range(session, dn: str, name: str, low: int) -> Tuple[int, int]:
+    """Follow 'name;range=low-*' requests until the last range; return (values, bytes)
+
+    Only one range (at most RANGE_STEP values) is held in memory at a time.
+    """
+    count = 0
+    size = 0
+    while True:
+        description = f"{name};range={low}-*"
+        entry = next(iter(session.search(dn, "(objectClass=*)", [description], scope="base")), None)
+        if entry is None:
+            return count, size
+        chunk = None
+        for returned, values in entry[1].items():
+            returned_name, options = split_attribute_description(returned)
+            if returned_name.lower() == name.lower():
+                chunk = (values, parse_range(options))
+        if chunk is None:
+            return count, size
+        values, (_, high) = chunk
+        count += len(values)
+        size += sum(_value_size(v) for v in values)
+        if high is None or not values:
+            return count, size
+        low = high + 1
+
+def measure_groups(session, base: str, columns: List[str], page_size: int = 500,
+                   top: int = 10, page_rows: int = DEFAULT_PAGE_ROWS) -> Dict:
+    """Per-column value counts and bytes for every group
+
+    Only running totals, the top N groups and the page_rows largest rows are kept.
+    """
+    totals = {name: {"values": 0, "bytes": 0, "max_values": 0, "ranged_groups": 0}
+              for name in columns}
+    wanted = {name.lower(): name for name in columns}
+    heaviest: List[Tuple[int, int, str]] = []  # min-heap of (member count, bytes, dn)
+    largest_rows: List[int] = []  # min-heap of row sizes for the worst-case page
+    all_rows_bytes = 0
+    groups = 0
+
+    for dn, attrs in session.search(base, GROUP_FILTER, columns, scope="sub", page_size=page_size):
+        groups += 1
+        entry_bytes = 0
+        member_count = member_bytes = 0
+        for description, values in attrs.items():
+            returned_name, options = split_attribute_description(description)
+            name = wanted.get(returned_name.lower())
+            if name is None:
+                continue
+            count = len(values)
+            size = sum(_value_size(v) for v in values)
+            _, high = parse_range(options)
+            if options and high is not None:
+                # More values than MaxValRange: AD returned the first range only
+                more_count, more_size = _read_remaining_range(session, dn, returned_name, high + 1)
+                count += more_count
+                size += more_size
+                totals[name]["ranged_groups"] += 1
+            totals[name]["values"] += count
+            totals[name]["bytes"] += size
+            totals[name]["max_values"] = max(totals[name]["max_values"], count)
+            entry_bytes += size
+            if name.lower() == "member":
+                member_count, member_bytes = count, size
+
+        all_rows_bytes += entry_bytes
+        if len(largest_rows) < page_rows:
+            heapq.heappush(largest_rows, entry_bytes)
+        elif entry_bytes > largest_rows[0]:
+            heapq.heapreplace(largest_rows, entry_bytes)
+        item = (member_count, member_bytes, dn)
+        if len(heaviest) < top:
+            heapq.heappush(heaviest, item)
+        elif item > heaviest[0]:
+            heapq.heapreplace(heaviest, item)
+
+    return {
+        "groups": groups,
+        "columns": totals,
+        "heaviest": [
+            {"dn": dn, "members": count, "bytes": size}
+            for count, size, dn in sorted(heaviest, reverse=True)
+        ],
+        # Bytes transferred for one list page, on average and in the worst case
+        "page": {
+            "rows": page_rows,
+            "average_bytes": all_rows_bytes / groups * min(groups, page_rows) if groups else 0.0,
+            "worst_bytes": sum(largest_rows),
+        },
+    }
+
+def load_group_settings(config_file: str) -> Tuple[Optional[str], List[str]]:
+    """suffix_group and attr_group columns from a LAM server profile"""
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    type_settings = config.get("typeSettings", {})
+    columns = [a.lstrip('#').split(':', 1)[0]
+               for a in type_settings.get("attr_group", "").split(';') if a]
+    return type_settings.get("suffix_group") or config.get("treesuffix"), columns
+
+def print_report(stats: Dict, base: str) -> bool:
+    """Print the analysis; return True if the member column makes lists expensive"""
+    page = stats["page"]
+    print(f"\n{'='*70}")
+    print("Group List Cost")
+    print(f"{'='*70}\n")
+    print(f"  • Base: {base}")
+    print(f"  • Groups scanned: {stats['groups']}")
+    for name, column in stats["columns"].items():
+        average = column["values"] / stats["groups"] if stats["groups"] else 0.0
+        ranged = f", {column['ranged_groups']} needed range retrieval" if column["ranged_groups"] else ""
+        print(f"  • {name}: {column['values']} value(s), {column['bytes'] / 1024:.1f} KB, "
+              f"avg {average:.1f} / max {column['max_values']} per group{ranged}")
+    print(f"  • Per page of {page['rows']} rows: ~{page['average_bytes'] / 1024:.1f} KB average, "
+          f"{page['worst_bytes'] / 1024:.1f} KB worst case")
+
+    if stats["heaviest"] and stats["heaviest"][0]["members"]:
+        print("\nHeaviest groups:")
+        for group in stats["heaviest"]:
+            if group["members"]:
+                print(f"  {group['members']:>8}  {group['bytes'] / 1024:>9.1f} KB  {group['dn']}")
+
+    member = next((c for n, c in stats["columns"].items() if n.lower() == "member"), None)
+    expensive = member is not None and (
+        page["worst_bytes"] > EXPENSIVE_PAGE_BYTES or member["ranged_groups"] > 0
+    )
+    print()
+    if expensive:
+        print("❌ attr_group 'member' makes the group list expensive")
+        print(f"   A list page can transfer {page['worst_bytes'] / 1024:.0f} KB; "
+              f"groups above {RANGE_STEP} members need extra range requests per row")
+        print("   Remove #member from attr_group (LAM still shows members on the group page)")
+    elif member is not None:
+        print("✓ member column is affordable for the current group sizes")
+    else:
+        print("✓ attr_group does not include member")
+    return expensive
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Estimate the cost of attr_group columns (especially member) in LAM group lists"
+    )
+    parser.add_argument("config", nargs="?",
+                        help="LAM server profile to read suffix_group/attr_group from")
+    parser.add_argument("--base", help="Group search base (default: suffix_group from the profile)")
+    parser.add_argument("--columns", help="attr_group-style column list (default: from the profile, "
+                                          "or '#cn;#description;#member')")
+    parser.add_argument("--page-rows", type=positive_int, default=DEFAULT_PAGE_ROWS,
+                        help=f"Rows per LAM list page (default: {DEFAULT_PAGE_ROWS})")
+    parser.add_argument("--top", type=positive_int, default=10, help="Heaviest groups to list (default: 10)")
+    parser.add_argument("--page-size", type=positive_int, default=500,
+                        help="Paged results control page size (default: 500)")
+    parser.add_argument("--container", default=DEFAULT_CONTAINER,
+                        help="Samba AD container for the docker exec backend")
+    parser.add_argument("--base-dn", default=DEFAULT_BASE_DN)
+    parser.add_argument("--ldap-url",
+                        help="Use one pooled LDAP session (ldaps://dc:636, or ldif://dump.ldif) "
+                             "instead of docker exec")
+    parser.add_argument("--bind-dn", help="Default: CN=Administrator,CN=Users,<base-dn>")
+    parser.add_argument("--password", default=os.environ.get("DOMAINPASS", ""),
+                        help="Bind password (default: $DOMAINPASS)")
+    parser.add_argument("--tls-ca-file", help="CA certificate to verify the DC against")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    base, columns = None, []
+    if args.config:
+        if not Path(args.config).exists():
+            print(f"❌ Config file not found: {args.config}")
+            sys.exit(1)
+        base, columns = load_group_settings(args.config)
+    if args.columns:
+        columns = [a.lstrip('#').split(':', 1)[0] for a in args.columns.split(';') if a]
+    columns = columns or ["cn", "description", "member"]
+    base = args.base or base or f"CN=Users,{args.base_dn}"
+
+    bind_dn = args.bind_dn or f"CN=Administrator,CN=Users,{args.base_dn}"
+    from ldap_session import LDAPError
+    if args.ldap_url:
+        from ldap_session import close_sessions, get_session
+        try:
+            session = get_session(args.ldap_url, bind_dn, args.password, args.tls_ca_file)
+        except LDAPError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    else:
+        if not args.password:
+            print("⚠️  No domain password provided (--password or $DOMAINPASS)", file=sys.stderr)
+        session = DockerSearch(args.container, bind_dn, args.password)
+
+    print(f"Measuring {', '.join(columns)} on groups under {base} ({session.url})...")
+    try:
+        stats = measure_groups(session, base, columns, args.page_size, args.top, args.page_rows)
+    except LDAPError as e:
+        print(f"❌ Search under {base} failed: {e}")
+        sys.exit(1)
+    expensive = print_report(stats, base)
+
+    if args.ldap_url:
+        close_sessions()
+    sys.exit(1 if expensive else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Single entry point for schema extraction and validation (fast start for container boot)
+Only the chosen subcommand's module is imported; --profile-startup reports where the time went
+"""
+
+import sys
+import time
+
+STARTED = time.perf_counter()
+
+# Subcommand -> (module, summary); each module keeps its own argparse CLI
+COMMANDS = {
+    "extract-lam": ("extract_lam_schema", "Extract the LAM config schema from source"),
+    "extract-samba": ("extract_samba_schema", "Extract the Samba AD attribute schema"),
+    "validate": ("validate_lam_config", "Validate LAM profiles against the extracted schemas"),
+    "lint-template": ("template_lint", "Validate the profile an Unraid template produces"),
+    "schema-history": ("schema_history", "List, diff and export recorded schema snapshots"),
+}
+
+# Boot-time validation target for one profile, measured from interpreter start of this script
+STARTUP_BUDGET_MS = 100
+
+class ImportProfiler:
+    """Times every first-time import through builtins.__import__ (self and cumulative)"""
+
+    def __init__(self):
+        self.modules = {}  # name -> [self seconds, cumulative seconds]
+        self._stack = []
+        self._original = None
+
+    def __enter__(self):
+        import builtins
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, *exc):
+        import builtins
+        builtins.__import__ = self._original
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level == 0 and name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+        started = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - started
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += cumulative
+            record = self.modules.setdefault(name, [0.0, 0.0])
+            record[0] += cumulative - children
+            record[1] += cumulative
+
+class PhaseRecorder:
+    """Instrumentation hook keeping the phase and per-check times of a validate run"""
+
+    def __init__(self):
+        self.phases = []
+        self.checks = {}
+
+    def __call__(self, event):
+        if event["event"] == "phase":
+            self.phases.append((event["phase"], event["seconds"]))
+        elif event["event"] == "check":
+            self.checks[event["check"]] = self.checks.get(event["check"], 0.0) + event["seconds"]
+
+def print_profile(command: str, imports: ImportProfiler, import_seconds: float,
+                  run_seconds: float, phases: PhaseRecorder, top: int = 10):
+    """Startup report on stderr, so structured output on stdout stays parseable"""
+    out = sys.stderr
+    total_ms = (time.perf_counter() - STARTED) * 1000
+    print(f"\n{'='*70}", file=out)
+    print(f"Startup profile: {command}", file=out)
+    print(f"{'='*70}\n", file=out)
+    print(f"  • Import {COMMANDS[command][0]}: {import_seconds * 1000:.1f} ms "
+          f"({len(imports.modules)} module(s) loaded)", file=out)
+    for name, seconds in phases.phases if phases else []:
+        print(f"  • Phase {name}: {seconds * 1000:.1f} ms", file=out)
+    for name, seconds in sorted(phases.checks.items()) if phases else []:
+        print(f"      check {name}: {seconds * 1000:.2f} ms", file=out)
+    print(f"  • Run {command}: {run_seconds * 1000:.1f} ms", file=out)
+    print(f"  • Total since entry point: {total_ms:.1f} ms "
+          f"(interpreter start-up not included; see python -X importtime)", file=out)
+
+    slowest = sorted(imports.modules.items(), key=lambda item: -item[1][0])[:top]
+    if slowest:
+        print("\nSlowest imports (self / cumulative ms):", file=out)
+        for name, (own, cumulative) in slowest:
+            print(f"  {own * 1000:>8.2f} {cumulative * 1000:>9.2f}  {name}", file=out)
+
+    print(file=out)
+    if total_ms <= STARTUP_BUDGET_MS:
+        print(f"✓ Within the {STARTUP_BUDGET_MS} ms start-up budget", file=out)
+    else:
+        print(f"⚠️  Over the {STARTUP_BUDGET_MS} ms start-up budget by "
+              f"{total_ms - STARTUP_BUDGET_MS:.1f} ms", file=out)
+
+def print_usage(stream=sys.stdout):
+    print("usage: lam_cli.py [--profile-startup] {" + ",".join(COMMANDS) + "} [options]\n",
+          file=stream)
+    print("Schema extraction and validation for the LAM/Samba AD container\n", file=stream)
+    print("commands:", file=stream)
+    for name, (_, summary) in COMMANDS.items():
+        print(f"  {name:<15} {summary}", file=stream)
+    print("\noptions:", file=stream)
+    print("  -h, --help         show this help message and exit", file=stream)
+    print("  --profile-startup  report import, phase and total times on stderr", file=stream)
+    print("\nRun 'lam_cli.py <command> --help' for the options of a command.", file=stream)
+
+def main():
+    argv = sys.argv[1:]
+    profile = "--profile-startup" in argv
+    argv = [arg for arg in argv if arg != "--profile-startup"]
+
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage()
+        sys.exit(0 if argv else 2)
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"❌ Unknown command: {command}\n", file=sys.stderr)
+        print_usage(sys.stderr)
+        sys.exit(2)
+
+    module_name = COMMANDS[command][0]
+    # The subcommand parses sys.argv itself; make its usage line read naturally
+    sys.argv = [f"{sys.argv[0]} {command}"] + rest
+
+    if not profile:
+        __import__(module_name).main()
+        return
+
+    imports = ImportProfiler()
+    started = time.perf_counter()
+    with imports:
+        module = __import__(module_name)
+    import_seconds = time.perf_counter() - started
+
+    phases = None
+    if "validate_lam_config" in sys.modules:
+        from validation_results import add_hook
+        phases = PhaseRecorder()
+        add_hook(phases)
+
+    started = time.perf_counter()
+    try:
+        module.main()
+    finally:
+        print_profile(command, imports, import_seconds, time.perf_counter() - started, phases)
+
+if __name__ == "__main__":
+    main()
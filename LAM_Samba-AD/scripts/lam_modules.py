@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Scan LAM's lib/modules and lib/types trees for per-type attributes and moduleSettings keys
+Every source file is parsed independently, so the scan runs across a process pool
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from php_lexer import Token, evaluate_expression, parse_php_classes
+from schema_index import KEY_PLACEHOLDER
+
+SCAN_DIRS = ["lib/modules", "lib/types"]
+
+# Methods whose bodies carry the data we need; all other bodies are skipped
+BODY_METHODS = frozenset({
+    "get_metaData", "can_manage", "get_configOptions", "getListAttributeDescriptions"
+})
+
+# Config widgets LAM renders for module options, and the values each one stores.
+# Every moduleSettings value is a list of strings; the shape says what it holds.
+WIDGET_SHAPES = {
+    "htmlResponsiveInputCheckbox": "boolean",
+    "htmlInputCheckbox": "boolean",
+    "htmlResponsiveInputField": "string",
+    "htmlInputField": "string",
+    "htmlResponsiveInputTextarea": "text",
+    "htmlInputTextarea": "text",
+    "htmlResponsiveSelect": "select",
+    "htmlSelect": "select",
+    "htmlResponsiveRadio": "select",
+    "htmlRadio": "select",
+}
+
+def _string_values(tokens: List[Token]) -> List[str]:
+    return [text for kind, text in tokens if kind == 'string']
+
+def _assigned_arrays(tokens: List[Token], key: str) -> List[Any]:
+    """Values assigned to $x['key'] = ... in a token list"""
+    values = []
+    for i in range(len(tokens) - 3):
+        if tokens[i] == ('op', '[') and tokens[i + 1] == ('string', key) \
+                and tokens[i + 2] == ('op', ']') and tokens[i + 3] == ('op', '='):
+            value, _ = evaluate_expression(tokens, i + 4)
+            values.append(value)
+    return values
+
+def _key_template(tokens: List[Token], start: int) -> Tuple[Optional[str], int]:
+    """Read one call argument made of string literals joined by '.'
+
+    Variables and calls become KEY_PLACEHOLDER. Returns (template, next position);
+    the template is None when the argument has no string literal at all.
+    """
+    parts = []
+    literal = False
+    depth = 0
+    pos = start
+    while pos < len(tokens):
+        kind, text = tokens[pos]
+        if depth == 0 and text in (',', ')'):
+            break
+        depth += text in ('(', '[')
+        depth -= text in (')', ']')
+        if depth == 0 and kind == 'string':
+            parts.append(text)
+            literal = True
+        elif depth == 0 and kind in ('var', 'name') and (not parts or parts[-1] != KEY_PLACEHOLDER):
+            parts.append(KEY_PLACEHOLDER)
+        pos += 1
+    return (''.join(parts) if literal else None), pos
+
+def _config_option_keys(module: str, tokens: List[Token]) -> Dict[str, str]:
+    """{key: shape} for every '<module>_...' option widget built in get_configOptions"""
+    keys = {}
+    prefix = f"{module}_"
+    for i in range(len(tokens) - 2):
+        if tokens[i] != ('name', 'new') or tokens[i + 2] != ('op', '('):
+            continue
+        widget = tokens[i + 1][1].lstrip('\\')
+        shape = WIDGET_SHAPES.get(widget)
+        if shape is None:
+            continue
+        pos = i + 3
+        while pos < len(tokens) and tokens[pos][1] != ')':
+            template, pos = _key_template(tokens, pos)
+            if template and template.startswith(prefix) and ' ' not in template:
+                keys.setdefault(template, shape)
+                break
+            pos += 1  # ','
+    return keys
+
+def scan_source_file(path: str) -> Dict[str, Any]:
+    """Parse one module or type file into {"modules": {...}, "types": {...}}"""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        classes = parse_php_classes(f.read(), BODY_METHODS)
+
+    result: Dict[str, Dict[str, Any]] = {"modules": {}, "types": {}}
+    for name, cls in classes.items():
+        bodies = cls.get("bodies", {})
+        parent = cls.get("extends", "").lstrip('\\')
+
+        if "getListAttributeDescriptions" in bodies or parent == "baseType":
+            list_attributes: List[str] = []
+            tokens = bodies.get("getListAttributeDescriptions", [])
+            for i, token in enumerate(tokens):
+                if token[1] in ('return', '=') and i + 1 < len(tokens):
+                    value, _ = evaluate_expression(tokens, i + 1)
+                    if isinstance(value, dict):
+                        list_attributes.extend(value)
+            result["types"][name] = {"listAttributes": list_attributes}
+            continue
+
+        if "get_metaData" not in bodies and "can_manage" not in bodies:
+            continue
+
+        meta = bodies.get("get_metaData", [])
+        attributes = []
+        for value in _assigned_arrays(meta, "attributes"):
+            if isinstance(value, list):
+                attributes.extend(v for v in value if isinstance(v, str))
+        # Older modules list their scopes as account_types, newer ones in can_manage()
+        types = []
+        for value in _assigned_arrays(meta, "account_types"):
+            if isinstance(value, list):
+                types.extend(v for v in value if isinstance(v, str))
+        types.extend(_string_values(bodies.get("can_manage", [])))
+
+        result["modules"][name] = {
+            "types": sorted(set(types)),
+            "attributes": sorted(set(attributes), key=str.lower),
+            "settings": _config_option_keys(name, bodies.get("get_configOptions", [])),
+        }
+    return result
+
+def find_source_files(lam_source_path: Path) -> List[Path]:
+    files = []
+    for directory in SCAN_DIRS:
+        root = lam_source_path / directory
+        if root.is_dir():
+            files.extend(sorted(root.rglob("*.inc")))
+    return files
+
+def scan_lam_tree(lam_source_path: Path, jobs: int = 0) -> Dict[str, Any]:
+    """Scan every module/type file and merge the per-file results
+
+    Returns {"modules": {module: {types, attributes}}, "typeAttributes": {type: [...]},
+    "moduleSettings": {key: {"module", "shape"}}}.
+    """
+    files = find_source_files(lam_source_path)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(files) > 1:
+        from concurrent.futures import ProcessPoolExecutor  # Deferred: costly to import
+        with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+            results = list(executor.map(scan_source_file, map(str, files),
+                                        chunksize=max(1, len(files) // (jobs * 4))))
+    else:
+        results = [scan_source_file(str(path)) for path in files]
+
+    modules: Dict[str, Dict[str, Any]] = {}
+    type_classes: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        modules.update(result["modules"])
+        type_classes.update(result["types"])
+
+    type_attributes: Dict[str, Dict[str, str]] = {}
+    for type_name, info in type_classes.items():
+        bucket = type_attributes.setdefault(type_name, {})
+        for attr in info["listAttributes"]:
+            bucket.setdefault(attr.lower(), attr)
+    module_settings = {}
+    for module_name, info in modules.items():
+        for type_name in info["types"]:
+            bucket = type_attributes.setdefault(type_name, {})
+            for attr in info["attributes"]:
+                bucket.setdefault(attr.lower(), attr)
+        for key, shape in info.pop("settings").items():
+            module_settings[key] = {"module": module_name, "shape": shape}
+
+    print(f"  • Scanned {len(files)} files: {len(modules)} modules, {len(type_classes)} types")
+    return {
+        "modules": dict(sorted(modules.items())),
+        "typeAttributes": {
+            type_name: sorted(bucket.values(), key=str.lower)
+            for type_name, bucket in sorted(type_attributes.items())
+        },
+        "moduleSettings": dict(sorted(module_settings.items())),
+    }
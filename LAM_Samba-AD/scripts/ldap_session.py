@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Pooled LDAP sessions for the extraction and validation scripts
+Talks to a DC with ldap3 when installed, or to an LDIF dump as a local stand-in
+"""
+
+import re
+import ssl
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ldif_reader import Entry, Value, iter_ldif_entries, parse_range, split_attribute_description
+
+try:
+    import ldap3
+    from ldap3.core.exceptions import LDAPException
+except ImportError:  # Optional: only needed for live LDAP sessions (requirements.txt)
+    ldap3 = None
+    LDAPException = ()  # Catches nothing; sessions refuse to open without ldap3
+
+RDN = List[Tuple[str, str]]
+
+# Characters that need an escape inside an RFC 4514 attribute value
+_DN_SPECIAL = set('"+,;<>\\')
+_DN_PLAIN = re.compile(r'[\\"+;<>#]')
+_HEX_ESCAPE = re.compile(r'\\[0-9a-fA-F]{2}')
+
+def parse_dn(dn: str) -> List[RDN]:
+    """Split a DN into RDNs of (type, value) pairs, undoing RFC 4514 escapes
+
+    Whitespace around separators is dropped, escaped spaces are kept, and
+    \\XX hex pairs are decoded as UTF-8. Raises ValueError for malformed DNs.
+    """
+    rdns: List[RDN] = []
+    rdn: RDN = []
+    attr_type: Optional[str] = None
+    type_chars: List[str] = []
+    value = ""
+    kept = 0  # length of value up to the last escaped character (never stripped)
+    i = 0
+
+    while i < len(dn):
+        char = dn[i]
+        if attr_type is None:
+            if char == '=':
+                attr_type = ''.join(type_chars).strip()
+                if not attr_type:
+                    raise ValueError(f"Missing attribute type in DN: {dn}")
+                type_chars = []
+                # Leading spaces of a value are insignificant unless escaped
+                while dn[i + 1:i + 2] == ' ':
+                    i += 1
+            elif char in ',;+':
+                raise ValueError(f"Missing '=' in DN component: {dn}")
+            else:
+                type_chars.append(char)
+        elif char == '\\':
+            raw = bytearray()
+            while _HEX_ESCAPE.match(dn, i):
+                raw.append(int(dn[i + 1:i + 3], 16))
+                i += 3
+            if raw:
+                try:
+                    value += raw.decode('utf-8')
+                except UnicodeDecodeError:
+                    raise ValueError(f"Invalid UTF-8 escape in DN: {dn}")
+                i -= 1
+            elif dn[i + 1:i + 2] and dn[i + 1] in _DN_SPECIAL | {' ', '#', '='}:
+                value += dn[i + 1]
+                i += 1
+            else:
+                raise ValueError(f"Invalid escape in DN: {dn}")
+            kept = len(value)
+        elif char in ',;+':
+            rdn.append((attr_type, value[:kept] + value[kept:].rstrip(' ')))
+            attr_type, value, kept = None, "", 0
+            if char != '+':
+                rdns.append(rdn)
+                rdn = []
+        else:
+            value += char
+        i += 1
+
+    if attr_type is None:
+        if ''.join(type_chars).strip():
+            raise ValueError(f"Missing '=' in DN component: {dn}")
+        if rdn or rdns:
+            raise ValueError(f"Trailing separator in DN: {dn}")
+        return rdns
+    rdn.append((attr_type, value[:kept] + value[kept:].rstrip(' ')))
+    rdns.append(rdn)
+    return rdns
+
+def _escape_dn_value(value: str) -> str:
+    escaped = ''.join('\\' + c if c in _DN_SPECIAL else c for c in value)
+    if escaped.startswith((' ', '#')):
+        escaped = '\\' + escaped
+    if escaped.endswith(' ') and not escaped.endswith('\\ '):
+        escaped = escaped[:-1] + '\\ '
+    return escaped
+
+def canonical_dn(dn: str) -> str:
+    """RFC 4514 string form with lower-cased types and values and sorted multi-valued RDNs
+
+    Two spellings of the same AD DN (case, spacing, escaping) give the same
+    result. Raises ValueError for malformed DNs.
+    """
+    return ','.join(
+        '+'.join(f"{t.lower()}={_escape_dn_value(v.lower())}"
+                 for t, v in sorted(rdn, key=lambda ava: ava[0].lower()))
+        for rdn in parse_dn(dn)
+    )
+
+def normalize_dn(dn: str) -> str:
+    """Canonical DN for comparisons; malformed DNs are only lower-cased and trimmed"""
+    if not _DN_PLAIN.search(dn):
+        # Fast path for the common case: no escapes, quoting or multi-valued RDNs
+        parts = []
+        for part in dn.lower().split(','):
+            attr_type, sep, value = part.partition('=')
+            if not sep:
+                break
+            parts.append(f"{attr_type.strip()}={value.strip()}")
+        else:
+            return ','.join(parts)
+    try:
+        return canonical_dn(dn)
+    except ValueError:
+        return ','.join(part.strip() for part in dn.lower().split(','))
+
+def escape_filter_value(value: str) -> str:
+    """Escape an assertion value for an RFC 4515 search filter"""
+    return ''.join(f"\\{ord(c):02x}" if c in '*()\\\0' else c for c in value)
+
+def _unescape_filter_value(value: str) -> str:
+    return re.sub(r'\\([0-9a-fA-F]{2})', lambda m: chr(int(m.group(1), 16)), value)
+
+class LDAPError(Exception):
+    """Raised when an LDAP session cannot bind or search"""
+
+class LDAPSession:
+    """One bound ldap3 connection, reused for every search against a DC"""
+
+    def __init__(self, url: str, bind_dn: str, password: str, tls_ca_file: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        if ldap3 is None:
+            raise LDAPError("ldap3 is not installed (pip install -r requirements.txt)")
+
+        self.url = url
+        try:
+            # Samba AD ships a self-signed certificate unless a CA is provided
+            tls = ldap3.Tls(
+                validate=ssl.CERT_REQUIRED if tls_ca_file else ssl.CERT_NONE,
+                ca_certs_file=tls_ca_file
+            )
+            server = ldap3.Server(url, use_ssl=url.lower().startswith("ldaps://"),
+                                  tls=tls, get_info=ldap3.NONE, connect_timeout=timeout)
+            # auto_range=False: ldap3 would otherwise follow 'member;range=' replies itself and
+            # hand back the whole attribute; callers page through ranges (group_member_cost.py)
+            self.connection = ldap3.Connection(server, user=bind_dn, password=password,
+                                               read_only=True, raise_exceptions=False,
+                                               receive_timeout=timeout, auto_range=False)
+            bound = self.connection.bind()
+        except LDAPException as e:
+            # Socket, TLS and timeout errors are raised even with raise_exceptions=False
+            raise LDAPError(f"Cannot connect to {url}: {e}") from e
+        if not bound:
+            raise LDAPError(f"Bind to {url} as {bind_dn} failed: {self.connection.result}")
+
+    def search(self, base: str, search_filter: str, attributes: List[str],
+               scope: str = "sub", page_size: int = 1000) -> Iterator[Entry]:
+        """Paged search yielding (dn, {attribute: [values]})
+
+        Raises LDAPError when the server refuses a page (bad base, no
+        permission, time limit) instead of ending the results early.
+        """
+        ldap_scope = {"base": ldap3.BASE, "one": ldap3.LEVEL, "sub": ldap3.SUBTREE}[scope]
+        try:
+            results = self.connection.extend.standard.paged_search(
+                base, search_filter, search_scope=ldap_scope, attributes=attributes,
+                paged_size=page_size, generator=True
+            )
+            for result in results:
+                if result.get("type") != "searchResEntry":
+                    continue
+                attrs = {
+                    name: [_decode(v) for v in values]
+                    for name, values in result["raw_attributes"].items()
+                }
+                yield result["dn"], attrs
+        except LDAPException as e:
+            raise LDAPError(f"Search under {base} on {self.url} failed: {e}") from e
+        # The paged search generator stops quietly on an error result
+        outcome = self.connection.result or {}
+        if outcome.get("result", 0) != 0:
+            raise LDAPError(f"Search under {base} on {self.url} failed: "
+                            f"{outcome.get('description', '')} {outcome.get('message', '')}".strip())
+
+    def close(self):
+        self.connection.unbind()
+
+def _decode(raw: bytes) -> Value:
+    """Text values as str, binary data (photos, SIDs) left as bytes"""
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw
+
+class LDIFDirectory:
+    """Read-only stand-in server answering searches from an LDIF dump
+
+    Supports the filter subset used by these scripts: &, |, !, equality,
+    presence, substrings and >=/<= comparisons. Like AD, attributes with more
+    than max_value_range values are returned in ranges ('member;range=0-1499')
+    and can be read further with 'member;range=1500-*' requests.
+    """
+
+    max_value_range = 1500  # AD MaxValRange default
+
+    def __init__(self, ldif_file: str):
+        self.url = f"ldif://{ldif_file}"
+        self.entries = []
+        with open(ldif_file, 'r', encoding='utf-8') as f:
+            for dn, attrs in iter_ldif_entries(f):
+                lowered = {k.lower(): (k, v) for k, v in attrs.items()}
+                # AD returns distinguishedName as a real attribute; dumps often omit it
+                lowered.setdefault("distinguishedname", ("distinguishedName", [dn]))
+                self.entries.append((dn, normalize_dn(dn), lowered))
+
+    def search(self, base: str, search_filter: str, attributes: List[str],
+               scope: str = "sub", page_size: int = 1000) -> Iterator[Entry]:
+        base_norm = normalize_dn(base) if base else ""
+        matcher = _compile_filter(search_filter)
+        wanted: Optional[Dict[str, Tuple[int, Optional[int]]]] = None
+        if attributes and "*" not in attributes:
+            wanted = {}
+            for description in attributes:
+                name, options = split_attribute_description(description)
+                wanted[name.lower()] = parse_range(options)
+
+        for dn, dn_norm, attrs in self.entries:
+            if not _in_scope(dn_norm, base_norm, scope) or not matcher(attrs):
+                continue
+            result = {}
+            for key, (name, values) in attrs.items():
+                if wanted is not None and key not in wanted:
+                    continue
+                low, high = wanted[key] if wanted is not None else (0, None)
+                result.update(self._ranged(name, values, low, high))
+            yield dn, result
+
+    def _ranged(self, name: str, values: List[Value], low: int,
+                high: Optional[int]) -> Dict[str, List[Value]]:
+        """Apply AD range retrieval: at most max_value_range values per reply"""
+        if low == 0 and high is None and len(values) <= self.max_value_range:
+            return {name: list(values)}
+        last = len(values) - 1 if high is None else min(high, len(values) - 1)
+        last = min(last, low + self.max_value_range - 1)
+        end = '*' if last >= len(values) - 1 else str(last)
+        return {f"{name};range={low}-{end}": list(values[low:last + 1])}
+
+    def close(self):
+        pass
+
+def _in_scope(dn: str, base: str, scope: str) -> bool:
+    if scope == "base":
+        return dn == base
+    if base:
+        if dn == base:
+            return scope == "sub"
+        if not dn.endswith("," + base):
+            return False
+        relative = dn[:-(len(base) + 1)]
+    else:
+        relative = dn
+    return scope == "sub" or ',' not in relative
+
+_TOKEN = re.compile(r'\(|\)|[^()]+')
+
+def _compile_filter(search_filter: str):
+    """Compile an RFC 4515 filter string into a predicate over lower-cased attrs"""
+    tokens = [t for t in _TOKEN.findall(search_filter.strip()) if t.strip()]
+    if not tokens or tokens[0] != '(':
+        tokens = ['('] + tokens + [')']
+    try:
+        matcher, _ = _parse_filter(tokens, 0)
+    except IndexError:
+        raise LDAPError(f"Malformed filter: {search_filter}")
+    return matcher
+
+def _parse_filter(tokens: List[str], pos: int):
+    if tokens[pos] != '(':
+        raise LDAPError(f"Malformed filter near: {''.join(tokens[pos:])}")
+    pos += 1
+    head = tokens[pos]
+
+    if head in ('&', '|', '!') or head[0] in '&|!':
+        op = head[0]
+        pos += 1
+        children = []
+        while tokens[pos] == '(':
+            child, pos = _parse_filter(tokens, pos)
+            children.append(child)
+        pos += 1  # closing ')'
+        if op == '&':
+            return (lambda attrs: all(c(attrs) for c in children)), pos
+        if op == '|':
+            return (lambda attrs: any(c(attrs) for c in children)), pos
+        return (lambda attrs: not children[0](attrs)), pos
+
+    pos += 2  # item and closing ')'
+    return _compile_item(head), pos
+
+def _compile_item(item: str):
+    match = re.match(r'([\w;.-]+)\s*(>=|<=|~=|=)(.*)', item)
+    if not match:
+        raise LDAPError(f"Unsupported filter item: ({item})")
+    name, op, expected = match.group(1).lower(), match.group(2), match.group(3)
+
+    def values(attrs: Dict) -> List[str]:
+        return [v for v in attrs.get(name, (None, []))[1] if isinstance(v, str)]
+
+    if op == '=' and expected == '*':
+        return lambda attrs: bool(values(attrs))
+    if op in ('>=', '<='):
+        def compare(attrs: Dict) -> bool:
+            for value in values(attrs):
+                a, b = (int(value), int(expected)) if value.lstrip('-').isdigit() \
+                    and expected.lstrip('-').isdigit() else (value.lower(), expected.lower())
+                if (a >= b) if op == '>=' else (a <= b):
+                    return True
+            return False
+        return compare
+    if '*' in expected:
+        pattern = re.compile(
+            '^' + '.*'.join(re.escape(_unescape_filter_value(p)) for p in expected.split('*')) + '$',
+            re.IGNORECASE | re.DOTALL
+        )
+        return lambda attrs: any(pattern.match(v) for v in values(attrs))
+
+    expected = _unescape_filter_value(expected)
+    expected_lower = expected.lower()
+    if name == 'distinguishedname':
+        expected_lower = normalize_dn(expected)
+        return lambda attrs: any(normalize_dn(v) == expected_lower for v in values(attrs))
+    return lambda attrs: any(v.lower() == expected_lower for v in values(attrs))
+
+def open_session(url: str, bind_dn: str = "", password: str = "",
+                 tls_ca_file: Optional[str] = None, timeout: Optional[float] = None):
+    """Open a new, unpooled session for an ldap(s):// URL or an ldif:// stand-in file
+
+    timeout (seconds) bounds the connect and each network read. The caller closes it.
+    """
+    if url.startswith("ldif://"):
+        ldif_file = url[len("ldif://"):]
+        if not Path(ldif_file).exists():
+            raise LDAPError(f"LDIF file not found: {ldif_file}")
+        return LDIFDirectory(ldif_file)
+    return LDAPSession(url, bind_dn, password, tls_ca_file, timeout)
+
+# Sessions are pooled per (url, bind DN) so repeated calls reuse one bind; the lock
+# keeps two threads from binding the same key twice (a session itself is not thread-safe)
+_sessions: Dict[Tuple[str, str], object] = {}
+_sessions_lock = threading.Lock()
+
+def get_session(url: str, bind_dn: str = "", password: str = "",
+                tls_ca_file: Optional[str] = None, timeout: Optional[float] = None):
+    """Return a pooled session for an ldap(s):// URL or an ldif:// stand-in file
+
+    timeout (seconds) bounds the connect and each network read of a new session.
+    """
+    key = (url, bind_dn)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = open_session(url, bind_dn, password, tls_ca_file, timeout)
+            _sessions[key] = session
+    return session
+
+def close_sessions():
+    """Unbind every pooled session"""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        try:
+            session.close()
+        except Exception as e:  # Best effort on shutdown
+            print(f"⚠️  Failed to close LDAP session: {e}", file=sys.stderr)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Streaming LDIF reader shared by the extraction scripts
+Parses ldapsearch/ldbsearch output into (dn, attributes) entries one at a time
+"""
+
+import argparse
+import base64
+import sys
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+Value = Union[str, bytes]
+Entry = Tuple[str, Dict[str, List[Value]]]
+
+def positive_int(text: str) -> int:
+    """argparse type for page sizes and row counts (>= 1)"""
+    value = int(text) if text.lstrip('-').isdigit() else None
+    if value is None or value < 1:
+        raise argparse.ArgumentTypeError(f"must be a whole number >= 1, not {text!r}")
+    return value
+
+def non_negative_int(text: str) -> int:
+    """argparse type for sample limits where 0 means no limit"""
+    value = int(text) if text.lstrip('-').isdigit() else None
+    if value is None or value < 0:
+        raise argparse.ArgumentTypeError(f"must be a whole number >= 0 (0 = no limit), not {text!r}")
+    return value
+
+def _unfold(lines: Iterable[str]) -> Iterator[str]:
+    """Join RFC 2849 continuation lines (leading single space) onto their parent"""
+    pending = None
+    for raw in lines:
+        line = raw.rstrip('\r\n')
+        if line.startswith(' ') and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending is not None:
+        yield pending
+
+def _decode_value(encoded: str) -> Value:
+    """Decode an 'attr:: base64' value, keeping binary data (photos, SIDs) as bytes"""
+    raw = base64.b64decode(encoded)
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw
+
+def split_attribute_description(description: str) -> Tuple[str, List[str]]:
+    """Split 'member;range=0-1499' into ('member', ['range=0-1499'])"""
+    name, *options = description.split(';')
+    return name, options
+
+def base_attribute(description: str) -> str:
+    return description.split(';', 1)[0]
+
+def parse_range(options: List[str]) -> Tuple[int, Union[int, None]]:
+    """Return (low, high) from a range=low-high option; high is None for '*'"""
+    for option in options:
+        if option.lower().startswith('range='):
+            low, high = option[len('range='):].split('-', 1)
+            return int(low), None if high == '*' else int(high)
+    return 0, None
+
+def iter_ldif_entries(lines: Iterable[str]) -> Iterator[Entry]:
+    """Yield (dn, {attribute: [values]}) for each record in LDIF text lines
+
+    Consumes lines lazily, so an open pipe can be parsed in constant memory.
+    Attribute descriptions keep their options (e.g. 'member;range=0-1499').
+    """
+    dn = None
+    attrs: Dict[str, List[Value]] = {}
+
+    for line in _unfold(lines):
+        if not line:
+            if dn is not None:
+                yield dn, attrs
+            dn, attrs = None, {}
+            continue
+        if line.startswith('#') or ':' not in line:
+            continue
+
+        name, value = line.split(':', 1)
+        if value.startswith(':'):
+            value = _decode_value(value[1:].strip())
+        elif value.startswith('<'):
+            value = value[1:].strip()  # URL reference, kept verbatim
+        else:
+            value = value[1:] if value.startswith(' ') else value
+
+        if name.lower() == 'dn':
+            dn = value.decode('utf-8', errors='replace') if isinstance(value, bytes) else value
+        elif dn is not None:
+            attrs.setdefault(name, []).append(value)
+        # Anything before the first dn (e.g. 'version: 1') is ignored
+
+    if dn is not None:
+        yield dn, attrs
+
+def stream_command_lines(command: List[str]) -> Iterator[str]:
+    """Run a command and yield its stdout line by line while it is still running
+
+    Closing the generator early (e.g. once a sample is complete) terminates
+    the command instead of reading the rest of its output.
+    """
+    import subprocess  # Deferred: only the docker exec paths spawn commands
+    import tempfile
+    
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr,
+                                   text=True, encoding='utf-8', errors='replace')
+        finished = False
+        try:
+            yield from process.stdout
+            finished = True
+        finally:
+            if not finished:
+                process.terminate()
+            process.stdout.close()
+            returncode = process.wait()
+
+        if finished and returncode != 0:
+            stderr.seek(0)
+            print(f"❌ Command failed: {' '.join(command)}", file=sys.stderr)
+            print(f"   Error: {stderr.read().decode('utf-8', errors='replace')}", file=sys.stderr)
+
+def count_attribute_occurrences(entries: Iterable[Entry]) -> Tuple[int, Counter]:
+    """Count entries and how many of them populate each attribute (options ignored)"""
+    total = 0
+    counts: Counter = Counter()
+    for _, attrs in entries:
+        total += 1
+        counts.update({base_attribute(name) for name in attrs})
+    return total, counts
+
+def sample_attribute_occurrences(entries: Iterable[Entry], page_size: int = 1000,
+                                 max_entries: int = 0,
+                                 stable_pages: int = 0) -> Tuple[int, Counter, str]:
+    """Like count_attribute_occurrences, but stop early once a sample is enough
+
+    Stops after max_entries entries, or once the set of attribute names has not
+    grown for stable_pages consecutive pages of page_size entries (0 disables
+    either limit). Returns (entries seen, counts, stop reason).
+    """
+    if page_size < 1:
+        raise ValueError(f"page_size must be >= 1, not {page_size}")
+    total = 0
+    counts: Counter = Counter()
+    known = 0
+    unchanged_pages = 0
+
+    iterator = iter(entries)
+    try:
+        for _, attrs in iterator:
+            total += 1
+            counts.update({base_attribute(name) for name in attrs})
+
+            if max_entries and total >= max_entries:
+                return total, counts, f"sample limit of {max_entries} entries reached"
+            if stable_pages and total % page_size == 0:
+                unchanged_pages = unchanged_pages + 1 if len(counts) == known else 0
+                known = len(counts)
+                if unchanged_pages >= stable_pages:
+                    return total, counts, f"attribute set stable for {stable_pages} page(s)"
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close:
+            close()  # Abandon remaining pages / terminate the producer
+
+    return total, counts, "all entries scanned"
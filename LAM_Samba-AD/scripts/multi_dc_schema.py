@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Extract the schema partition from several DCs/containers at once and report drift between them
+Targets are read concurrently (bounded, with per-target timeouts), so a run takes about as long as the slowest DC
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from extract_samba_schema import (DEFAULT_BASE_DN, SAM_LDB, SCHEMA_ATTRIBUTES, SCHEMA_FILTER,
+                                  parse_schema_partition, partition_hash, schema_dn)
+from ldif_reader import iter_ldif_entries
+
+OUTPUT_FILE = "docs/reference/samba-schema-dcs.json"
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 120.0
+
+class Target:
+    """One DC to read: docker://<container>, ldap(s)://<host>[:port] or ldif://<dump>"""
+
+    def __init__(self, spec: str):
+        name, sep, url = spec.partition('=')
+        if not sep or '://' in name:
+            name, url = "", spec
+        if '://' not in url:
+            url = f"docker://{url}"  # A bare name is a local container
+        self.url = url
+        self.scheme = url.split('://', 1)[0].lower()
+        if self.scheme not in ("docker", "ldap", "ldaps", "ldif"):
+            raise ValueError(f"Unsupported target {spec!r} (use docker://, ldap(s):// or ldif://)")
+        location = url.split('://', 1)[1]
+        self.name = name or (Path(location).stem if self.scheme == "ldif"
+                             else location.split(':', 1)[0])
+
+async def read_via_docker(container: str, base_dn: str) -> Dict:
+    """ldbsearch inside the container as an asyncio subprocess (killed on timeout)"""
+    process = await asyncio.create_subprocess_exec(
+        "docker", "exec", container, "ldbsearch", "-H", SAM_LDB,
+        "-b", schema_dn(base_dn), "-s", "one", SCHEMA_FILTER, *SCHEMA_ATTRIBUTES,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode != 0:
+        raise RuntimeError(stderr.decode('utf-8', errors='replace').strip()
+                           or f"ldbsearch exited with {process.returncode}")
+    lines = stdout.decode('utf-8', errors='replace').splitlines(keepends=True)
+    return parse_schema_partition(iter_ldif_entries(lines))
+
+def read_via_session(url: str, base_dn: str, bind_dn: str, password: str,
+                     tls_ca_file: Optional[str], timeout: float) -> Dict:
+    """Blocking LDAP read, run on a worker thread; timeout also bounds the socket reads
+
+    Each target gets its own session: pooled sessions are shared and not thread-safe.
+    """
+    from ldap_session import open_session
+    session = open_session(url, bind_dn, password, tls_ca_file, timeout)
+    try:
+        return parse_schema_partition(session.search(
+            schema_dn(base_dn), SCHEMA_FILTER, SCHEMA_ATTRIBUTES, scope="one"
+        ))
+    finally:
+        session.close()
+
+async def extract_target(target: Target, args: argparse.Namespace, limit: asyncio.Semaphore,
+                         executor: ThreadPoolExecutor) -> Dict:
+    """Read one target's schema partition; failures and timeouts are returned, not raised"""
+    from ldap_session import LDAPError
+
+    async with limit:
+        started = time.perf_counter()
+        result = {"name": target.name, "url": target.url}
+        try:
+            if target.scheme == "docker":
+                work = read_via_docker(target.url.split('://', 1)[1], args.base_dn)
+            else:
+                bind_dn = args.bind_dn or f"CN=Administrator,CN=Users,{args.base_dn}"
+                work = asyncio.get_running_loop().run_in_executor(
+                    executor, read_via_session, target.url, args.base_dn, bind_dn,
+                    args.password, args.tls_ca_file, args.timeout
+                )
+            partition = await asyncio.wait_for(work, args.timeout)
+        except asyncio.TimeoutError:
+            result["error"] = f"timed out after {args.timeout:.0f}s"
+        except (LDAPError, OSError, RuntimeError, ValueError) as e:
+            result["error"] = str(e)
+        else:
+            result["partition"] = partition
+        result["seconds"] = time.perf_counter() - started
+
+    if "error" in result:
+        print(f"❌ {target.name}: {result['error']} ({result['seconds']:.1f}s)", flush=True)
+    else:
+        print(f"✓ {target.name}: {len(partition['attributes'])} attributes, "
+              f"{len(partition['classes'])} classes ({result['seconds']:.1f}s)", flush=True)
+    return result
+
+async def extract_all(targets: List[Target], args: argparse.Namespace) -> List[Dict]:
+    limit = asyncio.Semaphore(max(1, args.concurrency))
+    # Own executor so a hung LDAP thread cannot block asyncio.run() shutdown
+    executor = ThreadPoolExecutor(max_workers=max(1, args.concurrency))
+    try:
+        # return_exceptions: an unexpected error on one DC must not discard the others' results
+        outcomes = await asyncio.gather(*(extract_target(t, args, limit, executor) for t in targets),
+                                        return_exceptions=True)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    for target, outcome in zip(targets, outcomes):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                raise outcome  # KeyboardInterrupt, SystemExit
+            print(f"❌ {target.name}: {type(outcome).__name__}: {outcome}", flush=True)
+            outcome = {"name": target.name, "url": target.url, "seconds": 0.0,
+                       "error": f"{type(outcome).__name__}: {outcome}"}
+        results.append(outcome)
+    return results
+
+def _normalize_class(info: Dict) -> Dict:
+    # must/may/auxiliary come back in server order; compare them as sets
+    return {k: sorted(v) if isinstance(v, list) else v for k, v in info.items()}
+
+def _consensus(tables: Dict[str, Dict[str, Dict]]) -> Tuple[Dict[str, Dict], Dict[str, List[str]]]:
+    """Definition held by the most DCs per name, and which DCs have each name
+
+    A name is part of the consensus when a majority of DCs have it.
+    """
+    holders: Dict[str, List[str]] = {}
+    for dc, table in tables.items():
+        for name in table:
+            holders.setdefault(name, []).append(dc)
+
+    consensus = {}
+    for name, dcs in holders.items():
+        if len(dcs) * 2 <= len(tables):
+            continue
+        votes: Dict[str, Tuple[int, Dict]] = {}
+        for dc in sorted(dcs):
+            key = json.dumps(tables[dc][name], sort_keys=True)
+            count, info = votes.get(key, (0, tables[dc][name]))
+            votes[key] = (count + 1, info)
+        consensus[name] = max(votes.values(), key=lambda vote: vote[0])[1]
+    return consensus, holders
+
+def compare_partitions(partitions: Dict[str, Dict]) -> Tuple[Dict, Dict[str, Dict]]:
+    """Merged schema over all DCs plus per-DC drift from the majority view"""
+    merged = {}
+    drift = {dc: {} for dc in partitions}
+    for section, normalize in (("attributes", dict), ("classes", _normalize_class)):
+        tables = {dc: {name: normalize(info) for name, info in p[section].items()}
+                  for dc, p in partitions.items()}
+        consensus, holders = _consensus(tables)
+
+        # Merged view: the consensus plus names only a minority of DCs have
+        section_merged = {}
+        for name in sorted(holders):
+            info = consensus.get(name) or tables[holders[name][0]][name]
+            entry = dict(info)
+            if len(holders[name]) < len(partitions):
+                entry["present_on"] = sorted(holders[name])
+            section_merged[name] = entry
+        merged[section] = section_merged
+
+        for dc, table in tables.items():
+            missing = sorted(set(consensus) - set(table))
+            extra = sorted(set(table) - set(consensus))
+            changed = sorted(name for name in set(table) & set(consensus)
+                             if table[name] != consensus[name])
+            for kind, names in (("missing", missing), ("extra", extra), ("changed", changed)):
+                if names:
+                    drift[dc][f"{kind}_{section}"] = names
+    return merged, drift
+
+def print_report(results: List[Dict], drift: Dict[str, Dict], elapsed: float):
+    succeeded = [r for r in results if "partition" in r]
+    hashes = {partition_hash(r["partition"]) for r in succeeded}
+
+    print(f"\n{'='*70}")
+    print("Schema Comparison Across DCs")
+    print(f"{'='*70}\n")
+    for result in results:
+        if "partition" in result:
+            partition = result["partition"]
+            print(f"  • {result['name']} ({result['url']}): {len(partition['attributes'])} attributes, "
+                  f"{len(partition['classes'])} classes, hash {partition_hash(partition)[:12]}, "
+                  f"{result['seconds']:.1f}s")
+        else:
+            print(f"  • {result['name']} ({result['url']}): FAILED - {result['error']}")
+
+    slowest = max((r["seconds"] for r in results), default=0.0)
+    total = sum(r["seconds"] for r in results)
+    print(f"\n  • Wall time: {elapsed:.1f}s (slowest DC {slowest:.1f}s, "
+          f"{total:.1f}s if run one after another)")
+
+    if len(succeeded) < 2:
+        print("\n⚠️  Fewer than two DCs answered; nothing to compare")
+    elif len(hashes) == 1:
+        print("\n✓ All DCs have identical schema partitions")
+    else:
+        print()
+        for dc, changes in drift.items():
+            if not changes:
+                print(f"✓ {dc}: matches the majority schema")
+                continue
+            print(f"⚠️  {dc}: differs from the majority schema")
+            for kind, names in changes.items():
+                shown = ', '.join(names[:10]) + (f" (+{len(names) - 10} more)" if len(names) > 10 else "")
+                print(f"   {kind.replace('_', ' ')}: {shown}")
+            if any(k.startswith("extra_") for k in changes):
+                print("   Extra objects: a schema extension applied here has not replicated "
+                      "(or was applied only on this DC)")
+            if any(k.startswith("missing_") for k in changes):
+                print("   Missing objects: this DC has not received schema changes the others have "
+                      "(replication lag or failure)")
+    print(f"{'='*70}\n")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Read the schema partition from several DCs concurrently, merge it and "
+                    "report per-DC drift"
+    )
+    parser.add_argument("targets", nargs="+", metavar="[NAME=]TARGET",
+                        help="docker://Samba-AD, ldaps://dc2.example:636 or ldif://dump.ldif; "
+                             "a bare name is a local container")
+    parser.add_argument("--base-dn", default=DEFAULT_BASE_DN)
+    parser.add_argument("--bind-dn", help="Default: CN=Administrator,CN=Users,<base-dn>")
+    parser.add_argument("--password", default=os.environ.get("DOMAINPASS", ""),
+                        help="Bind password (default: $DOMAINPASS)")
+    parser.add_argument("--tls-ca-file", help="CA certificate to verify the DCs against")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"DCs read at the same time (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Seconds allowed per DC (default: {DEFAULT_TIMEOUT:.0f})")
+    parser.add_argument("--output", default=OUTPUT_FILE,
+                        help=f"Merged schema and drift report (default: {OUTPUT_FILE})")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    try:
+        targets = [Target(spec) for spec in args.targets]
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    names = [t.name for t in targets]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        print(f"❌ Duplicate target names: {', '.join(duplicates)} (use NAME=TARGET)")
+        sys.exit(2)
+
+    print(f"Reading schema from {len(targets)} DC(s), {args.concurrency} at a time...")
+    started = time.perf_counter()
+    results = asyncio.run(extract_all(targets, args))
+    elapsed = time.perf_counter() - started
+
+    partitions = {r["name"]: r["partition"] for r in results if "partition" in r}
+    merged, drift = compare_partitions(partitions) if partitions else ({}, {})
+    print_report(results, drift, elapsed)
+
+    report = {
+        "base_dn": args.base_dn,
+        "targets": {
+            r["name"]: {
+                "url": r["url"],
+                "seconds": round(r["seconds"], 3),
+                **({"error": r["error"]} if "error" in r else {
+                    "schema_hash": partition_hash(r["partition"]),
+                    "highest_usn": r["partition"]["highest_usn"],
+                    "attributes": len(r["partition"]["attributes"]),
+                    "classes": len(r["partition"]["classes"]),
+                })
+            }
+            for r in results
+        },
+        "merged": merged,
+        "drift": drift,
+    }
+    output_file = Path(args.output)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Wrote merged schema and drift report to {output_file}")
+
+    failed = len(partitions) < len(results)
+    drifted = any(drift.values())
+    sys.exit(1 if failed or drifted else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Single-pass lexer and declaration parser for the PHP subset used by LAM
+Extracts class-scoped constants, properties (with parsed defaults) and methods
+"""
+
+import re
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+Token = Tuple[str, str]
+
+# One alternation, tried left to right at each position; leading whitespace
+# and comments are absorbed into each match so they cost no extra iteration
+_TOKEN_RE = re.compile(r'''
+    (?:\s+|//[^\n]*|\#(?!\[)[^\n]*|/\*.*?\*/|\#\[.*?\])*
+    (?:
+        (?P<name>\\?[A-Za-z_][\w\\]*)
+      | (?P<var>\$[A-Za-z_]\w*)
+      | (?P<sq_string>'(?:[^'\\]|\\.)*')
+      | (?P<dq_string>"(?:[^"\\]|\\.)*")
+      | (?P<number>0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+      | (?P<open_tag><\?php|<\?=|<\?)
+      | (?P<close_tag>\?>)
+      | (?P<heredoc><<<[ \t]*(?P<hq>['"]?)(?P<hlabel>[A-Za-z_]\w*)(?P=hq)\r?\n
+            (?P<hbody>.*?)\r?\n[ \t]*(?P=hlabel)\b)
+      | (?P<op>::|=>|->|\?->|\?\?=?|\.\.\.|[=!]==?|<=>|<=|>=|&&|\|\||\+\+|--|[-+*/.%&|^]=|.)
+      | (?P<end>$)
+    )
+''', re.VERBOSE | re.DOTALL)
+
+_DQ_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'v': '\v', 'f': '\f',
+               '\\': '\\', '$': '$', '"': '"', '0': '\0'}
+
+_MODIFIERS = {'public', 'protected', 'private', 'var', 'static', 'readonly', 'final', 'abstract'}
+
+# Coarse scanner for blocks whose contents are irrelevant (method bodies):
+# only braces matter, but strings, comments and heredocs must not confuse it
+_SKIP_RE = re.compile(r'''
+    [^'"{}/\#<]+
+  | '(?:[^'\\]|\\.)*'
+  | "(?:[^"\\]|\\.)*"
+  | //[^\n]* | \#[^\n]* | /\*.*?\*/
+  | <<<[ \t]*(?P<hq>['"]?)(?P<hlabel>[A-Za-z_]\w*)(?P=hq)\r?\n.*?\r?\n[ \t]*(?P=hlabel)\b
+  | [{}]
+  | .
+''', re.VERBOSE | re.DOTALL)
+
+class _Lexer:
+    """Pull-based tokenizer with lookahead and fast skipping of nested blocks"""
+
+    def __init__(self, content: str):
+        self.content = content
+        start = content.find('<?')
+        self.pos = start if start >= 0 else len(content)
+        self.buffer: List[Token] = []
+        self.starts: List[int] = []
+
+    def _scan(self) -> Tuple[Token, int]:
+        content = self.content
+        while True:
+            if self.pos >= len(content):
+                return ('eof', ''), self.pos
+            match = _TOKEN_RE.match(content, self.pos)
+            kind = match.lastgroup if match.lastgroup not in ('hq', 'hlabel', 'hbody') else 'heredoc'
+            start = match.start(kind)
+            self.pos = match.end()
+
+            if kind == 'end':
+                return ('eof', ''), self.pos
+            if kind == 'open_tag':
+                continue
+            if kind == 'close_tag':
+                # Skip inline HTML up to the next opening tag
+                next_tag = content.find('<?', self.pos)
+                self.pos = next_tag if next_tag >= 0 else len(content)
+                return ('op', ';'), start  # '?>' terminates a statement
+            if kind == 'heredoc':
+                body = match.group('hbody')
+                return ('string', body if match.group('hq') == "'" else _unescape_double(body)), start
+            if kind == 'sq_string':
+                text = match.group(kind)[1:-1]
+                return ('string', re.sub(r"\\([\\'])", r'\1', text) if '\\' in text else text), start
+            if kind == 'dq_string':
+                return ('string', _unescape_double(match.group(kind)[1:-1])), start
+            return (kind, match.group(kind)), start
+
+    def peek(self, offset: int = 0) -> Token:
+        buffer = self.buffer
+        while len(buffer) <= offset:
+            token, start = self._scan()
+            buffer.append(token)
+            self.starts.append(start)
+        return buffer[offset]
+
+    def advance(self) -> Token:
+        if not self.buffer:
+            return self._scan()[0]
+        self.starts.pop(0)
+        return self.buffer.pop(0)
+
+    def skip_block(self):
+        """Jump past the '}' matching an already consumed '{'"""
+        if self.buffer:
+            self.pos = self.starts[0]
+            self.buffer.clear()
+            self.starts.clear()
+        depth = 1
+        for match in _SKIP_RE.finditer(self.content, self.pos):
+            text = match.group()
+            if text == '{':
+                depth += 1
+            elif text == '}':
+                depth -= 1
+                if depth == 0:
+                    self.pos = match.end()
+                    return
+        self.pos = len(self.content)
+
+    def read_block(self) -> List[Token]:
+        """Return the tokens up to the '}' matching an already consumed '{'"""
+        tokens = []
+        depth = 1
+        while self.peek()[0] != 'eof':
+            token = self.advance()
+            if token == ('op', '{'):
+                depth += 1
+            elif token == ('op', '}'):
+                depth -= 1
+                if depth == 0:
+                    break
+            tokens.append(token)
+        return tokens
+
+class _TokenList:
+    """Lexer interface over already tokenized input (e.g. a captured method body)"""
+
+    def __init__(self, tokens: List[Token], pos: int = 0):
+        self.tokens = tokens
+        self.pos = pos
+
+    def peek(self, offset: int = 0) -> Token:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else ('eof', '')
+
+    def advance(self) -> Token:
+        token = self.peek()
+        self.pos += 1
+        return token
+
+def tokenize(content: str) -> Iterator[Token]:
+    """Yield (kind, text) tokens, skipping inline HTML, whitespace and comments"""
+    lexer = _Lexer(content)
+    while lexer.peek()[0] != 'eof':
+        yield lexer.advance()
+
+def _unescape_double(text: str) -> str:
+    if '\\' not in text:
+        return text
+    return re.sub(r'\\(.)', lambda m: _DQ_ESCAPES.get(m.group(1), m.group()), text)
+
+class _Parser:
+    """Walks the source once: class bodies token by token, every other block skipped
+
+    Bodies of the methods named in body_methods are kept as token lists
+    under the class's "bodies" key instead of being skipped.
+    """
+
+    def __init__(self, content: str, body_methods: FrozenSet[str] = frozenset()):
+        self.lexer = _Lexer(content)
+        self.peek = self.lexer.peek
+        self.advance = self.lexer.advance
+        self.classes: Dict[str, Dict[str, Any]] = {}
+        self.body_methods = body_methods
+        self.pending_method: Optional[str] = None
+
+    def parse(self) -> Dict[str, Dict[str, Any]]:
+        previous: Token = ('op', ';')
+
+        while self.peek()[0] != 'eof':
+            kind, text = self.advance()
+
+            if kind == 'name' and text.lower() in ('class', 'interface', 'trait', 'enum') \
+                    and previous[1] not in ('::', 'new') and self.peek()[0] == 'name':
+                cls = self.classes.setdefault(self.advance()[1], {
+                    "constants": {}, "properties": {}, "methods": []
+                })
+                # Record the parent class, skip implements up to the class body
+                while self.peek()[1] not in ('{', ''):
+                    if self.advance()[1].lower() == 'extends' and self.peek()[0] == 'name':
+                        cls["extends"] = self.peek()[1]
+                self.advance()
+                self.parse_class_body(cls)
+            elif kind == 'op' and text == '{':
+                self.lexer.skip_block()
+            previous = (kind, text)
+
+        return self.classes
+
+    def parse_class_body(self, cls: Dict[str, Any]):
+        paren = 0
+        while self.peek()[0] != 'eof':
+            kind, text = self.peek()
+            if kind == 'op' and text == '}':
+                self.advance()
+                return
+            if kind == 'op' and text == '{':
+                self.advance()
+                if self.pending_method in self.body_methods:
+                    cls.setdefault("bodies", {})[self.pending_method] = self.lexer.read_block()
+                else:
+                    self.lexer.skip_block()  # Method body or trait adaptation block
+                self.pending_method = None
+            elif kind == 'op' and text in ('(', '['):
+                paren += 1
+                self.advance()
+            elif kind == 'op' and text in (')', ']'):
+                paren -= 1
+                self.advance()
+            elif paren == 0 and kind == 'name' \
+                    and (text.lower() in _MODIFIERS or text.lower() in ('const', 'function')):
+                self.parse_member(cls)
+            else:
+                self.advance()
+
+    def parse_member(self, cls: Dict[str, Any]):
+        """Parse one class-body declaration starting at its modifiers"""
+        modifiers = []
+        self.pending_method = None
+        while self.peek()[0] == 'name' and self.peek()[1].lower() in _MODIFIERS:
+            modifiers.append(self.advance()[1].lower())
+
+        kind, text = self.peek()
+        if kind == 'name' and text.lower() == 'const':
+            self.advance()
+            # Optional typed constant (PHP 8.3): const string NAME = ...
+            if self.peek(1)[0] == 'name':
+                self.advance()
+            for name, value in self.parse_assignments(cls):
+                cls["constants"][name] = value
+            return
+
+        if kind == 'name' and text.lower() == 'function':
+            self.advance()
+            if self.peek()[1] == '&':
+                self.advance()
+            name_kind, name = self.peek()
+            if name_kind == 'name':
+                cls["methods"].append(name)
+                self.pending_method = name
+            return  # Parameters and body are skipped by the main loop
+
+        # Property: optional type declaration, then one or more $name [= default]
+        while self.peek()[0] != 'var' and self.peek()[1] not in (';', '{', '}', 'eof', ''):
+            self.advance()
+        if self.peek()[0] != 'var':
+            return
+        # 'var' and modifier-less properties are public
+        visibility = next((m for m in modifiers if m in ('public', 'protected', 'private')), 'public')
+        for name, value in self.parse_assignments(cls, allow_missing=True):
+            cls["properties"][name.lstrip('$')] = {
+                "visibility": visibility,
+                "static": 'static' in modifiers,
+                "has_default": value is not _MISSING,
+                "default": None if value is _MISSING else value
+            }
+
+    def parse_assignments(self, cls: Dict[str, Any], allow_missing: bool = False):
+        """Parse 'NAME = expr, NAME2 = expr;' and return [(name, value)]"""
+        results = []
+        while True:
+            _, name = self.advance()
+            value = _MISSING
+            if self.peek()[1] == '=':
+                self.advance()
+                value = self.parse_expression(cls)
+            elif not allow_missing:
+                break
+            results.append((name, value))
+            if self.peek()[1] == ',':
+                self.advance()
+                continue
+            break
+        while self.peek()[1] not in (';', 'eof', ''):
+            self.advance()  # Skip anything we could not interpret
+        self.advance()
+        return results
+
+    def parse_expression(self, cls: Dict[str, Any]) -> Any:
+        """Parse a constant expression; concatenations of literals are folded"""
+        value = self.parse_operand(cls)
+        while self.peek()[1] == '.':
+            self.advance()
+            right = self.parse_operand(cls)
+            if isinstance(value, str) and isinstance(right, str):
+                value = value + right
+            else:
+                value = f"{value} . {right}"
+        if self.peek()[1] not in (',', ';', ')', ']', '=>'):
+            # Arithmetic or other operators: keep the remaining source text
+            parts = [_render(value)]
+            nesting = 0
+            while self.peek()[0] != 'eof':
+                text = self.peek()[1]
+                if nesting == 0 and text in (',', ';', ')', ']'):
+                    break
+                nesting += text in ('(', '[')
+                nesting -= text in (')', ']')
+                parts.append(self.advance()[1])
+            value = ' '.join(parts)
+        return value
+
+    def parse_operand(self, cls: Dict[str, Any]) -> Any:
+        kind, text = self.advance()
+        lowered = text.lower()
+
+        if kind == 'string':
+            return text
+        if kind == 'number':
+            return int(text, 16) if lowered.startswith('0x') else \
+                (float(text) if any(c in text for c in '.eE') else int(text))
+        if kind == 'op' and text in ('-', '+') and self.peek()[0] == 'number':
+            number = self.parse_operand(cls)
+            return -number if text == '-' else number
+        if kind == 'op' and text == '[':
+            return self.parse_array(cls, ']')
+        if kind == 'name' and lowered == 'array' and self.peek()[1] == '(':
+            self.advance()
+            return self.parse_array(cls, ')')
+        if kind == 'name' and lowered in ('true', 'false'):
+            return lowered == 'true'
+        if kind == 'name' and lowered == 'null':
+            return None
+        if kind == 'name' and self.peek()[1] == '::':
+            self.advance()
+            _, member = self.advance()
+            if lowered in ('self', 'static') and member in cls["constants"]:
+                return cls["constants"][member]
+            return f"{text}::{member}"
+        return text
+
+    def parse_array(self, cls: Dict[str, Any], closer: str) -> Any:
+        items: List[Tuple[Any, Any]] = []
+        keyed = False
+        while self.peek()[1] != closer and self.peek()[0] != 'eof':
+            value = self.parse_expression(cls)
+            if self.peek()[1] == '=>':
+                self.advance()
+                keyed = True
+                items.append((value, self.parse_expression(cls)))
+            else:
+                items.append((None, value))
+            if self.peek()[1] == ',':
+                self.advance()
+        self.advance()  # closer
+
+        if not keyed:
+            return [value for _, value in items]
+        result = {}
+        next_index = 0
+        for key, value in items:
+            if key is None:
+                key = next_index
+            if isinstance(key, int):
+                next_index = key + 1
+            result[str(key)] = value
+        return result
+
+_MISSING = object()
+
+def _render(value: Any) -> str:
+    if isinstance(value, str):
+        return repr(value)
+    if value is None:
+        return 'null'
+    return str(value).lower() if isinstance(value, bool) else str(value)
+
+def parse_php_classes(content: str,
+                      body_methods: FrozenSet[str] = frozenset()) -> Dict[str, Dict[str, Any]]:
+    """Return {class: {"constants", "properties", "methods"}} for a PHP source file
+
+    Classes with a parent also get "extends"; the token bodies of methods named
+    in body_methods are returned under "bodies" for callers that inspect them.
+    """
+    return _Parser(content, body_methods).parse()
+
+def evaluate_expression(tokens: List[Token], pos: int = 0,
+                        constants: Optional[Dict[str, Any]] = None) -> Tuple[Any, int]:
+    """Parse the constant expression starting at tokens[pos]
+
+    Returns (value, position after the expression). Literals, arrays and
+    string concatenations are evaluated; anything else is kept as source text.
+    """
+    parser = _Parser.__new__(_Parser)
+    parser.lexer = _TokenList(tokens, pos)
+    parser.peek = parser.lexer.peek
+    parser.advance = parser.lexer.advance
+    value = parser.parse_expression({"constants": constants or {}})
+    return value, parser.lexer.pos
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of validation results
+Keyed on the config bytes, the schema files and the validator source; bounded in size with LRU eviction
+"""
+
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from validation_results import Finding
+
+RESULT_CACHE_FILE = "docs/reference/.cache/validation-results.json"
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+# Bump when the stored record layout changes
+CACHE_VERSION = 1
+
+def validator_fingerprint(module_files: Iterable[str]) -> str:
+    """Hash of the validator's source files, so editing a check invalidates its results"""
+    digest = hashlib.sha256(str(CACHE_VERSION).encode())
+    for module_file in module_files:
+        path = Path(module_file)
+        digest.update(path.name.encode())
+        digest.update(b'\0')
+        digest.update(path.read_bytes() if path.exists() else b'')
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def result_key(config_bytes: bytes, schema_key: str, validator_key: str) -> str:
+    digest = hashlib.sha256(schema_key.encode())
+    digest.update(validator_key.encode())
+    digest.update(config_bytes)
+    return digest.hexdigest()
+
+def _encode_finding(finding: str) -> Dict:
+    return {"message": str(finding), "check": getattr(finding, "check", "unknown"),
+            "severity": getattr(finding, "severity", ""), "pointer": getattr(finding, "pointer", ""),
+            "fix": getattr(finding, "fix", "")}
+
+def _decode_finding(record: Dict) -> Finding:
+    return Finding(record["message"], record["check"], record["severity"], record["pointer"],
+                   record["fix"])
+
+class ResultCache:
+    """JSON file of validate_file() results, evicting least recently used entries past max_bytes"""
+
+    def __init__(self, cache_file: str = RESULT_CACHE_FILE, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_file = Path(cache_file)
+        self.max_bytes = max_bytes
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._dirty = False
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, 'r') as f:
+                    stored = json.load(f)
+                if stored.get("version") == CACHE_VERSION:
+                    self.entries = stored["entries"]
+            except (OSError, json.JSONDecodeError, AttributeError, KeyError):
+                self.entries = {}  # Corrupt cache, validate again
+
+    def get(self, key: str, path: str) -> Optional[Dict]:
+        """The cached result for key, re-labelled with path, or None on a miss"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry["used_at"] = time.time()
+        self._dirty = True
+        stored = entry["result"]
+        return {
+            "path": path,
+            "errors": [_decode_finding(f) for f in stored["errors"]],
+            "warnings": [_decode_finding(f) for f in stored["warnings"]],
+            "exit_status": stored["exit_status"],
+            "elapsed": 0.0,
+            "size_bytes": stored["size_bytes"],
+            "timings": {},
+            "cached": True,
+        }
+
+    def put(self, key: str, result: Dict):
+        stored = {
+            "errors": [_encode_finding(f) for f in result["errors"]],
+            "warnings": [_encode_finding(f) for f in result["warnings"]],
+            "exit_status": result["exit_status"],
+            "size_bytes": result.get("size_bytes", 0),
+        }
+        size = len(json.dumps(stored))
+        self.entries[key] = {"used_at": time.time(), "size": size, "result": stored}
+        self._dirty = True
+
+    def total_bytes(self) -> int:
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def _evict(self):
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1]["used_at"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            del self.entries[key]
+            self.evictions += 1
+
+    def save(self):
+        """Evict down to max_bytes and write the cache file if anything changed"""
+        if not self._dirty:
+            return
+        self._evict()
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump({"version": CACHE_VERSION, "entries": self.entries}, f)
+            tmp_file.replace(self.cache_file)
+            self._dirty = False
+        except OSError as e:
+            print(f"⚠️  Could not write result cache: {e}", file=sys.stderr)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.total_bytes(),
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Registry of validation rules, dispatched from one walk over the config
+Rules declare the config pointers they read; site rules are loaded from plugin directories
+"""
+
+import hashlib
+import importlib.util
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from schema_index import SchemaIndex
+
+Check = Callable[[Dict, SchemaIndex], Tuple[List[str], List[str]]]
+
+# Keys of Rule.inputs: config pointers whose value is read, config pointers where only
+# presence matters, and pointers into each schema (used by config_diff.py)
+INPUT_SOURCES = ("config", "config_presence", "lam_schema", "samba_schema")
+SCHEMAS = ("lam_schema", "samba_schema")
+
+def run_check(timings: Optional[Dict], name: str, check, *args) -> Tuple[List[str], List[str]]:
+    """Run one validate_* check, recording its time and finding counts in timings"""
+    started = time.perf_counter()
+    errors, warnings = check(*args)
+    if timings is not None:
+        timings[name] = {
+            "seconds": time.perf_counter() - started,
+            "errors": len(errors),
+            "warnings": len(warnings)
+        }
+    return errors, warnings
+
+def parse_pointer(pointer: str) -> Tuple[str, ...]:
+    """RFC 6901 pointer -> key path ('/typeSettings/attr_user' -> ('typeSettings', 'attr_user'))"""
+    if not pointer.startswith('/'):
+        raise ValueError(f"Config input must be a JSON pointer starting with '/': {pointer!r}")
+    return tuple(part.replace('~1', '/').replace('~0', '~') for part in pointer.split('/')[1:])
+
+class Rule:
+    """One check: f(view, index) -> (errors, warnings)
+
+    The view is a dict shaped like the config but holding only the pointers
+    listed in inputs["config"] and inputs["config_presence"], so a rule cannot
+    depend on keys it did not declare. requires names the schemas the rule
+    needs; it is skipped when the index lacks one of them.
+    """
+
+    __slots__ = ("name", "check", "inputs", "requires", "label", "source")
+
+    def __init__(self, name: str, check: Check, inputs: Dict[str, List[str]],
+                 requires: Iterable[str] = (), label: str = ""):
+        unknown = set(inputs) - set(INPUT_SOURCES)
+        if unknown:
+            raise ValueError(f"Rule {name}: unknown input source(s) {', '.join(sorted(unknown))}")
+        if set(requires) - set(SCHEMAS):
+            raise ValueError(f"Rule {name}: requires must name {' or '.join(SCHEMAS)}")
+        self.name = name
+        self.check = check
+        self.inputs = {source: list(inputs.get(source, [])) for source in INPUT_SOURCES
+                       if inputs.get(source)}
+        self.requires = tuple(requires)
+        self.label = label or f"Checking {name}..."
+        self.source = ""  # Plugin file the rule came from; empty for built-in rules
+        for pointer in self.config_pointers():
+            parse_pointer(pointer)
+
+    def config_pointers(self) -> List[str]:
+        return self.inputs.get("config", []) + self.inputs.get("config_presence", [])
+
+    def supported(self, index: SchemaIndex) -> bool:
+        return ("lam_schema" not in self.requires or index.has_lam_schema) and \
+               ("samba_schema" not in self.requires or index.has_samba_schema)
+
+    def fingerprint(self) -> str:
+        """Hash of the plugin source, so fleet state notices an edited site rule"""
+        if not self.source:
+            return ""
+        return hashlib.sha256(Path(self.source).read_bytes()).hexdigest()[:16]
+
+class RuleRegistry:
+    """Ordered rules plus the pointer trie used to build every rule's view in one walk"""
+
+    def __init__(self):
+        self.rules: Dict[str, Rule] = {}
+        self.plugin_dirs: List[str] = []
+        self.plugin_files: List[str] = []
+        self._trie: Optional[Dict] = None
+        self._loading = ""
+
+    def register(self, rule: Rule) -> Rule:
+        if rule.name in self.rules:
+            raise ValueError(f"Rule {rule.name!r} is already registered")
+        rule.source = rule.source or self._loading
+        self.rules[rule.name] = rule
+        self._trie = None
+        return rule
+
+    def rule(self, name: str, inputs: Dict[str, List[str]], requires: Iterable[str] = (),
+             label: str = ""):
+        """Decorator form of register() for plugin modules"""
+        def decorator(check: Check) -> Check:
+            self.register(Rule(name, check, inputs, requires, label))
+            return check
+        return decorator
+
+    def available(self, index: SchemaIndex) -> List[str]:
+        """Names of the rules this index supports, in registration order"""
+        return [name for name, rule in self.rules.items() if rule.supported(index)]
+
+    def _compile(self) -> Dict:
+        """Trie of key paths; each node lists the rules that take the value found there"""
+        trie = {"rules": [], "children": {}}
+        for name, rule in self.rules.items():
+            paths = sorted({parse_pointer(p) for p in rule.config_pointers()}, key=len)
+            kept: List[Tuple[str, ...]] = []
+            for path in paths:
+                # A rule reading /typeSettings already sees /typeSettings/attr_user
+                if any(path[:len(prefix)] == prefix for prefix in kept):
+                    continue
+                kept.append(path)
+                node = trie
+                for part in path:
+                    node = node["children"].setdefault(part, {"rules": [], "children": {}})
+                node["rules"].append(name)
+        return trie
+
+    def views(self, config: Dict, names: Iterable[str]) -> Dict[str, Dict]:
+        """Per rule name, the config restricted to its declared pointers (one walk, no copies)"""
+        if self._trie is None:
+            self._trie = self._compile()
+        views: Dict[str, Dict] = {name: {} for name in names}
+        stack = [(config, self._trie, ())]
+        while stack:
+            value, node, path = stack.pop()
+            for name in node["rules"]:
+                view = views.get(name)
+                if view is None:
+                    continue
+                for part in path[:-1]:
+                    view = view.setdefault(part, {})
+                view[path[-1]] = value
+            if isinstance(value, dict):
+                for key, child in node["children"].items():
+                    if key in value:
+                        stack.append((value[key], child, path + (key,)))
+        return views
+
+    def run_each(self, config: Dict, index: SchemaIndex, timings: Optional[Dict] = None,
+                 checks: Optional[Iterable[str]] = None,
+                 progress: Optional[Callable[[Rule], None]] = None) -> Dict[str, Tuple[List[str], List[str]]]:
+        """(errors, warnings) per rule, for all supported rules or only those named"""
+        wanted = None if checks is None else set(checks)
+        names = [name for name in self.available(index) if wanted is None or name in wanted]
+        views = self.views(config, names)
+        results = {}
+        for name in names:
+            rule = self.rules[name]
+            if progress is not None:
+                progress(rule)
+            results[name] = run_check(timings, name, rule.check, views[name], index)
+        return results
+
+    def load_plugins(self, directory: str) -> List[str]:
+        """Import every *.py in directory and call its register(registry); returns new rule names"""
+        path = Path(directory)
+        if not path.is_dir():
+            raise ValueError(f"Rules directory not found: {directory}")
+        if str(path.resolve()) not in self.plugin_dirs:
+            self.plugin_dirs.append(str(path.resolve()))
+        before = set(self.rules)
+        for plugin in sorted(path.glob("*.py")):
+            plugin_file = str(plugin.resolve())
+            if plugin.name.startswith('_') or plugin_file in self.plugin_files:
+                continue  # Private helpers; already loaded (e.g. inherited by a forked worker)
+            spec = importlib.util.spec_from_file_location(f"lam_rules_{plugin.stem}", plugin)
+            module = importlib.util.module_from_spec(spec)
+            self._loading = plugin_file
+            try:
+                spec.loader.exec_module(module)
+                register = getattr(module, "register", None)
+                if not callable(register):
+                    raise ValueError(f"{plugin} has no register(registry) function")
+                register(self)
+            finally:
+                self._loading = ""
+            self.plugin_files.append(plugin_file)
+        return [name for name in self.rules if name not in before]
+
+    def fingerprint(self) -> str:
+        """Hash of the rule set (names, inputs and plugin sources)"""
+        digest = hashlib.sha256()
+        for name, rule in self.rules.items():
+            digest.update(f"{name}\0{sorted(rule.inputs.items())}\0{rule.fingerprint()}\0".encode())
+        return digest.hexdigest()[:16]
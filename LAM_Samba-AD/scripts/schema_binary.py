@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Compact binary form of samba-schema.json for fast, memory-mapped attribute lookups
+The JSON stays the source of truth; the .bin file is rebuilt from it and ignored when stale
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set
+
+MAGIC = b"LAMSCHM\0"
+FORMAT_VERSION = 1
+
+# magic, version, reserved, sha256 of the source JSON, record count,
+# records offset, strings offset, strings length, meta offset, meta length
+_HEADER = struct.Struct('<8sHH32sIIIIII')
+# lowercase key, schema spelling, attributeSyntax, oMSyntax (offset + length
+# into the string table), flags, rangeUpper
+_RECORD = struct.Struct('<IIIIHHBBBxI')
+
+FLAG_METADATA = 0x01  # Present in attribute_metadata (not only all_attributes)
+FLAG_MULTI_VALUED = 0x02
+FLAG_RANGE_UPPER = 0x04
+
+# Large tables live in the record section; everything else is kept as compact JSON
+_TABLE_KEYS = ("all_attributes", "attribute_metadata")
+
+class BinarySchemaError(ValueError):
+    """The binary schema is missing, corrupt, from another format version or stale"""
+
+def binary_path(json_file: str) -> Path:
+    """The .bin file that belongs to a schema JSON file"""
+    return Path(json_file).with_suffix('.bin')
+
+def file_sha256(path: Path) -> bytes:
+    return hashlib.sha256(path.read_bytes()).digest()
+
+def known_attribute_names(schema: Dict) -> Set[str]:
+    """Every attribute name the schema mentions, in any table"""
+    known = set(schema.get("all_attributes", []))
+    known.update(schema.get("attribute_metadata", {}))
+    known.update(schema.get("default_user_attributes", []))
+    known.update(schema.get("common_user_attributes", {}))
+    known.update(schema.get("safe_attr_user", []))
+    known.update(schema.get("safe_attr_group", []))
+    return known
+
+def known_attributes(schema: Dict) -> Dict[str, str]:
+    """lowercase -> schema spelling; the last spelling in sort order wins, as in SchemaIndex"""
+    return {name.lower(): name for name in sorted(known_attribute_names(schema))}
+
+def encode_schema(schema: Dict, source_sha256: bytes) -> bytes:
+    """Serialize a samba-schema.json dict into the binary layout"""
+    metadata = schema.get("attribute_metadata", {})
+    strings = bytearray()
+    interned: Dict[str, tuple] = {}
+
+    def intern(text: str, max_len: int) -> tuple:
+        if text not in interned:
+            raw = text.encode('utf-8')
+            if len(raw) > max_len:
+                raise BinarySchemaError(f"String too long for binary schema: {text[:40]}...")
+            interned[text] = (len(strings), len(raw))
+            strings.extend(raw)
+        return interned[text]
+
+    names = known_attributes(schema)
+    # Sort by the encoded key so lookups can binary search raw bytes
+    keys = sorted(names, key=lambda key: key.encode('utf-8'))
+    records = bytearray()
+    for key in keys:
+        name = names[key]
+        info = metadata.get(name)
+        flags = 0
+        range_upper = 0
+        syntax = om_syntax = ""
+        if info is not None:
+            flags |= FLAG_METADATA
+            if info.get("multi_valued"):
+                flags |= FLAG_MULTI_VALUED
+            if "range_upper" in info:
+                flags |= FLAG_RANGE_UPPER
+                range_upper = info["range_upper"]
+            syntax = info.get("syntax", "")
+            om_syntax = str(info.get("om_syntax", ""))
+        key_off, key_len = intern(key, 0xFFFF)
+        name_off, name_len = intern(name, 0xFFFF)
+        syntax_off, syntax_len = intern(syntax, 0xFF)
+        om_off, om_len = intern(om_syntax, 0xFF)
+        records.extend(_RECORD.pack(key_off, name_off, syntax_off, om_off, key_len, name_len,
+                                    syntax_len, om_len, flags, range_upper & 0xFFFFFFFF))
+
+    meta = json.dumps({k: v for k, v in schema.items() if k not in _TABLE_KEYS},
+                      separators=(',', ':')).encode('utf-8')
+    records_off = _HEADER.size
+    strings_off = records_off + len(records)
+    meta_off = strings_off + len(strings)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, source_sha256, len(keys),
+                          records_off, strings_off, len(strings), meta_off, len(meta))
+    return header + bytes(records) + bytes(strings) + meta
+
+def write_binary_schema(schema: Dict, json_file: str) -> Path:
+    """Write the .bin next to json_file, stamped with the hash of the JSON as written"""
+    target = binary_path(json_file)
+    data = encode_schema(schema, file_sha256(Path(json_file)))
+    tmp_file = target.with_name(target.name + '.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    tmp_file.replace(target)  # Readers never map a partial file
+    return target
+
+class BinarySchema:
+    """Read-only view over a mapped .bin file; nothing is decoded until it is looked up"""
+
+    def __init__(self, path: str, source_sha256: Optional[bytes] = None):
+        self.path = str(path)
+        try:
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise BinarySchemaError(f"Cannot map {self.path}: {e}") from e
+        try:
+            self._read_header(source_sha256)
+        except BinarySchemaError:
+            self._map.close()
+            raise
+        self._meta: Optional[Dict] = None
+
+    def _read_header(self, source_sha256: Optional[bytes]):
+        if len(self._map) < _HEADER.size:
+            raise BinarySchemaError(f"{self.path} is truncated")
+        (magic, version, _, sha, count, records_off, strings_off, strings_len,
+         meta_off, meta_len) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise BinarySchemaError(f"{self.path} is not a binary schema")
+        if version != FORMAT_VERSION:
+            raise BinarySchemaError(f"{self.path} has format version {version}, "
+                                    f"expected {FORMAT_VERSION}")
+        if source_sha256 is not None and sha != source_sha256:
+            raise BinarySchemaError(f"{self.path} is stale (source JSON changed)")
+        if records_off + count * _RECORD.size > strings_off \
+                or strings_off + strings_len > meta_off or meta_off + meta_len > len(self._map):
+            raise BinarySchemaError(f"{self.path} is truncated")
+        self.source_sha256 = sha
+        self._count = count
+        self._records_off = records_off
+        self._strings_off = strings_off
+        self._meta_off = meta_off
+        self._meta_len = meta_len
+
+    def __reduce__(self):
+        # Worker processes and the index cache re-map the file instead of copying it
+        return (BinarySchema, (self.path, self.source_sha256))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record(self, i: int) -> tuple:
+        return _RECORD.unpack_from(self._map, self._records_off + i * _RECORD.size)
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._strings_off + offset
+        return self._map[start:start + length]
+
+    def _find(self, name: str) -> int:
+        """Record number for name (case-insensitive), or -1"""
+        key = name.lower().encode('utf-8')
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            key_off, _, _, _, key_len, *_ = self._record(mid)
+            probe = self._string(key_off, key_len)
+            if probe < key:
+                low = mid + 1
+            elif probe > key:
+                high = mid
+            else:
+                return mid
+        return -1
+
+    def canonical(self, name: str) -> Optional[str]:
+        """Schema spelling of an attribute, ignoring case"""
+        i = self._find(name)
+        if i < 0:
+            return None
+        _, name_off, _, _, _, name_len, *_ = self._record(i)
+        return self._string(name_off, name_len).decode('utf-8')
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.canonical(name) == name
+
+    def metadata(self, name: str) -> Optional[Dict]:
+        """The attribute_metadata entry for an attribute, or None if it has none"""
+        i = self._find(name)
+        if i < 0:
+            return None
+        _, _, syntax_off, om_off, _, _, syntax_len, om_len, flags, range_upper = self._record(i)
+        if not flags & FLAG_METADATA:
+            return None
+        info = {
+            "syntax": self._string(syntax_off, syntax_len).decode('utf-8'),
+            "om_syntax": self._string(om_off, om_len).decode('utf-8'),
+            "multi_valued": bool(flags & FLAG_MULTI_VALUED)
+        }
+        if flags & FLAG_RANGE_UPPER:
+            info["range_upper"] = range_upper
+        return info
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            _, name_off, _, _, _, name_len, *_ = self._record(i)
+            yield self._string(name_off, name_len).decode('utf-8')
+
+    @property
+    def meta(self) -> Dict:
+        """Every schema field except the attribute tables (safe lists, warnings, ...)"""
+        if self._meta is None:
+            raw = self._map[self._meta_off:self._meta_off + self._meta_len]
+            self._meta = json.loads(raw.decode('utf-8'))
+        return self._meta
+
+    def close(self):
+        self._map.close()
+
+def binary_is_current(json_file: str) -> bool:
+    """True if the .bin for json_file exists and was built from the JSON as it is now"""
+    try:
+        BinarySchema(str(binary_path(json_file)), file_sha256(Path(json_file))).close()
+    except (OSError, BinarySchemaError):
+        return False
+    return True
+
+def open_binary_schema(json_file: str) -> Optional[BinarySchema]:
+    """Map the .bin for json_file if it exists and was built from the JSON as it is now"""
+    json_path = Path(json_file)
+    target = binary_path(json_file)
+    if not json_path.exists() or not target.exists():
+        return None
+    try:
+        return BinarySchema(str(target), file_sha256(json_path))
+    except BinarySchemaError as e:
+        print(f"⚠️  Ignoring binary schema, reading JSON instead: {e}", file=sys.stderr)
+        print(f"   Rebuild it with: python3 scripts/schema_binary.py {json_file}", file=sys.stderr)
+        return None
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build the binary form of samba-schema.json, or look attributes up in it"
+    )
+    parser.add_argument("schema", nargs="?", default="docs/reference/samba-schema.json",
+                        help="Schema JSON file (default: docs/reference/samba-schema.json)")
+    parser.add_argument("--lookup", nargs="+", metavar="ATTRIBUTE",
+                        help="Look attributes up in the existing .bin instead of rebuilding it")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.schema).exists():
+        print(f"❌ Schema file not found: {args.schema}")
+        sys.exit(1)
+
+    if args.lookup:
+        schema = open_binary_schema(args.schema)
+        if schema is None:
+            print(f"❌ No up-to-date {binary_path(args.schema)}; run without --lookup to build it")
+            sys.exit(1)
+        for name in args.lookup:
+            canonical = schema.canonical(name)
+            if canonical is None:
+                print(f"⚠️  {name}: not in schema")
+            else:
+                print(f"✓ {canonical}: {json.dumps(schema.metadata(name))}")
+        return
+
+    with open(args.schema, 'r') as f:
+        schema = json.load(f)
+    target = write_binary_schema(schema, args.schema)
+    print(f"✓ Wrote {target} ({target.stat().st_size / 1024:.1f} KB, "
+          f"{len(known_attributes(schema))} attributes)")
+
+if __name__ == "__main__":
+    main()
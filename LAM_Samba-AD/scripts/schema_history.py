@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Versioned history of the extracted LAM and Samba schemas
+Snapshots are appended to one compressed pack file with a line-per-snapshot index
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+HISTORY_DIR = "docs/reference/schema-history"
+INDEX_FILE = "index.jsonl"
+PACK_FILE = "snapshots.pack"
+SNAPSHOT_DIR = "docs/reference/.cache/snapshots"
+KINDS = ("lam", "samba")
+
+# Volatile extraction bookkeeping (mtimes, USN) that is not part of the schema itself
+VOLATILE_KEYS = ("source_fingerprint",)
+
+def snapshot_key(kind: str, schema: Dict) -> str:
+    """LAM version for LAM schemas, highest schema USN for Samba schemas"""
+    if kind == "lam":
+        return str(schema.get("version") or "unknown")
+    return f"usn{schema.get('source_fingerprint', {}).get('schema_usn', 0)}"
+
+def _summary(kind: str, schema: Dict) -> Dict[str, int]:
+    """Section sizes kept in the index, so listing never reads the pack"""
+    if kind == "lam":
+        return {"loginMethods": len(schema.get("loginMethods", [])),
+                "configOptions": len(schema.get("configOptions", {})),
+                "moduleSettings": len(schema.get("moduleSettings", {}))}
+    return {"attributes": len(schema.get("all_attributes", [])),
+            "safe_attr_user": len(schema.get("safe_attr_user", []))}
+
+class SchemaHistory:
+    """Append-only snapshot store: index.jsonl (one record per snapshot) + snapshots.pack
+
+    The pack holds zlib-compressed schema JSON; identical content is stored
+    once and shared by every record that points at it. A record is only
+    written to the index after its blob is on disk, so an interrupted run
+    leaves at most unreferenced bytes at the end of the pack.
+    """
+
+    def __init__(self, directory: str = HISTORY_DIR):
+        self.directory = Path(directory)
+        self.index_file = self.directory / INDEX_FILE
+        self.pack_file = self.directory / PACK_FILE
+        self._records: Optional[List[Dict]] = None
+
+    def records(self, kind: Optional[str] = None) -> List[Dict]:
+        if self._records is None:
+            self._records = []
+            if self.index_file.exists():
+                with open(self.index_file, 'r') as f:
+                    for line in f:
+                        try:
+                            self._records.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue  # Torn last line from an interrupted append
+        return [r for r in self._records if kind is None or r["kind"] == kind]
+
+    def add(self, kind: str, schema: Dict, key: Optional[str] = None) -> Tuple[Dict, bool]:
+        """Record a snapshot; returns (record, False) if this key already has this content"""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown schema kind {kind!r} (expected {' or '.join(KINDS)})")
+        key = key or snapshot_key(kind, schema)
+        content = json.dumps({k: v for k, v in schema.items() if k not in VOLATILE_KEYS},
+                             sort_keys=True, separators=(',', ':')).encode('utf-8')
+        sha256 = hashlib.sha256(content).hexdigest()
+
+        same_key = [r for r in self.records(kind) if r["key"] == key]
+        if same_key and same_key[-1]["sha256"] == sha256:
+            return same_key[-1], False
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stored = next((r for r in self.records() if r["sha256"] == sha256), None)
+        if stored is not None:
+            offset, length = stored["offset"], stored["length"]
+        else:
+            blob = zlib.compress(content, 9)
+            with open(self.pack_file, 'ab') as f:
+                offset = f.tell()
+                f.write(blob)
+                f.flush()
+                os.fsync(f.fileno())
+            length = len(blob)
+
+        record = {"kind": kind, "key": key, "sha256": sha256, "offset": offset, "length": length,
+                  "size": len(content), "recorded_at": time.time(), "summary": _summary(kind, schema)}
+        with open(self.index_file, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._records.append(record)
+        return record, True
+
+    def resolve(self, ref: str, kind: Optional[str] = None) -> Dict:
+        """Find a snapshot by '[kind:]key', '[kind:]latest', '[kind:]previous' or '[kind:]@sha'
+
+        A key recorded more than once resolves to its latest record; 'previous'
+        is the newest snapshot whose content differs from 'latest'.
+        """
+        if ':' in ref and ref.split(':', 1)[0] in KINDS:
+            kind, ref = ref.split(':', 1)
+        if kind is None:
+            raise KeyError(f"Snapshot {ref!r} needs a kind prefix (lam: or samba:)")
+        records = self.records(kind)
+        if not records:
+            raise KeyError(f"No {kind} snapshots in {self.directory}")
+        if ref == "latest":
+            return records[-1]
+        if ref == "previous":
+            latest = records[-1]["sha256"]
+            older = [r for r in records if r["sha256"] != latest]
+            if not older:
+                raise KeyError(f"Only one {kind} schema version has been recorded")
+            return older[-1]
+        if ref.startswith('@'):
+            matches = {r["sha256"]: r for r in records if r["sha256"].startswith(ref[1:].lower())}
+            if len(matches) != 1:
+                raise KeyError(f"{kind}:{ref} matches {len(matches)} snapshots")
+            return next(iter(matches.values()))
+        matches = [r for r in records if r["key"] == ref]
+        if not matches:
+            known = ', '.join(dict.fromkeys(r["key"] for r in records))
+            raise KeyError(f"No {kind} snapshot {ref!r} (recorded: {known})")
+        return matches[-1]
+
+    def load(self, record: Dict) -> Dict:
+        with open(self.pack_file, 'rb') as f:
+            f.seek(record["offset"])
+            content = zlib.decompress(f.read(record["length"]))
+        if hashlib.sha256(content).hexdigest() != record["sha256"]:
+            raise ValueError(f"Snapshot {record['kind']}:{record['key']} is corrupt in {self.pack_file}")
+        return json.loads(content)
+
+    def materialize(self, record: Dict, directory: str = SNAPSHOT_DIR) -> Path:
+        """Write a snapshot as a schema JSON file (once per content) for the validator to load"""
+        target = Path(directory) / f"{record['kind']}-{record['sha256'][:16]}.json"
+        if target.exists():
+            return target
+        schema = self.load(record)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = target.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(schema, f)
+        tmp_file.replace(target)
+        if record["kind"] == "samba":
+            from schema_binary import BinarySchemaError, write_binary_schema
+            try:
+                write_binary_schema(schema, str(target))
+            except (OSError, BinarySchemaError):
+                pass  # The validator reads the JSON instead
+        return target
+
+def record_snapshot(kind: str, schema: Dict, directory: str = HISTORY_DIR):
+    """Add the extracted schema to the history; a failure here never fails the extraction"""
+    try:
+        record, added = SchemaHistory(directory).add(kind, schema)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not record schema snapshot in {directory}: {e}", file=sys.stderr)
+        return
+    action = "Recorded" if added else "History already has"
+    print(f"  • {action} snapshot {kind}:{record['key']} (@{record['sha256'][:12]})")
+
+# -- Diff ------------------------------------------------------------------
+
+def _set_diff(old: List, new: List) -> Dict[str, List]:
+    old_set, new_set = set(map(str, old)), set(map(str, new))
+    return {"added": sorted(new_set - old_set), "removed": sorted(old_set - new_set)}
+
+def _dict_diff(old: Dict, new: Dict, field: Optional[str] = None) -> Dict[str, Any]:
+    """Added/removed keys, plus keys whose value (or value[field]) changed as {key: [old, new]}"""
+    diff: Dict[str, Any] = _set_diff(list(old), list(new))
+    changed = {}
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        if field is not None and isinstance(before, dict) and isinstance(after, dict):
+            before, after = before.get(field), after.get(field)
+        if before != after:
+            changed[key] = [before, after]
+    diff["changed"] = changed
+    return diff
+
+def diff_lam(old: Dict, new: Dict) -> Dict[str, Dict]:
+    return {
+        "loginMethods": _set_diff(old.get("loginMethods", []), new.get("loginMethods", [])),
+        "accessLevels": _set_diff(old.get("accessLevels", []), new.get("accessLevels", [])),
+        "configOptions (defaults)": _dict_diff(old.get("configOptions", {}),
+                                               new.get("configOptions", {}), "default"),
+        "moduleSettings (shapes)": _dict_diff(old.get("moduleSettings", {}),
+                                              new.get("moduleSettings", {}), "shape"),
+        "modules": _set_diff(list(old.get("modules", {})), list(new.get("modules", {}))),
+    }
+
+def diff_samba(old: Dict, new: Dict) -> Dict[str, Dict]:
+    old_user, new_user = old.get("user_class", {}), new.get("user_class", {})
+    return {
+        "attributes": _set_diff(old.get("all_attributes", []), new.get("all_attributes", [])),
+        "attribute_metadata": _dict_diff(old.get("attribute_metadata", {}),
+                                         new.get("attribute_metadata", {})),
+        "user_class.must": _set_diff(old_user.get("must", []), new_user.get("must", [])),
+        "user_class.may": _set_diff(old_user.get("may", []), new_user.get("may", [])),
+        "safe_attr_user": _set_diff(old.get("safe_attr_user", []), new.get("safe_attr_user", [])),
+        "safe_attr_group": _set_diff(old.get("safe_attr_group", []), new.get("safe_attr_group", [])),
+        "warnings": _dict_diff(old.get("warnings", {}), new.get("warnings", {})),
+    }
+
+DIFFERS = {"lam": diff_lam, "samba": diff_samba}
+
+def diff_snapshots(history: SchemaHistory, old: Dict, new: Dict) -> Dict[str, Dict]:
+    """Per section: added, removed and (for mappings) changed entries; empty sections dropped"""
+    if old["kind"] != new["kind"]:
+        raise ValueError(f"Cannot diff a {old['kind']} snapshot against a {new['kind']} snapshot")
+    if old["sha256"] == new["sha256"]:
+        return {}
+    sections = DIFFERS[old["kind"]](history.load(old), history.load(new))
+    return {name: diff for name, diff in sections.items()
+            if diff["added"] or diff["removed"] or diff.get("changed")}
+
+def _short(value: Any) -> str:
+    text = json.dumps(value)
+    return text if len(text) <= 40 else text[:37] + "..."
+
+def print_diff(old: Dict, new: Dict, sections: Dict[str, Dict], max_items: int):
+    print(f"\n{'='*70}")
+    print(f"Schema Diff: {old['kind']}:{old['key']} -> {new['kind']}:{new['key']}")
+    print(f"{'='*70}\n")
+    if not sections:
+        print("✓ No schema changes")
+    for name, diff in sections.items():
+        changed = diff.get("changed", {})
+        print(f"{name}: +{len(diff['added'])} -{len(diff['removed'])}"
+              + (f" ~{len(changed)}" if changed else ""))
+        lines = [f"  + {item}" for item in diff["added"]]
+        lines += [f"  - {item}" for item in diff["removed"]]
+        lines += [f"  ~ {key}: {_short(before)} -> {_short(after)}"
+                  for key, (before, after) in changed.items()]
+        for line in lines[:max_items]:
+            print(line)
+        if len(lines) > max_items:
+            print(f"  ... {len(lines) - max_items} more")
+        print()
+    print(f"{'='*70}\n")
+
+# -- CLI -------------------------------------------------------------------
+
+def main_list(history: SchemaHistory, args: argparse.Namespace):
+    records = history.records(args.kind)
+    if not records:
+        print(f"No schema snapshots in {history.directory}")
+        return
+    for record in records:
+        stamp = time.strftime('%Y-%m-%d %H:%M', time.localtime(record["recorded_at"]))
+        counts = ', '.join(f"{name} {count}" for name, count in record["summary"].items())
+        print(f"{record['kind']:<6} {record['key']:<16} @{record['sha256'][:12]}  {stamp}  {counts}")
+    pack_bytes = history.pack_file.stat().st_size if history.pack_file.exists() else 0
+    print(f"\n{len(records)} snapshot(s), pack {pack_bytes / 1024:.1f} KB")
+
+def main_diff(history: SchemaHistory, args: argparse.Namespace):
+    old = history.resolve(args.old)
+    # 'latest'/'previous' without a prefix take the kind of the other snapshot
+    new = history.resolve(args.new, old["kind"])
+    started = time.perf_counter()
+    sections = diff_snapshots(history, old, new)
+    elapsed = time.perf_counter() - started
+    if args.format == "json":
+        json.dump({"old": old, "new": new, "sections": sections}, sys.stdout, indent=2)
+        print()
+    else:
+        print_diff(old, new, sections, args.max_items)
+        print(f"Diffed in {elapsed * 1000:.1f} ms")
+    sys.exit(1 if sections else 0)
+
+def main_add(history: SchemaHistory, args: argparse.Namespace):
+    with open(args.schema, 'r') as f:
+        schema = json.load(f)
+    record, added = history.add(args.kind, schema, args.key)
+    print(f"{'Recorded' if added else 'Already recorded'} {record['kind']}:{record['key']} "
+          f"(@{record['sha256'][:12]})")
+
+def main_export(history: SchemaHistory, args: argparse.Namespace):
+    record = history.resolve(args.ref)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(history.load(record), f, indent=2)
+        print(args.output)
+    else:
+        print(history.materialize(record))
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="List, diff and export recorded LAM/Samba schema snapshots"
+    )
+    parser.add_argument("--history", default=HISTORY_DIR,
+                        help=f"Snapshot store directory (default: {HISTORY_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    listing = commands.add_parser("list", help="Show recorded snapshots")
+    listing.add_argument("--kind", choices=KINDS)
+
+    diff = commands.add_parser("diff", help="Compare two snapshots (exit 1 if they differ)")
+    diff.add_argument("old", help="e.g. lam:9.2, lam:previous, samba:usn4101, samba:@3fa2c1")
+    diff.add_argument("new", nargs="?", default="latest", help="(default: latest of the same kind)")
+    diff.add_argument("--format", choices=["text", "json"], default="text")
+    diff.add_argument("--max-items", type=int, default=20,
+                      help="Entries to list per section (default: 20)")
+
+    add = commands.add_parser("add", help="Record an existing schema JSON file")
+    add.add_argument("kind", choices=KINDS)
+    add.add_argument("schema", help="Schema JSON file")
+    add.add_argument("--key", help="Snapshot key (default: LAM version / Samba schema USN)")
+
+    export = commands.add_parser("export", help="Write a snapshot out as a schema JSON file")
+    export.add_argument("ref", help="Snapshot, e.g. lam:9.3")
+    export.add_argument("-o", "--output", help=f"Output file (default: a file under {SNAPSHOT_DIR})")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    history = SchemaHistory(args.history)
+    handlers = {"list": main_list, "diff": main_diff, "add": main_add, "export": main_export}
+    try:
+        handlers[args.command](history, args)
+    except (KeyError, ValueError, OSError) as e:
+        message = e.args[0] if isinstance(e, KeyError) and e.args else e
+        print(f"❌ {message}", file=sys.stderr)
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
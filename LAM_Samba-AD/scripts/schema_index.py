@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Compiled lookup index over the extracted LAM and Samba schemas
+Built once per schema version and cached on disk keyed by schema hash
+"""
+
+import hashlib
+import json
+import pickle
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from schema_binary import BinarySchema, BinarySchemaError, known_attribute_names, open_binary_schema
+
+CACHE_DIR = "docs/reference/.cache"
+
+# Placeholder used for non-literal parts of a key, e.g. 'posixAccount_' . $typeId . '_minUID'
+KEY_PLACEHOLDER = "{var}"
+
+def setting_key_pattern(template: str) -> str:
+    """Regex source matching concrete keys for a template like 'posixAccount_{var}_minUID'"""
+    return '^' + r'\w+?'.join(re.escape(part) for part in template.split(KEY_PLACEHOLDER)) + '$'
+
+class SchemaIndex:
+    """Frozen sets, case-insensitive maps and pre-rendered hints for validation"""
+
+    # Bump when the cached layout changes so stale pickles are rebuilt
+    FORMAT_VERSION = 3
+
+    def __init__(self, lam_schema: Dict, samba_schema: Dict,
+                 attribute_table: Optional[BinarySchema] = None):
+        self.has_lam_schema = bool(lam_schema)
+        self.has_samba_schema = bool(samba_schema)
+
+        login_methods = lam_schema.get("loginMethods", [])
+        access_levels = lam_schema.get("accessLevels", [])
+        self.login_methods = frozenset(login_methods)
+        self.access_levels = frozenset(access_levels)
+        self.login_methods_hint = ', '.join(login_methods)
+        self.access_levels_hint = ', '.join(map(str, access_levels))
+
+        # moduleSettings keys from the LAM module scan; per-type keys are templates
+        module_settings = lam_schema.get("moduleSettings", {})
+        self.has_module_settings = bool(module_settings)
+        self.module_setting_shapes = {
+            key: info["shape"] for key, info in module_settings.items()
+            if KEY_PLACEHOLDER not in key
+        }
+        self.module_setting_patterns = [
+            (re.compile(setting_key_pattern(key)), info["shape"])
+            for key, info in module_settings.items() if KEY_PLACEHOLDER in key
+        ]
+
+        safe_user = samba_schema.get("safe_attr_user", [])
+        safe_group = samba_schema.get("safe_attr_group", [])
+        self.safe_attr_user = frozenset(safe_user)
+        self.safe_attr_group = frozenset(safe_group)
+        self.safe_attr_user_hint = ', '.join(safe_user)
+        self.safe_attr_group_hint = ', '.join(safe_group)
+
+        # LDAP attribute names are case-insensitive; map lowercase -> schema spelling.
+        # With the binary schema the lookups go to the mapped file instead.
+        self.attribute_table = attribute_table
+        if attribute_table is not None:
+            self.all_attributes = attribute_table
+            self.attribute_case_map = None
+        else:
+            known = known_attribute_names(samba_schema)
+            self.all_attributes = frozenset(known)
+            self.attribute_case_map = {name.lower(): name for name in sorted(known)}
+        self.safe_attr_user_lower = _lower_map(safe_user)
+        self.safe_attr_group_lower = _lower_map(safe_group)
+
+        self.attribute_warnings = dict(samba_schema.get("warnings", {}))
+        self.attribute_warnings_lower = _lower_map(self.attribute_warnings)
+
+    def module_setting_shape(self, key: str) -> Optional[str]:
+        """Return the value shape of a moduleSettings key, or None if no module defines it"""
+        shape = self.module_setting_shapes.get(key)
+        if shape is None:
+            shape = next((s for pattern, s in self.module_setting_patterns if pattern.match(key)), None)
+        return shape
+
+    def canonical_attribute(self, name: str) -> Optional[str]:
+        """Return the schema spelling of an attribute, ignoring case"""
+        if self.attribute_table is not None:
+            return self.attribute_table.canonical(name)
+        return self.attribute_case_map.get(name.lower())
+
+    def attribute_warning(self, name: str) -> Optional[str]:
+        """Return the known-problem message for an attribute, ignoring case"""
+        canonical = self.attribute_warnings_lower.get(name.lower())
+        return self.attribute_warnings[canonical] if canonical else None
+
+def _lower_map(names: Iterable[str]) -> Dict[str, str]:
+    return {name.lower(): name for name in names}
+
+def schema_hash(*schema_files: str) -> str:
+    """Hash schema file contents (missing files hash as empty)"""
+    digest = hashlib.sha256(str(SchemaIndex.FORMAT_VERSION).encode())
+    for schema_file in schema_files:
+        path = Path(schema_file)
+        digest.update(path.name.encode())
+        digest.update(b'\0')
+        if path.exists():
+            digest.update(path.read_bytes())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def _read_schema(schema_file: str) -> Dict:
+    path = Path(schema_file)
+    if not path.exists():
+        print(f"❌ Schema file not found: {schema_file}", file=sys.stderr)
+        print(f"   Run extract scripts first to generate schemas", file=sys.stderr)
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def load_schema_index(lam_schema_file: str, samba_schema_file: str,
+                      cache_dir: Optional[str] = CACHE_DIR,
+                      use_binary: bool = True) -> Optional[SchemaIndex]:
+    """Load the compiled index from cache, building it from the schemas on a miss
+
+    The Samba attribute table comes from the memory-mapped samba-schema.bin when
+    it is up to date, otherwise from the JSON. Returns None when neither schema
+    file exists.
+    """
+    key = schema_hash(lam_schema_file, samba_schema_file)
+    cache_file = Path(cache_dir) / f"schema-index-{key[:16]}.pickle" if cache_dir else None
+
+    if cache_file and cache_file.exists():
+        try:
+            with open(cache_file, 'rb') as f:
+                index = pickle.load(f)
+            if isinstance(index, SchemaIndex):
+                return index
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, BinarySchemaError):
+            pass  # Corrupt or incompatible cache entry, rebuild below
+
+    lam_schema = _read_schema(lam_schema_file)
+    attribute_table = open_binary_schema(samba_schema_file) if use_binary else None
+    # Compare with None: an empty but valid table is falsy through BinarySchema.__len__
+    samba_schema = attribute_table.meta if attribute_table is not None \
+        else _read_schema(samba_schema_file)
+    if not lam_schema and not samba_schema:
+        return None
+
+    index = SchemaIndex(lam_schema, samba_schema, attribute_table)
+
+    if cache_file:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            for stale in cache_file.parent.glob("schema-index-*.pickle"):
+                stale.unlink()
+            tmp_file = cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_file.replace(cache_file)
+        except OSError as e:
+            print(f"⚠️  Could not write schema index cache: {e}", file=sys.stderr)
+
+    return index
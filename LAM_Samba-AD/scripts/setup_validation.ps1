@@ -60,16 +60,10 @@ if ($dockerAvailable -and $lamAD) {
         New-Item -ItemType Directory -Path $lamSourceDir -Force | Out-Null
     }
     
-    try {
-        docker cp Samba-AD-LAM:/var/www/html/lam/. $lamSourceDir 2>&1 | Out-Null
-        if ($LASTEXITCODE -eq 0) {
-            Write-Host "✓ LAM source extracted to $lamSourceDir" -ForegroundColor Green
-        } else {
-            Write-Host "❌ Failed to extract LAM source" -ForegroundColor Red
-        }
-    } catch {
-        Write-Host "❌ Failed to extract LAM source: $_" -ForegroundColor Red
-    }
+    # extract_lam_schema.py streams only the paths it parses (lib/config.inc,
+    # lib/types.inc, lib/modules/, lib/types/ and VERSION if present) out of the
+    # container instead of copying the whole web root
+    Write-Host "✓ LAM source directory ready: $lamSourceDir (files fetched in step 4)" -ForegroundColor Green
 } else {
     if (-not $dockerAvailable) {
         Write-Host "⚠️  Skipping (Docker not available)" -ForegroundColor Yellow
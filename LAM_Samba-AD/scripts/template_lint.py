@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Lint Unraid template XML against the LAM validator rules before a container is built
+Streams the <Config> variables, renders the profile init.sh would write and runs the validate_* checks
+"""
+
+import argparse
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from validate_lam_config import (LAM_SCHEMA_FILE, SAMBA_SCHEMA_FILE, expand_config_paths, load_rule_dirs,
+                                 load_schemas, print_batch_report, validate_config)
+from validation_results import (Finding, emit_result_events, error, json_pointer, warning, write_json,
+                                write_jsonl)
+
+TEMPLATE_FILE = "samba-ad-lam-combined.xml"
+
+# ${VAR:-default} fallbacks from init.sh, used when the template leaves a variable empty
+INIT_DEFAULTS = {
+    "LAM_LDAP_METHOD": "ldaps",
+    "LAM_USER_SUFFIX": "CN=Users",
+    "LAM_GROUP_SUFFIX": "CN=Users",
+    "LAM_USER_MODULES": "windowsUser,inetOrgPerson",
+    "LAM_GROUP_MODULES": "windowsGroup",
+    "LAM_PROFILE_LANGUAGE": "en_US.utf8:UTF-8:English (USA)",
+    "LAM_PROFILE_TIMEZONE": "UTC",
+    "LAM_UID_RANGE": "10000-30000",
+    "LAM_GID_RANGE": "10000-30000",
+    "LAM_ADMIN_DNS": "CN=Administrator,CN=Users",
+    "LAM_ACCESS_LEVEL": "100",
+}
+
+# Template variable -> the profile fields (JSON pointers) init.sh derives from it
+TEMPLATE_TARGETS = {
+    "DOMAIN": ["/treesuffix", "/loginSearchSuffix"],
+    "DOMAIN_DC": ["/treesuffix", "/loginSearchSuffix"],
+    "LAM_LDAP_METHOD": ["/ServerURL", "/useTLS", "/ignoreTLSErrors"],
+    "LAM_ADMIN_DNS": ["/Admins"],
+    "LAM_ACCESS_LEVEL": ["/accessLevel"],
+    "LAM_USER_SUFFIX": ["/typeSettings/suffix_user"],
+    "LAM_GROUP_SUFFIX": ["/typeSettings/suffix_group"],
+    "LAM_USER_MODULES": ["/typeSettings/modules_user"],
+    "LAM_GROUP_MODULES": ["/typeSettings/modules_group"],
+    "LAM_PROFILE_LANGUAGE": ["/defaultLanguage"],
+    "LAM_PROFILE_TIMEZONE": ["/timeZone"],
+    "LAM_UID_RANGE": ["/moduleSettings/posixAccount_user_minUID",
+                      "/moduleSettings/posixAccount_user_maxUID"],
+    "LAM_GID_RANGE": ["/moduleSettings/posixGroup_group_minGID",
+                      "/moduleSettings/posixGroup_group_maxGID"],
+}
+
+# Connection settings init.sh writes per LAM_LDAP_METHOD (unknown methods fall back to ldaps)
+LDAP_METHODS = {
+    "ldaps": ("ldaps://127.0.0.1:636", "no", "true"),
+    "starttls": ("ldap://127.0.0.1:389", "yes", "true"),
+    "ldap": ("ldap://127.0.0.1:389", "no", "false"),
+    "plain": ("ldap://127.0.0.1:389", "no", "false"),
+}
+
+def iter_template_variables(template_file: str, use_defaults: bool = False):
+    """Yield (Target, value) for each Type="Variable" <Config>, without building a DOM
+
+    The value is the element text (what Unraid pre-fills), or the Default
+    attribute with use_defaults.
+    """
+    context = ET.iterparse(template_file, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event != "end" or elem.tag != "Config":
+            continue
+        if elem.get("Type") == "Variable" and elem.get("Target"):
+            value = elem.get("Default", "") if use_defaults else (elem.text or "")
+            yield elem.get("Target"), value.strip()
+        # Drop finished elements so memory stays flat on large templates
+        root.clear()
+
+def _relative_dn(dn: str, domain_dc: str) -> str:
+    return f"{dn},{domain_dc}" if domain_dc else dn
+
+def render_profile(variables: Dict[str, str]) -> Tuple[Dict, List[Finding]]:
+    """The server profile configureLAMServerProfile in init.sh would write, plus template findings"""
+    findings = []
+    value = lambda name: variables.get(name) or INIT_DEFAULTS.get(name, "")
+
+    domain_dc = variables.get("DOMAIN_DC", "")
+    if not domain_dc and variables.get("DOMAIN"):
+        domain_dc = "DC=" + variables["DOMAIN"].replace(".", ",DC=")
+
+    method = value("LAM_LDAP_METHOD").lower()
+    if method not in LDAP_METHODS:
+        findings.append(warning("template.ldap_method", json_pointer("ServerURL"),
+            f"⚠️  Unknown LAM_LDAP_METHOD: {value('LAM_LDAP_METHOD')}\n"
+            f"   init.sh falls back to ldaps",
+            fix=f"Use one of: {', '.join(LDAP_METHODS)}"
+        ))
+    server_url, use_tls, ignore_tls_errors = LDAP_METHODS.get(method, LDAP_METHODS["ldaps"])
+
+    # init.sh keeps only the first DN and appends the domain DN to it
+    admin_dns = [dn.strip() for dn in value("LAM_ADMIN_DNS").split(';') if dn.strip()]
+    if len(admin_dns) > 1:
+        findings.append(warning("template.admins_dropped", json_pointer("Admins"),
+            f"⚠️  LAM_ADMIN_DNS lists {len(admin_dns)} DNs but init.sh only writes the first\n"
+            f"   Dropped: {'; '.join(admin_dns[1:])}",
+            fix="Add the other admins in LAM after the first boot, or keep one DN here"
+        ))
+    for name in ("LAM_ADMIN_DNS", "LAM_USER_SUFFIX", "LAM_GROUP_SUFFIX"):
+        if re.search(r'(^|,)\s*DC=', value(name), re.IGNORECASE):
+            findings.append(error("template.absolute_dn", TEMPLATE_TARGETS[name][0],
+                f"❌ {name} must be relative to the domain DN: {value(name)}\n"
+                f"   init.sh appends ',{domain_dc or 'DC=...'}' itself",
+                fix="Remove the DC= components"
+            ))
+
+    access_level = value("LAM_ACCESS_LEVEL")
+    if not access_level.isdigit():
+        findings.append(error("template.access_level", json_pointer("accessLevel"),
+            f"❌ LAM_ACCESS_LEVEL must be a number: {access_level}\n"
+            f"   init.sh writes it unquoted, so the profile would not be valid JSON"
+        ))
+
+    module_settings = {}
+    for name, key, bound in (("LAM_UID_RANGE", "posixAccount_user", "UID"),
+                             ("LAM_GID_RANGE", "posixGroup_group", "GID")):
+        low, _, high = value(name).partition('-')
+        module_settings[f"{key}_min{bound}"] = [low]
+        module_settings[f"{key}_max{bound}"] = [high]
+        if not (low.isdigit() and high.isdigit() and int(low) <= int(high)):
+            findings.append(error("template.range", TEMPLATE_TARGETS[name][0],
+                f"❌ {name} must be 'min-max' with min <= max: {value(name)}",
+                fix="e.g. 10000-30000"
+            ))
+
+    config = {
+        "ServerURL": server_url,
+        "useTLS": use_tls,
+        "ignoreTLSErrors": ignore_tls_errors,
+        "defaultLanguage": value("LAM_PROFILE_LANGUAGE"),
+        "timeZone": value("LAM_PROFILE_TIMEZONE"),
+        "treesuffix": domain_dc,
+        "Admins": _relative_dn(admin_dns[0], domain_dc) if admin_dns else "",
+        "accessLevel": int(access_level) if access_level.isdigit() else access_level,
+        "loginMethod": "list",
+        "loginSearchSuffix": domain_dc,
+        "activeTypes": "user,group",
+        "typeSettings": {
+            "suffix_user": _relative_dn(value("LAM_USER_SUFFIX"), domain_dc),
+            "attr_user": "#sAMAccountName;#givenName;#sn;#mail",
+            "modules_user": value("LAM_USER_MODULES"),
+            "suffix_group": _relative_dn(value("LAM_GROUP_SUFFIX"), domain_dc),
+            "attr_group": "#cn;#description;#member",
+            "modules_group": value("LAM_GROUP_MODULES"),
+        },
+        "moduleSettings": module_settings,
+    }
+    return config, findings
+
+def _target_for(pointer: str, present: Dict[str, str]) -> Optional[str]:
+    """The template variable that produced the field at pointer (one set in the template first)"""
+    matches = [name for name, pointers in TEMPLATE_TARGETS.items()
+               if any(pointer == p or pointer.startswith(p + "/") or p.startswith(pointer + "/")
+                      for p in pointers)]
+    return next((name for name in matches if name in present), matches[0] if matches else None)
+
+def attribute_to_template(finding: Finding, present: Dict[str, str]) -> Finding:
+    """Add the <Config Target> that produced the finding's field to its message"""
+    target = _target_for(finding.pointer, present)
+    if target is None:
+        return finding
+    origin = "template value" if target in present else "init.sh default"
+    return Finding(f"{finding}\n   From <Config Target=\"{target}\"> ({origin})",
+                   finding.check, finding.severity, finding.pointer, finding.fix)
+
+def lint_template(template_file: Path, index, use_defaults: bool = False) -> Optional[Dict]:
+    """Validate the profile one template produces; None when it sets no LAM profile variables"""
+    started = time.perf_counter()
+    result = {"path": str(template_file), "errors": [], "warnings": [], "exit_status": 0,
+              "elapsed": 0.0, "size_bytes": 0, "timings": {}}
+    try:
+        result["size_bytes"] = template_file.stat().st_size
+        variables = dict(iter_template_variables(str(template_file), use_defaults))
+    except (OSError, ET.ParseError) as e:
+        result["errors"].append(error("template.xml", "", f"❌ Cannot read template: {e}"))
+        result["exit_status"] = 1
+        return result
+    if not any(name.startswith("LAM_") and name in TEMPLATE_TARGETS for name in variables):
+        return None  # Not a template for the init.sh LAM profile (e.g. the standalone LAM image)
+
+    config, findings = render_profile(variables)
+    errors, warnings = validate_config(config, index, result["timings"])
+    findings += errors + warnings
+    result["errors"] = [attribute_to_template(f, variables) for f in findings if f.severity == "error"]
+    result["warnings"] = [attribute_to_template(f, variables) for f in findings
+                          if f.severity != "error"]
+    result["exit_status"] = 1 if result["errors"] else 0
+    result["elapsed"] = time.perf_counter() - started
+    return result
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Validate the LAM profile that Unraid templates produce, without building the container"
+    )
+    parser.add_argument("templates", nargs="*", default=[TEMPLATE_FILE],
+                        help=f"Template files, globs or directories (default: {TEMPLATE_FILE})")
+    parser.add_argument("--use-defaults", action="store_true",
+                        help="Lint each <Config> Default attribute instead of its value")
+    parser.add_argument("--lam-schema", default=LAM_SCHEMA_FILE)
+    parser.add_argument("--samba-schema", default=SAMBA_SCHEMA_FILE)
+    parser.add_argument("--no-index-cache", action="store_true",
+                        help="Rebuild the compiled schema index instead of using the on-disk cache")
+    parser.add_argument("--rules-dir", action="append", default=[], metavar="DIR",
+                        help="Load site rules from the *.py files in this directory (repeatable)")
+    parser.add_argument("--format", choices=["text", "json", "jsonl"], default="text")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show warnings per template")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    log = (lambda *a: print(*a, file=sys.stderr)) if args.format != "text" else print
+
+    paths = expand_config_paths(args.templates, pattern="*.xml")
+    if not paths:
+        log(f"❌ No templates matched: {' '.join(args.templates)}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    load_rule_dirs(args.rules_dir)
+    index = load_schemas(args.lam_schema, args.samba_schema, not args.no_index_cache)
+    results = []
+    for path in paths:
+        result = lint_template(path, index, args.use_defaults)
+        if result is None:
+            log(f"  • Skipped {path} (no LAM profile variables)")
+        else:
+            results.append(result)
+    elapsed = time.perf_counter() - started
+    emit_result_events(results, elapsed, 1)
+
+    if args.format == "json":
+        write_json(results, {"templates": len(results), "wall_seconds": elapsed}, sys.stdout)
+    elif args.format == "jsonl":
+        write_jsonl(results, {"templates": len(results), "wall_seconds": elapsed}, sys.stdout)
+    else:
+        print_batch_report(results, elapsed, 1, args.verbose)
+    sys.exit(1 if any(r["exit_status"] for r in results) else 0)
+
+if __name__ == "__main__":
+    main()
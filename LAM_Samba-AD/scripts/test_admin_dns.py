@@ -0,0 +1,63 @@
+"""Tests for batched Admins DN resolution against the ldif:// stand-in"""
+
+from conftest import BASE_DN
+from admin_dns import AdminDNResolver, admin_dn_findings, split_admins
+from ldap_session import canonical_dn
+
+class RecordingSession:
+    """Passes searches through to the stand-in, keeping each filter sent"""
+
+    def __init__(self, session):
+        self.session = session
+        self.url = session.url
+        self.filters = []
+
+    def search(self, base, search_filter, attributes, scope="sub", page_size=1000):
+        self.filters.append(search_filter)
+        return self.session.search(base, search_filter, attributes, scope, page_size)
+
+ADMINS = [
+    f"CN=Smith\\, John,CN=Users,{BASE_DN}",
+    f"CN=Former Admin,CN=Users,{BASE_DN}",
+    f"CN=Nobody,CN=Users,{BASE_DN}",
+    f"cn=smith\\2c john, cn=users, dc=example, dc=com",  # Same DN as the first
+    f"CN=user0,CN=Users,{BASE_DN}",
+]
+
+def test_split_admins_keeps_escaped_separators():
+    assert split_admins("CN=a\\;b,DC=x; CN=c,DC=x;") == ["CN=a\\;b,DC=x", "CN=c,DC=x"]
+
+def test_resolve_batches_or_filters(directory):
+    session = RecordingSession(directory)
+    resolver = AdminDNResolver(session, batch_size=2)
+    results = resolver.resolve(ADMINS)
+
+    # Four distinct DNs in batches of two: two OR searches
+    assert resolver.lookups == 2
+    assert len(session.filters) == 2
+    assert all(f.startswith("(|(distinguishedName=") for f in session.filters)
+    assert "smith\\5c, john" in session.filters[0]  # The DN's backslash escaped for the filter
+
+    assert results[canonical_dn(ADMINS[0])]["found"] is True
+    assert results[canonical_dn(ADMINS[0])]["disabled"] is False
+    assert results[canonical_dn(ADMINS[1])]["disabled"] is True
+    assert results[canonical_dn(ADMINS[2])]["found"] is False
+
+def test_resolve_single_dn_uses_plain_filter(directory):
+    session = RecordingSession(directory)
+    AdminDNResolver(session).resolve([ADMINS[4]])
+    assert session.filters == [f"(distinguishedName={canonical_dn(ADMINS[4])})"]
+
+def test_resolve_answers_repeats_from_cache(directory):
+    session = RecordingSession(directory)
+    resolver = AdminDNResolver(session)
+    resolver.resolve(ADMINS)
+    resolver.resolve(reversed(ADMINS))
+    assert resolver.lookups == 1
+
+def test_admin_dn_findings(directory):
+    admins = ';'.join(ADMINS + ["CN=broken\\"])
+    resolutions = AdminDNResolver(directory).resolve(split_admins(admins))
+    errors, warnings = admin_dn_findings(admins, resolutions)
+    assert sorted(e.check for e in errors) == ["login.admin_dn_syntax", "login.admin_not_found"]
+    assert sorted(w.check for w in warnings) == ["login.admin_disabled", "login.admin_duplicate"]
@@ -0,0 +1,45 @@
+"""Tests for fill-rate sampling against the ldif:// stand-in"""
+
+from conftest import BASE_DN
+from directory_stats import (USER_FILTER, DirectoryStatsCache, attribute_stat_warnings,
+                             get_attribute_stats, measure_attributes)
+
+USERS = f"CN=Users,{BASE_DN}"
+
+def test_fill_rate_over_all_entries(directory):
+    stats = get_attribute_stats(directory, USERS, USER_FILTER, ["mail", "cn"], sample=0)
+    assert stats["entries"] == 12  # Ten users plus two admin accounts
+    assert stats["attributes"]["mail"]["populated"] == 3
+    assert stats["attributes"]["mail"]["fill_rate"] == 3 / 12
+    assert stats["attributes"]["cn"]["fill_rate"] == 1.0
+
+def test_sample_stops_early(directory):
+    stats = get_attribute_stats(directory, USERS, USER_FILTER, ["mail"], sample=5)
+    assert stats["entries"] == 5
+    assert stats["attributes"]["mail"]["populated"] == 3  # user0-2 come first in the dump
+
+def test_sparse_column_warning(directory):
+    stats = get_attribute_stats(directory, USERS, USER_FILTER, ["mail", "telephoneNumber"])
+    warnings = attribute_stat_warnings("attr_user", stats)
+    assert [(w.check, w.pointer) for w in warnings] == [
+        ("live.sparse_column", "/typeSettings/attr_user")
+    ]
+    assert "telephoneNumber" in warnings[0]
+
+def test_ranged_reply_measures_first_range(directory):
+    stats = measure_attributes(directory.search(USERS, "(objectClass=group)", ["member"]), ["member"])
+    assert stats["attributes"]["member"]["max_values"] == 1500  # First range only
+
+def test_cache_hit_skips_the_search(directory, tmp_path):
+    cache = DirectoryStatsCache(str(tmp_path / "stats.json"), ttl=60)
+    first = get_attribute_stats(directory, USERS, USER_FILTER, ["mail"], cache=cache)
+
+    class NoSearch:
+        url = directory.url
+        def search(self, *args, **kwargs):
+            raise AssertionError("cached stats should not search")
+
+    reloaded = DirectoryStatsCache(str(tmp_path / "stats.json"), ttl=60)
+    second = get_attribute_stats(NoSearch(), USERS, USER_FILTER, ["mail"], cache=reloaded)
+    assert first["cached"] is False and second["cached"] is True
+    assert second["attributes"] == first["attributes"]
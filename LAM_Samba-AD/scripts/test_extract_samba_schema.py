@@ -0,0 +1,72 @@
+"""Tests for extract_samba_schema.py reading over the ldif:// stand-in"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from conftest import BASE_DN, directory_entries
+from extract_samba_schema import parse_schema_partition, partition_hash
+from ldap_session import LDIFDirectory
+
+SCRIPT = Path(__file__).with_name("extract_samba_schema.py")
+OUTPUT = Path("docs/reference/samba-schema.json")
+
+def run_extractor(cwd: Path, ldif: Path, *extra: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, str(SCRIPT), "--ldap-url", f"ldif://{ldif}",
+                           "--base-dn", BASE_DN, *extra],
+                          cwd=cwd, capture_output=True, text=True, env=dict(os.environ, DOMAINPASS=""))
+
+def test_partition_from_stand_in(directory):
+    partition = parse_schema_partition(directory.search(
+        f"CN=Schema,CN=Configuration,{BASE_DN}",
+        "(|(objectClass=attributeSchema)(objectClass=classSchema))", ["*"], scope="one"))
+    assert sorted(partition["attributes"]) == ["mail", "telephoneNumber"]
+    assert sorted(partition["classes"]) == ["user"]
+    assert partition["highest_usn"] == 12
+
+def test_incremental_run_is_a_no_op(tmp_path, directory_ldif):
+    first = run_extractor(tmp_path, directory_ldif)
+    assert first.returncode == 0, first.stdout + first.stderr
+    output = tmp_path / OUTPUT
+    schema = json.loads(output.read_text())
+    assert schema["source_fingerprint"]["schema_usn"] == 12
+    written = output.stat().st_mtime_ns
+
+    second = run_extractor(tmp_path, directory_ldif, "--incremental")
+    assert second.returncode == 0, second.stdout + second.stderr
+    assert "unchanged since USN 12" in second.stdout
+    assert output.stat().st_mtime_ns == written
+
+def test_incremental_run_sees_schema_change(tmp_path, directory_ldif):
+    assert run_extractor(tmp_path, directory_ldif).returncode == 0
+    directory_ldif.write_text(directory_entries() + (
+        f"dn: CN=Employee-Number,CN=Schema,CN=Configuration,{BASE_DN}\n"
+        "objectClass: attributeSchema\nlDAPDisplayName: employeeNumber\n"
+        "attributeSyntax: 2.5.5.12\noMSyntax: 64\nisSingleValued: TRUE\nuSNChanged: 20\n\n"
+    ), encoding='utf-8')
+    second = run_extractor(tmp_path, directory_ldif, "--incremental")
+    assert second.returncode == 0, second.stdout + second.stderr
+    schema = json.loads((tmp_path / OUTPUT).read_text())
+    assert schema["source_fingerprint"]["schema_usn"] == 20
+
+def test_empty_partition_keeps_previous_schema(tmp_path, directory_ldif):
+    assert run_extractor(tmp_path, directory_ldif).returncode == 0
+    before = (tmp_path / OUTPUT).read_bytes()
+    empty = tmp_path / "empty.ldif"
+    empty.write_text(f"dn: {BASE_DN}\nobjectClass: domain\n\n", encoding='utf-8')
+    result = run_extractor(tmp_path, empty)
+    assert result.returncode == 1
+    assert (tmp_path / OUTPUT).read_bytes() == before
+
+def test_partition_hash_ignores_entry_order(directory_ldif, tmp_path):
+    reordered = tmp_path / "reordered.ldif"
+    blocks = directory_ldif.read_text(encoding='utf-8').split('\n\n')
+    reordered.write_text('\n\n'.join(reversed([b for b in blocks if b])) + '\n\n', encoding='utf-8')
+    partitions = [
+        parse_schema_partition(LDIFDirectory(str(path)).search(
+            f"CN=Schema,CN=Configuration,{BASE_DN}", "(objectClass=*)", ["*"], scope="one"))
+        for path in (directory_ldif, reordered)
+    ]
+    assert partition_hash(partitions[0]) == partition_hash(partitions[1])
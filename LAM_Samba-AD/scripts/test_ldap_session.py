@@ -0,0 +1,82 @@
+"""Tests for DN handling and the ldif:// stand-in server"""
+
+import pytest
+
+from conftest import BASE_DN, BIG_GROUP_MEMBERS
+from ldap_session import canonical_dn, escape_filter_value, parse_dn
+
+def test_parse_dn_undoes_escapes():
+    assert parse_dn("CN=Smith\\, John,OU=R\\26D,DC=example,DC=com") == [
+        [("CN", "Smith, John")], [("OU", "R&D")], [("DC", "example")], [("DC", "com")]
+    ]
+    assert parse_dn("CN=Caf\\C3\\A9,DC=x") == [[("CN", "Café")], [("DC", "x")]]
+    assert parse_dn("CN=\\ padded\\ ,DC=x")[0] == [("CN", " padded ")]
+
+def test_parse_dn_multi_valued_rdn():
+    assert parse_dn("CN=a+UID=b,DC=x")[0] == [("CN", "a"), ("UID", "b")]
+
+@pytest.mark.parametrize("dn", ["CN=a,", "CN", "=a,DC=x", "CN=a\\,DC=x\\", "CN=bad\\zz"])
+def test_parse_dn_rejects_malformed(dn):
+    with pytest.raises(ValueError):
+        parse_dn(dn)
+
+def test_canonical_dn_matches_spellings():
+    spellings = [
+        "CN=Smith\\, John,CN=Users,DC=example,DC=com",
+        "cn=smith\\, john, cn=users, dc=EXAMPLE, dc=com",
+        "CN=Smith\\2C John,CN=Users,DC=example,DC=com",
+        "CN = Smith\\, John ,CN=Users,DC=example,DC=com",
+    ]
+    assert {canonical_dn(dn) for dn in spellings} == {"cn=smith\\, john,cn=users,dc=example,dc=com"}
+    assert canonical_dn("UID=b+CN=a,DC=x") == canonical_dn("cn=A+uid=B,dc=X")
+
+def test_canonical_dn_round_trips():
+    for dn in ["CN=\\#hash,DC=x", "CN=trail\\ ,DC=x", "CN=a\\+b\\;c,DC=x"]:
+        canonical = canonical_dn(dn)
+        assert canonical_dn(canonical) == canonical
+
+def test_escape_filter_value():
+    assert escape_filter_value("a*(b)\\") == "a\\2a\\28b\\29\\5c"
+
+def test_search_scope_and_filter(directory):
+    users = list(directory.search(f"CN=Users,{BASE_DN}", "(&(objectClass=user)(mail=*))", ["mail"]))
+    assert sorted(attrs["mail"][0] for _, attrs in users) == \
+        ["user0@example.com", "user1@example.com", "user2@example.com"]
+    # distinguishedName compares canonical DNs, whatever the spelling
+    spelling = escape_filter_value("cn=smith\\2c john, cn=users, dc=example, dc=com")
+    found = list(directory.search(BASE_DN, f"(distinguishedName={spelling})", ["cn"]))
+    assert [dn for dn, _ in found] == [f"CN=Smith\\, John,CN=Users,{BASE_DN}"]
+    assert list(directory.search(f"CN=Users,{BASE_DN}", "(cn=user1)", ["cn"], scope="base")) == []
+
+def test_range_retrieval_above_max_value_range(directory):
+    base = f"CN=Big Group,CN=Users,{BASE_DN}"
+    (_, attrs), = directory.search(base, "(objectClass=group)", ["member"], scope="base")
+    assert list(attrs) == ["member;range=0-1499"]
+    assert len(attrs["member;range=0-1499"]) == 1500
+
+    values = []
+    low = 0
+    while True:
+        (_, attrs), = directory.search(base, "(objectClass=group)", [f"member;range={low}-*"],
+                                       scope="base")
+        (description, chunk), = attrs.items()
+        values.extend(chunk)
+        end = description.rsplit('-', 1)[1]
+        if end == '*':
+            break
+        low = int(end) + 1
+    assert len(values) == BIG_GROUP_MEMBERS
+    assert len(set(values)) == BIG_GROUP_MEMBERS
+
+def test_small_attribute_is_not_ranged(directory):
+    (_, attrs), = directory.search(f"CN=Small Group,CN=Users,{BASE_DN}", "(objectClass=group)",
+                                   ["member"], scope="base")
+    assert list(attrs) == ["member"]
+
+def test_group_member_cost_follows_ranges(directory):
+    from group_member_cost import measure_groups
+    stats = measure_groups(directory, f"CN=Users,{BASE_DN}", ["cn", "member"], page_size=10)
+    member = stats["columns"]["member"]
+    assert member["max_values"] == BIG_GROUP_MEMBERS
+    assert member["values"] == BIG_GROUP_MEMBERS + 1
+    assert member["ranged_groups"] == 1
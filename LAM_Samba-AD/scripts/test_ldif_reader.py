@@ -0,0 +1,32 @@
+"""Tests for LDIF sampling limits and their command-line types"""
+
+import argparse
+
+import pytest
+
+from ldif_reader import non_negative_int, positive_int, sample_attribute_occurrences
+
+def _entries(count):
+    return ((f"CN=u{n},DC=x", {"cn": [f"u{n}"], **({"mail": ["m"]} if n == 5 else {})})
+            for n in range(count))
+
+def test_positive_int_rejects_zero_and_junk():
+    assert positive_int("500") == 500
+    for text in ("0", "-3", "x", ""):
+        with pytest.raises(argparse.ArgumentTypeError):
+            positive_int(text)
+
+def test_non_negative_int_allows_zero():
+    assert non_negative_int("0") == 0
+    with pytest.raises(argparse.ArgumentTypeError):
+        non_negative_int("-1")
+
+def test_sample_stops_on_stable_pages():
+    seen, counts, reason = sample_attribute_occurrences(_entries(100), page_size=2, stable_pages=3)
+    assert seen == 12  # mail appears on entry 5, then three unchanged pages
+    assert counts["mail"] == 1
+    assert "stable" in reason
+
+def test_sample_rejects_zero_page_size():
+    with pytest.raises(ValueError):
+        sample_attribute_occurrences(_entries(3), page_size=0, stable_pages=1)
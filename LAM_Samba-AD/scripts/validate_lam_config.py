@@ -4,10 +4,24 @@ Validate LAM configuration against extracted schemas
 This prevents configuration errors before deployment
 """
 
+import argparse
+import glob
 import json
+import os
+import re
 import sys
+import time
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ldif_reader import non_negative_int
+from rule_registry import Rule, RuleRegistry, run_check
+from schema_index import CACHE_DIR, SchemaIndex, load_schema_index, schema_hash
+from validation_results import (TimingCollector, add_hook, emit_result_events, error, json_pointer,
+                                load_hook, phase, warning, write_json, write_jsonl)
+
+LAM_SCHEMA_FILE = "docs/reference/lam-config-schema.json"
+SAMBA_SCHEMA_FILE = "docs/reference/samba-schema.json"
 
 def load_schema(schema_file: str) -> Dict:
     """Load extracted schema JSON"""
@@ -20,57 +34,80 @@ def load_schema(schema_file: str) -> Dict:
     with open(path, 'r') as f:
         return json.load(f)
 
-def validate_login_config(config: Dict, lam_schema: Dict) -> Tuple[List[str], List[str]]:
+def validate_login_config(config: Dict, lam_schema: Dict,
+                          index: Optional[SchemaIndex] = None) -> Tuple[List[str], List[str]]:
     """Validate login-related configuration"""
     errors = []
     warnings = []
+    if index is None:
+        index = SchemaIndex(lam_schema, {})
     
     # Validate loginMethod
     login_method = config.get("loginMethod")
-    valid_methods = lam_schema.get("loginMethods", [])
     
-    if not valid_methods:
-        warnings.append("LAM schema has no login methods defined - schema may be incomplete")
-    elif login_method not in valid_methods:
-        errors.append(
+    if not index.login_methods:
+        warnings.append(warning("login.schema_incomplete", "",
+            "LAM schema has no login methods defined - schema may be incomplete",
+            fix="Re-run extract_lam_schema.py"))
+    elif not _is_member(login_method, index.login_methods):
+        errors.append(error("login.method", json_pointer("loginMethod"),
             f"❌ Invalid loginMethod: '{login_method}'\n"
-            f"   Valid values: {', '.join(valid_methods)}\n"
-            f"   Source: LAM source code lib/config.inc"
-        )
+            f"   Valid values: {index.login_methods_hint}\n"
+            f"   Source: LAM source code lib/config.inc",
+            fix=f"Set loginMethod to one of: {index.login_methods_hint}"
+        ))
     
     # Validate accessLevel
     access_level = config.get("accessLevel")
-    valid_levels = lam_schema.get("accessLevels", [])
     
-    if valid_levels and access_level not in valid_levels:
-        errors.append(
+    if index.access_levels and not _is_member(access_level, index.access_levels):
+        errors.append(error("login.access_level", json_pointer("accessLevel"),
             f"❌ Invalid accessLevel: {access_level}\n"
-            f"   Valid values: {', '.join(map(str, valid_levels))}"
-        )
+            f"   Valid values: {index.access_levels_hint}",
+            fix=f"Set accessLevel to one of: {index.access_levels_hint}"
+        ))
     
     # Validate Admins format
     admins = config.get("Admins")
     if isinstance(admins, list):
-        errors.append(
+        errors.append(error("login.admins_type", json_pointer("Admins"),
             f"❌ Admins must be semicolon-separated STRING, not array\n"
             f"   Current: {type(admins).__name__}\n"
-            f"   Example: 'CN=Administrator,CN=Users,DC=haver,DC=internal'"
-        )
+            f"   Example: 'CN=Administrator,CN=Users,DC=haver,DC=internal'",
+            fix="Join the admin DNs with ';' into one string"
+        ))
     elif isinstance(admins, str):
-        if ';' not in admins and ',' in admins:
-            warnings.append(
+        if ';' not in admins and len(split_comma_admins(admins)) > 1:
+            warnings.append(warning("login.admins_separator", json_pointer("Admins"),
                 f"⚠️  Admins uses comma separators; should be semicolon\n"
-                f"   Multiple admins: use ';' not ','"
-            )
+                f"   Multiple admins: use ';' not ','",
+                fix="Separate admin DNs with ';'"
+            ))
         # Validate DN format
-        if admins and not admins.startswith("CN="):
-            warnings.append(
+        if admins and admins[:3].upper() != "CN=":
+            warnings.append(warning("login.admins_dn", json_pointer("Admins"),
                 f"⚠️  Admins DN should start with 'CN='\n"
                 f"   Current: {admins[:50]}"
-            )
+            ))
     
     return errors, warnings
 
+def split_comma_admins(admins: str) -> List[str]:
+    """Split comma-joined admin DNs; a new DN starts at the first RDN after a DC= run"""
+    dns = []
+    current: List[str] = []
+    previous_dc = False
+    for component in re.split(r'(?<!\\),', admins):
+        is_dc = component.split('=', 1)[0].strip().lower() == "dc"
+        if current and previous_dc and not is_dc:
+            dns.append(','.join(current))
+            current = []
+        current.append(component.strip())
+        previous_dc = is_dc
+    if current:
+        dns.append(','.join(current))
+    return dns
+
 def validate_structure(config: Dict) -> Tuple[List[str], List[str]]:
     """Validate overall config structure"""
     errors = []
@@ -78,79 +115,127 @@ def validate_structure(config: Dict) -> Tuple[List[str], List[str]]:
     
     # Check for deprecated structure
     if "types" in config or "modules" in config:
-        errors.append(
+        errors.append(error("structure.deprecated",
+            json_pointer("types" if "types" in config else "modules"),
             f"❌ Config uses deprecated 'types'/'modules' structure\n"
             f"   Should use 'typeSettings' instead\n"
-            f"   LAM 9.x uses: typeSettings.suffix_user, typeSettings.attr_user, etc."
-        )
+            f"   LAM 9.x uses: typeSettings.suffix_user, typeSettings.attr_user, etc.",
+            fix="Move the settings into typeSettings"
+        ))
     
     # Check for required sections
     if "typeSettings" not in config:
-        errors.append(
+        errors.append(error("structure.type_settings", json_pointer("typeSettings"),
             f"❌ Missing required 'typeSettings' section\n"
-            f"   Required for LAM 9.x configuration"
-        )
+            f"   Required for LAM 9.x configuration",
+            fix="Add a typeSettings object (suffix_user, attr_user, modules_user, ...)"
+        ))
     
     # Check serverURL format
     server_url = config.get("ServerURL")
     if server_url:
         if not server_url.startswith("ldaps://"):
-            warnings.append(
+            warnings.append(warning("structure.server_url", json_pointer("ServerURL"),
                 f"⚠️  ServerURL should use ldaps:// for security\n"
-                f"   Current: {server_url}"
-            )
+                f"   Current: {server_url}",
+                fix="Use an ldaps:// URL"
+            ))
     
     return errors, warnings
 
-def validate_attributes(config: Dict, samba_schema: Dict) -> Tuple[List[str], List[str]]:
+def _is_member(value, valid: frozenset) -> bool:
+    """Set membership that treats unhashable config values as invalid"""
+    try:
+        return value in valid
+    except TypeError:
+        return False
+
+def _split_attributes(attr_list: str) -> List[str]:
+    return [a.lstrip('#') for a in attr_list.split(';') if a]
+
+def validate_attributes(config: Dict, samba_schema: Dict,
+                        index: Optional[SchemaIndex] = None) -> Tuple[List[str], List[str]]:
     """Validate attr_user/attr_group against Samba schema"""
     errors = []
     warnings = []
+    if index is None:
+        index = SchemaIndex({}, samba_schema)
     
     type_settings = config.get("typeSettings", {})
-    safe_attrs = samba_schema.get("safe_attr_user", [])
-    schema_warnings = samba_schema.get("warnings", {})
     
     # Validate user attributes
     attr_user = type_settings.get("attr_user", "")
     if attr_user:
-        attributes = [a.lstrip('#') for a in attr_user.split(';') if a]
-        
-        for attr in attributes:
+        for attr in _split_attributes(attr_user):
             # Check if attribute is in safe list
-            if safe_attrs and attr not in safe_attrs:
-                if attr in schema_warnings:
-                    errors.append(
-                        f"❌ attr_user uses problematic attribute: {attr}\n"
-                        f"   {schema_warnings[attr]}\n"
-                        f"   This will cause TypeError in LAM ListAttribute::getAlias()"
-                    )
-                else:
-                    warnings.append(
-                        f"⚠️  attr_user uses non-standard attribute: {attr}\n"
-                        f"   Safe attributes: {', '.join(safe_attrs)}\n"
-                        f"   Verify this exists in your Samba AD schema"
-                    )
+            if not index.safe_attr_user or attr in index.safe_attr_user:
+                continue
+            
+            safe_spelling = index.safe_attr_user_lower.get(attr.lower())
+            problem = index.attribute_warning(attr)
+            schema_spelling = safe_spelling or (None if problem else index.canonical_attribute(attr))
+            if schema_spelling and schema_spelling != attr:
+                warnings.append(warning("attributes.case", json_pointer("typeSettings", "attr_user"),
+                    f"⚠️  attr_user attribute has wrong case: {attr}\n"
+                    f"   Schema spelling: {schema_spelling}\n"
+                    f"   Use the schema spelling so LAM column aliases match",
+                    fix=f"Replace #{attr} with #{schema_spelling}"
+                ))
+            elif problem:
+                errors.append(error("attributes.problematic", json_pointer("typeSettings", "attr_user"),
+                    f"❌ attr_user uses problematic attribute: {attr}\n"
+                    f"   {problem}\n"
+                    f"   This will cause TypeError in LAM ListAttribute::getAlias()",
+                    fix=f"Remove #{attr} from attr_user"
+                ))
+            elif not schema_spelling and len(index.all_attributes):
+                warnings.append(warning("attributes.not_in_schema", json_pointer("typeSettings", "attr_user"),
+                    f"⚠️  attr_user attribute is not in the Samba AD schema: {attr}\n"
+                    f"   LAM will show an empty column for it",
+                    fix=f"Remove #{attr} from attr_user or correct its spelling"
+                ))
+            else:
+                warnings.append(warning("attributes.non_standard", json_pointer("typeSettings", "attr_user"),
+                    f"⚠️  attr_user uses non-standard attribute: {attr}\n"
+                    f"   Safe attributes: {index.safe_attr_user_hint}\n"
+                    f"   Verify this exists in your Samba AD schema"
+                ))
     else:
-        warnings.append("⚠️  No attr_user configured - user list will be empty")
+        warnings.append(warning("attributes.attr_user_missing", json_pointer("typeSettings", "attr_user"),
+            "⚠️  No attr_user configured - user list will be empty",
+            fix="Set attr_user, e.g. '#sAMAccountName;#givenName;#sn;#mail'"))
     
     # Validate group attributes
     attr_group = type_settings.get("attr_group", "")
     if attr_group:
-        safe_group_attrs = samba_schema.get("safe_attr_group", [])
-        attributes = [a.lstrip('#') for a in attr_group.split(';') if a]
-        
-        for attr in attributes:
-            if safe_group_attrs and attr not in safe_group_attrs:
-                warnings.append(
+        for attr in _split_attributes(attr_group):
+            if not index.safe_attr_group or attr in index.safe_attr_group:
+                continue
+            
+            schema_spelling = index.safe_attr_group_lower.get(attr.lower()) or \
+                index.canonical_attribute(attr)
+            if schema_spelling and schema_spelling != attr:
+                warnings.append(warning("attributes.case", json_pointer("typeSettings", "attr_group"),
+                    f"⚠️  attr_group attribute has wrong case: {attr}\n"
+                    f"   Schema spelling: {schema_spelling}",
+                    fix=f"Replace #{attr} with #{schema_spelling}"
+                ))
+            elif not schema_spelling and len(index.all_attributes):
+                warnings.append(warning("attributes.not_in_schema", json_pointer("typeSettings", "attr_group"),
+                    f"⚠️  attr_group attribute is not in the Samba AD schema: {attr}",
+                    fix=f"Remove #{attr} from attr_group or correct its spelling"
+                ))
+            else:
+                warnings.append(warning("attributes.non_standard", json_pointer("typeSettings", "attr_group"),
                     f"⚠️  attr_group uses non-standard attribute: {attr}\n"
-                    f"   Safe attributes: {', '.join(safe_group_attrs)}"
-                )
+                    f"   Safe attributes: {index.safe_attr_group_hint}"
+                ))
     
     return errors, warnings
 
-def validate_module_settings(config: Dict) -> Tuple[List[str], List[str]]:
-    """Validate moduleSettings format"""
+def validate_module_settings(config: Dict,
+                             index: Optional[SchemaIndex] = None) -> Tuple[List[str], List[str]]:
+    """Validate moduleSettings format, and keys/shapes when the module scan is available"""
     errors = []
     warnings = []
     
@@ -161,34 +246,588 @@ def validate_module_settings(config: Dict) -> Tuple[List[str], List[str]]:
     # Check that values are arrays
     for key, value in module_settings.items():
         if not isinstance(value, list):
-            errors.append(
+            errors.append(error("module_settings.type", json_pointer("moduleSettings", key),
                 f"❌ moduleSettings['{key}'] must be array\n"
                 f"   Current type: {type(value).__name__}\n"
-                f"   Example: 'windowsUser_0': ['value1', 'value2']"
-            )
+                f"   Example: 'windowsUser_0': ['value1', 'value2']",
+                fix=f"Wrap the value in a list: [{json.dumps(value)}]"
+            ))
+            continue
+        
+        if index is None or not index.has_module_settings:
+            continue
+        shape = index.module_setting_shape(key)
+        if shape is None:
+            warnings.append(warning("module_settings.unknown_key", json_pointer("moduleSettings", key),
+                f"⚠️  moduleSettings key not defined by any LAM module: {key}\n"
+                f"   LAM ignores unknown keys; check the module name and option spelling"
+            ))
+        elif shape == "boolean" and value not in (["true"], ["false"]):
+            errors.append(error("module_settings.boolean", json_pointer("moduleSettings", key),
+                f"❌ moduleSettings['{key}'] is a checkbox option\n"
+                f"   Current: {value}\n"
+                f"   Valid values: ['true'], ['false']",
+                fix="Use ['true'] or ['false']"
+            ))
     
     return errors, warnings
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: validate_lam_config.py <haver.conf>")
-        print("\nValidates LAM configuration against extracted schemas")
-        print("Run extract_lam_schema.py and extract_samba_schema.py first")
+def validate_live_attributes(config: Dict, session, cache=None,
+                             sample: int = 500) -> Tuple[List[str], List[str]]:
+    """Check attr_user/attr_group columns against populated data in the live directory"""
+    from directory_stats import GROUP_FILTER, USER_FILTER, attribute_stat_warnings, get_attribute_stats
+    from ldap_session import LDAPError
+    errors = []
+    warnings = []
+    
+    type_settings = config.get("typeSettings", {})
+    for type_name, search_filter in (("user", USER_FILTER), ("group", GROUP_FILTER)):
+        setting = f"attr_{type_name}"
+        # Columns may carry a label ('mail:Email'); only the attribute is fetched
+        attributes = [a.split(':', 1)[0] for a in _split_attributes(type_settings.get(setting, ""))]
+        base = type_settings.get(f"suffix_{type_name}") or config.get("treesuffix", "")
+        if not attributes or not base:
+            continue
+        try:
+            stats = get_attribute_stats(session, base, search_filter, attributes, sample, cache=cache)
+        except LDAPError as e:
+            warnings.append(warning("live.unavailable", json_pointer("typeSettings", setting),
+                f"⚠️  Could not sample {setting} under {base}: {e}",
+                fix="Check the live directory connection and search base"
+            ))
+            continue
+        print(f"  • {setting}: {stats['entries']} entries sampled under {base}"
+              f"{' (cached)' if stats['cached'] else ''}", file=sys.stderr)
+        warnings.extend(attribute_stat_warnings(setting, stats))
+    
+    return errors, warnings
+
+def validate_admin_dns(config: Dict, resolver) -> Tuple[List[str], List[str]]:
+    """Check that every Admins DN exists (and is enabled) in the live directory"""
+    from admin_dns import admin_dn_findings, split_admins
+    from ldap_session import LDAPError
+    try:
+        resolutions = resolver.resolve(split_admins(config.get("Admins")))
+    except LDAPError as e:
+        return [], [warning("live.unavailable", json_pointer("Admins"),
+            f"⚠️  Could not look up the Admins DNs: {e}",
+            fix="Check the live directory connection"
+        )]
+    return admin_dn_findings(config.get("Admins"), resolutions)
+
+def open_admin_resolver(args: argparse.Namespace, session):
+    """Batched admin DN lookups over the live session, cached for --admin-ttl seconds"""
+    from admin_dns import ADMIN_CACHE_FILE, AdminDNResolver
+    from directory_stats import DirectoryStatsCache
+    cache = DirectoryStatsCache(None if args.no_stats_cache else ADMIN_CACHE_FILE, args.admin_ttl)
+    return AdminDNResolver(session, cache)
+
+def open_live_session(args: argparse.Namespace):
+    """Open the pooled LDAP session and stats cache for --live-ldap-url"""
+    from directory_stats import STATS_CACHE_FILE, DirectoryStatsCache
+    from ldap_session import LDAPError, get_session
+    try:
+        session = get_session(args.live_ldap_url, args.bind_dn, args.password, args.tls_ca_file)
+    except LDAPError as e:
+        print(f"❌ Live directory checks unavailable: {e}", file=sys.stderr)
         sys.exit(1)
+    cache = DirectoryStatsCache(None if args.no_stats_cache else STATS_CACHE_FILE, args.stats_ttl)
+    return session, cache
+
+def apply_live_checks(results: List[Dict], args: argparse.Namespace):
+    """Add live directory findings to batch results (one session, in this process)"""
+    session, cache = open_live_session(args)
+    configs = {}
+    for result in results:
+        if result["exit_status"] != 0:
+            continue
+        with open(result["path"], 'r') as f:
+            configs[result["path"]] = json.load(f)
+    
+    resolver = None
+    if args.check_admins:
+        from admin_dns import split_admins
+        from ldap_session import LDAPError
+        resolver = open_admin_resolver(args, session)
+        # Every profile's admins in one batched lookup; the per-profile checks then hit the cache
+        try:
+            resolver.resolve(dn for config in configs.values() for dn in split_admins(config.get("Admins")))
+            print(f"  • Admins: {resolver.lookups} LDAP lookup(s) for {len(configs)} profile(s)",
+                  file=sys.stderr)
+        except LDAPError as e:
+            # Each profile retries its own admins and reports live.unavailable if that fails too
+            print(f"⚠️  Batched Admins lookup failed: {e}", file=sys.stderr)
+    
+    for result in results:
+        config = configs.get(result["path"])
+        if config is None:
+            continue
+        _, warnings = run_check(result["timings"], "live_attributes", validate_live_attributes,
+                                config, session, cache, args.live_sample)
+        result["warnings"].extend(warnings)
+        if resolver is not None:
+            errors, warnings = run_check(result["timings"], "admin_dns", validate_admin_dns,
+                                         config, resolver)
+            result["errors"].extend(errors)
+            result["warnings"].extend(warnings)
+
+# Built-in checks, in report order. Each declares what it reads as JSON pointers
+# into the config and the two schemas; "config_presence" inputs only matter when
+# the key is added or removed. The config is walked once per profile and every
+# check sees only its declared keys; config_diff.py re-runs a check only when one
+# of its inputs changed. Site rules are added with --rules-dir.
+REGISTRY = RuleRegistry()
+REGISTRY.register(Rule(
+    "login", lambda config, index: validate_login_config(config, {}, index),
+    {"config": ["/loginMethod", "/accessLevel", "/Admins"],
+     "lam_schema": ["/loginMethods", "/accessLevels"]},
+    requires=["lam_schema"], label="Checking login configuration..."))
+REGISTRY.register(Rule(
+    "structure", lambda config, index: validate_structure(config),
+    {"config": ["/types", "/modules", "/ServerURL"],
+     "config_presence": ["/typeSettings"]},
+    label="Checking config structure..."))
+REGISTRY.register(Rule(
+    "attributes", lambda config, index: validate_attributes(config, {}, index),
+    {"config": ["/typeSettings/attr_user", "/typeSettings/attr_group"],
+     "samba_schema": ["/all_attributes", "/attribute_metadata", "/default_user_attributes",
+                      "/common_user_attributes", "/safe_attr_user", "/safe_attr_group",
+                      "/warnings"]},
+    requires=["samba_schema"], label="Checking attributes against Samba schema..."))
+REGISTRY.register(Rule(
+    "module_settings", validate_module_settings,
+    {"config": ["/moduleSettings"],
+     "lam_schema": ["/moduleSettings"]},
+    label="Checking module settings..."))
+
+def load_rule_dirs(rule_dirs: Iterable[str]):
+    """Register the site rules in each --rules-dir, exiting on a broken plugin"""
+    for rule_dir in rule_dirs:
+        try:
+            REGISTRY.load_plugins(rule_dir)
+        except Exception as e:
+            print(f"❌ Cannot load rules from {rule_dir}: {e}", file=sys.stderr)
+            sys.exit(2)
+
+def available_checks(index: SchemaIndex) -> List[str]:
+    """Names of the checks validate_config runs with this index, in report order"""
+    return REGISTRY.available(index)
+
+def validate_config(config: Dict, index: SchemaIndex, timings: Optional[Dict] = None,
+                    checks: Optional[Iterable[str]] = None,
+                    progress: Optional[Callable[[Rule], None]] = None) -> Tuple[List[str], List[str]]:
+    """Run the registered checks against one loaded config (all, or only those named)
+
+    Per-check seconds and finding counts are stored in timings when given;
+    progress is called with each rule before it runs.
+    """
+    all_errors = []
+    all_warnings = []
+    
+    for errors, warnings in REGISTRY.run_each(config, index, timings, checks, progress).values():
+        all_errors.extend(errors)
+        all_warnings.extend(warnings)
     
-    config_file = sys.argv[1]
+    return all_errors, all_warnings
+
+def expand_config_paths(targets: List[str], pattern: str = "*.conf") -> List[Path]:
+    """Expand files, glob patterns and directories (pattern, recursive) into a sorted list"""
+    paths = []
+    seen = set()
+    
+    for target in targets:
+        if Path(target).is_dir():
+            matches = sorted(str(p) for p in Path(target).rglob(pattern))
+        elif glob.has_magic(target):
+            matches = sorted(glob.glob(target, recursive=True))
+        else:
+            matches = [target]
+        
+        for match in matches:
+            path = Path(match)
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
     
-    # Load schemas
-    print("Loading schemas...")
-    lam_schema = load_schema("docs/reference/lam-config-schema.json")
-    samba_schema = load_schema("docs/reference/samba-schema.json")
+    return paths
+
+# The compiled index is handed to each pool worker once, not once per config
+_worker_index: Optional[SchemaIndex] = None
+
+def _init_worker(index: SchemaIndex, rule_dirs: Tuple[str, ...] = ()):
+    global _worker_index
+    _worker_index = index
+    # Spawned workers start without the site rules; forked ones skip the reload
+    for rule_dir in rule_dirs:
+        REGISTRY.load_plugins(rule_dir)
+
+def validate_file(config_path: Path, index: SchemaIndex) -> Dict:
+    """Load and validate one config file, returning a per-file result record"""
+    started = time.perf_counter()
+    result = {
+        "path": str(config_path),
+        "errors": [],
+        "warnings": [],
+        "exit_status": 0,
+        "elapsed": 0.0,
+        "size_bytes": 0,
+        "timings": {}
+    }
     
-    if not lam_schema and not samba_schema:
+    if not config_path.exists():
+        result["errors"].append(error("file.missing", "", f"❌ Config file not found: {config_path}"))
+    else:
+        try:
+            result["size_bytes"] = config_path.stat().st_size
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except json.JSONDecodeError as e:
+            result["errors"].append(error("file.json", "", f"❌ Invalid JSON in config file: {e}",
+                                          fix="Fix the JSON syntax (python3 -m json.tool shows the position)"))
+        except (OSError, UnicodeDecodeError) as e:
+            # Unreadable, removed since the check above, or not UTF-8: one file's error, not a crash
+            result["errors"].append(error("file.read", "", f"❌ Cannot read config file: {e}",
+                                          fix="Check the file permissions and that it is saved as UTF-8"))
+        else:
+            errors, warnings = validate_config(config, index, result["timings"])
+            result["errors"] = errors
+            result["warnings"] = warnings
+    
+    result["exit_status"] = 1 if result["errors"] else 0
+    result["elapsed"] = time.perf_counter() - started
+    return result
+
+def _validate_file_worker(config_path: Path) -> Dict:
+    return validate_file(config_path, _worker_index)
+
+def run_batch(paths: List[Path], index: SchemaIndex, jobs: int) -> List[Dict]:
+    """Validate many configs, fanning out across a process pool when jobs > 1"""
+    if jobs <= 1 or len(paths) <= 1:
+        return [validate_file(path, index) for path in paths]
+    
+    # Deferred: the pool machinery is the most expensive import on the single-file path
+    from concurrent.futures import ProcessPoolExecutor
+    
+    # Large chunks keep IPC overhead small relative to the per-config work
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(index, tuple(REGISTRY.plugin_dirs))
+    ) as pool:
+        return list(pool.map(_validate_file_worker, paths, chunksize=chunksize))
+
+def open_result_cache(args: argparse.Namespace):
+    """The content-addressed result cache, or None with --no-cache"""
+    if args.no_cache:
+        return None
+    from result_cache import RESULT_CACHE_FILE, ResultCache
+    return ResultCache(RESULT_CACHE_FILE, args.cache_max_mb * 1024 * 1024)
+
+def validator_key() -> str:
+    """Fingerprint of the modules whose code decides the offline check results"""
+    import rule_registry
+    import schema_binary
+    import schema_index
+    import validation_results
+    from result_cache import validator_fingerprint
+    # lam_modules only shapes the extracted schema, which the schema hash already covers
+    return validator_fingerprint([__file__, rule_registry.__file__, schema_index.__file__,
+                                  schema_binary.__file__, validation_results.__file__]
+                                 + REGISTRY.plugin_files)
+
+def run_cached_batch(paths: List[Path], index: SchemaIndex, jobs: int, cache,
+                     schema_key: str) -> List[Dict]:
+    """run_batch() for the configs whose content, schemas or validator changed; the rest from cache"""
+    if cache is None:
+        return run_batch(paths, index, jobs)
+    from result_cache import result_key
+    
+    engine_key = validator_key()
+    results: List[Optional[Dict]] = []
+    keys = {}
+    for path in paths:
+        try:
+            key = result_key(path.read_bytes(), schema_key, engine_key)
+        except OSError:
+            results.append(None)  # Missing or unreadable: validate_file reports it
+            continue
+        keys[str(path)] = key
+        results.append(cache.get(key, str(path)))
+    
+    misses = [path for path, result in zip(paths, results) if result is None]
+    fresh = iter(run_batch(misses, index, jobs))
+    for position, result in enumerate(results):
+        if result is None:
+            result = results[position] = next(fresh)
+            if result["path"] in keys:
+                cache.put(keys[result["path"]], result)
+    cache.save()
+    return results
+
+def print_cache_stats(stats: Dict):
+    print("Result cache")
+    print(f"{'='*70}")
+    print(f"  • Hits: {stats['hits']}, misses: {stats['misses']} ({stats['hit_rate']:.0%} hit rate)")
+    print(f"  • Entries: {stats['entries']} ({stats['bytes'] / 1024:.1f} KB of "
+          f"{stats['max_bytes'] / 1024 / 1024:.0f} MB), evicted: {stats['evictions']}")
+    print(f"{'='*70}\n")
+
+def print_batch_report(results: List[Dict], elapsed: float, jobs: int, verbose: bool = False):
+    """Print one aggregated report for a batch run"""
+    failed = [r for r in results if r["exit_status"] != 0]
+    warned = [r for r in results if r["exit_status"] == 0 and r["warnings"]]
+    
+    print(f"\n{'='*70}")
+    print("Batch Validation Results")
+    print(f"{'='*70}\n")
+    
+    for result in results:
+        if result["exit_status"] != 0:
+            status = "❌ FAIL"
+        elif result["warnings"]:
+            status = "⚠️  WARN"
+        else:
+            status = "✅ PASS"
+        print(f"{status}  {result['path']}  "
+              f"({len(result['errors'])} error(s), {len(result['warnings'])} warning(s))")
+        
+        if result["errors"] or (verbose and result["warnings"]):
+            for error in result["errors"]:
+                print(f"      {error.replace(chr(10), chr(10) + '      ')}")
+            if verbose:
+                for warning in result["warnings"]:
+                    print(f"      {warning.replace(chr(10), chr(10) + '      ')}")
+    
+    check_time = sum(r["elapsed"] for r in results)
+    rate = len(results) / elapsed if elapsed > 0 else 0.0
+    
+    print(f"\n{'='*70}")
+    print("Summary")
+    print(f"{'='*70}")
+    print(f"  • Configs validated: {len(results)}")
+    print(f"  • Passed: {len(results) - len(failed)} ({len(warned)} with warnings)")
+    print(f"  • Failed: {len(failed)}")
+    print(f"  • Workers: {jobs}")
+    print(f"  • Wall time: {elapsed:.3f}s ({rate:.1f} configs/s)")
+    print(f"  • Check time (sum across workers): {check_time:.3f}s")
+    if results:
+        slowest = max(results, key=lambda r: r["elapsed"])
+        print(f"  • Slowest: {slowest['path']} ({slowest['elapsed'] * 1000:.1f} ms)")
+    print(f"{'='*70}\n")
+
+def load_schemas(lam_schema_file: str, samba_schema_file: str, use_cache: bool = True) -> SchemaIndex:
+    """Load the compiled index for both schemas once, exiting if neither exists"""
+    index = load_schema_index(lam_schema_file, samba_schema_file,
+                              cache_dir=CACHE_DIR if use_cache else None)
+    
+    if index is None:
         print("\n❌ No schemas found. Run extraction scripts first:")
         print("   python3 scripts/extract_lam_schema.py")
         print("   python3 scripts/extract_samba_schema.py")
         sys.exit(1)
     
+    return index
+
+def apply_schema_snapshots(args: argparse.Namespace):
+    """Point --lam-schema/--samba-schema at the recorded snapshots named by --*-snapshot"""
+    from schema_history import SchemaHistory
+    history = SchemaHistory()
+    for kind, ref in (("lam", args.lam_snapshot), ("samba", args.samba_snapshot)):
+        if not ref:
+            continue
+        try:
+            record = history.resolve(ref, kind)
+            if record["kind"] != kind:
+                raise ValueError(f"it is a {record['kind']} snapshot, not {kind}")
+            path = history.materialize(record)
+        except (KeyError, ValueError, OSError) as e:
+            message = e.args[0] if isinstance(e, KeyError) and e.args else e
+            print(f"❌ Cannot use schema snapshot {ref}: {message}", file=sys.stderr)
+            sys.exit(2)
+        setattr(args, f"{kind}_schema", str(path))
+        print(f"Using {kind} schema snapshot {kind}:{record['key']} (@{record['sha256'][:12]})",
+              file=sys.stderr)
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Validates LAM configuration against extracted schemas. "
+                    "Run extract_lam_schema.py and extract_samba_schema.py first."
+    )
+    parser.add_argument("configs", nargs="+",
+                        help="Config files, glob patterns or directories (*.conf)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Aggregated batch report even for a single config")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for batch mode (default: CPU count)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Show warnings per file in batch mode")
+    parser.add_argument("--lam-schema", default=LAM_SCHEMA_FILE)
+    parser.add_argument("--samba-schema", default=SAMBA_SCHEMA_FILE)
+    parser.add_argument("--lam-snapshot", metavar="REF",
+                        help="Validate against a recorded LAM schema snapshot instead of "
+                             "--lam-schema (e.g. 9.4, latest, previous; see schema_history.py list)")
+    parser.add_argument("--samba-snapshot", metavar="REF",
+                        help="Validate against a recorded Samba schema snapshot (e.g. usn4101)")
+    parser.add_argument("--no-index-cache", action="store_true",
+                        help="Rebuild the compiled schema index instead of using the on-disk cache")
+    parser.add_argument("--format", choices=["text", "json", "jsonl"], default="text",
+                        help="Report format; json/jsonl write structured findings and timings to "
+                             "stdout (progress goes to stderr)")
+    parser.add_argument("--timings", action="store_true",
+                        help="Show per-check timings in the text report")
+    parser.add_argument("--instrument-hook", action="append", default=[], metavar="MODULE:CALLABLE",
+                        help="Call this function with every instrumentation event (repeatable)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Validate every config instead of reusing cached results for unchanged "
+                             "configs and schemas")
+    parser.add_argument("--cache-stats", action="store_true",
+                        help="Show result cache hits, misses and size in the text report")
+    parser.add_argument("--cache-max-mb", type=int, default=8,
+                        help="Result cache size limit; least recently used results are evicted "
+                             "(default: 8)")
+    parser.add_argument("--rules-dir", action="append", default=[], metavar="DIR",
+                        help="Load site rules from the *.py files in this directory (repeatable)")
+    parser.add_argument("--fix", action="store_true",
+                        help="Rewrite fixable problems (Admins format, types/modules, ldap://, "
+                             "attr_user columns, moduleSettings shapes) in place, then validate")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="With --fix: print the diffs without writing; exit 1 if any config "
+                             "would change")
+    
+    live = parser.add_argument_group("live directory checks")
+    live.add_argument("--live-ldap-url",
+                      help="Measure attr_user/attr_group fill rates and sizes on sampled entries "
+                           "(ldaps://dc:636, or ldif://dump.ldif)")
+    live.add_argument("--bind-dn", default="", help="Bind DN for --live-ldap-url")
+    live.add_argument("--password", default=os.environ.get("DOMAINPASS", ""),
+                      help="Bind password (default: $DOMAINPASS)")
+    live.add_argument("--tls-ca-file", help="CA certificate to verify the DC against")
+    live.add_argument("--live-sample", type=non_negative_int, default=500,
+                      help="Entries sampled per type (default: 500, 0 = all)")
+    live.add_argument("--stats-ttl", type=int, default=3600,
+                      help="Seconds measured stats are reused (default: 3600)")
+    live.add_argument("--no-stats-cache", action="store_true",
+                      help="Always measure instead of using cached stats (and admin DN lookups)")
+    live.add_argument("--check-admins", action="store_true",
+                      help="Resolve every Admins DN against --live-ldap-url in batched lookups")
+    live.add_argument("--admin-ttl", type=int, default=900,
+                      help="Seconds resolved admin DNs are reused (default: 900)")
+    return parser.parse_args()
+
+def print_check_timings(summary: Dict):
+    """Per-check timing table from the TimingCollector summary"""
+    print("Check timings")
+    print(f"{'='*70}")
+    for name, stats in sorted(summary["checks"].items(), key=lambda item: -item[1]["total_seconds"]):
+        print(f"  • {name}: {stats['total_seconds'] * 1000:.2f} ms total, "
+              f"{stats['mean_seconds'] * 1000:.3f} ms mean, {stats['max_seconds'] * 1000:.3f} ms max "
+              f"over {stats['calls']} config(s)")
+    print(f"{'='*70}\n")
+
+def setup_instrumentation(args: argparse.Namespace) -> TimingCollector:
+    """Register the built-in timing collector plus any --instrument-hook callables"""
+    collector = TimingCollector()
+    add_hook(collector)
+    for spec in args.instrument_hook:
+        try:
+            add_hook(load_hook(spec))
+        except (ImportError, AttributeError, ValueError) as e:
+            print(f"❌ Cannot load instrumentation hook {spec}: {e}", file=sys.stderr)
+            sys.exit(2)
+    return collector
+
+def main_fix(args: argparse.Namespace):
+    """--fix: rewrite every matched config in one pass each, before validation"""
+    from config_fix import fix_paths, print_fix_report
+    # Keep stdout machine-readable in json/jsonl mode
+    stream = sys.stderr if args.format != "text" else sys.stdout
+    
+    paths = [p for p in expand_config_paths(args.configs) if p.exists()]
+    index = load_schemas(args.lam_schema, args.samba_schema, not args.no_index_cache)
+    jobs = max(1, min(args.jobs, len(paths)))
+    records = fix_paths(paths, index, jobs, args.dry_run)
+    print_fix_report(records, args.dry_run, stream)
+    
+    # Unreadable configs are reported again by the validation that follows
+    if args.dry_run:
+        sys.exit(1 if any(r["changes"] for r in records) else 0)
+
+def main_batch(args: argparse.Namespace):
+    structured = args.format != "text"
+    # Keep stdout machine-readable in json/jsonl mode
+    log = (lambda *a: print(*a, file=sys.stderr)) if structured else print
+    
+    paths = expand_config_paths(args.configs)
+    if not paths:
+        log(f"❌ No config files matched: {' '.join(args.configs)}")
+        sys.exit(1)
+    
+    collector = setup_instrumentation(args)
+    started = time.perf_counter()
+    log("Loading schemas...")
+    with phase("load_schemas"):
+        index = load_schemas(args.lam_schema, args.samba_schema, not args.no_index_cache)
+    
+    jobs = max(1, min(args.jobs, len(paths)))
+    cache = open_result_cache(args)
+    log(f"Validating {len(paths)} config(s) with {jobs} worker(s)...")
+    with phase("validate"):
+        results = run_cached_batch(paths, index, jobs, cache,
+                                   schema_hash(args.lam_schema, args.samba_schema))
+        if args.live_ldap_url:
+            log(f"Checking attributes against {args.live_ldap_url}...")
+            apply_live_checks(results, args)
+        for result in results:
+            result["exit_status"] = 1 if result["errors"] else 0
+    
+    elapsed = time.perf_counter() - started
+    emit_result_events(results, elapsed, jobs)
+    summary = collector.summary()
+    if cache is not None:
+        summary["cache"] = cache.stats()
+    
+    with phase("report"):
+        if args.format == "json":
+            write_json(results, summary, sys.stdout)
+        elif args.format == "jsonl":
+            write_jsonl(results, summary, sys.stdout)
+        else:
+            print_batch_report(results, elapsed, jobs, args.verbose)
+            if args.timings:
+                print_check_timings(summary)
+            if args.cache_stats and cache is not None:
+                print_cache_stats(summary["cache"])
+    sys.exit(1 if any(r["exit_status"] for r in results) else 0)
+
+def main():
+    args = parse_args()
+    if args.check_admins and not args.live_ldap_url:
+        print("❌ --check-admins needs --live-ldap-url", file=sys.stderr)
+        sys.exit(2)
+    if args.dry_run and not args.fix:
+        print("❌ --dry-run needs --fix", file=sys.stderr)
+        sys.exit(2)
+    if args.lam_snapshot or args.samba_snapshot:
+        apply_schema_snapshots(args)
+    
+    if args.fix:
+        main_fix(args)
+    load_rule_dirs(args.rules_dir)
+    
+    if args.batch or args.format != "text" or len(args.configs) > 1 \
+            or glob.has_magic(args.configs[0]) or Path(args.configs[0]).is_dir():
+        main_batch(args)
+    
+    config_file = args.configs[0]
+    
+    collector = setup_instrumentation(args)
+    
+    # Load schemas
+    print("Loading schemas...")
+    with phase("load_schemas"):
+        index = load_schemas(args.lam_schema, args.samba_schema, not args.no_index_cache)
+    
     # Load config
     print(f"Loading config: {config_file}")
     config_path = Path(config_file)
@@ -196,12 +835,16 @@ def main():
         print(f"❌ Config file not found: {config_file}")
         sys.exit(1)
     
-    with open(config_path, 'r') as f:
-        try:
-            config = json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"❌ Invalid JSON in config file: {e}")
-            sys.exit(1)
+    try:
+        config_bytes = config_path.read_bytes()
+        config = json.loads(config_bytes)
+    except json.JSONDecodeError as e:
+        print(f"❌ Invalid JSON in config file: {e}")
+        sys.exit(1)
+    except (OSError, UnicodeDecodeError) as e:
+        # Same file.read finding as validate_file() in batch mode
+        print(f"❌ Cannot read config file: {e}")
+        sys.exit(1)
     
     print(f"\n{'='*70}")
     print(f"Validating LAM Configuration")
@@ -210,28 +853,54 @@ def main():
     # Run validations
     all_errors = []
     all_warnings = []
-    
-    if lam_schema:
-        print("Checking login configuration...")
-        errors, warnings = validate_login_config(config, lam_schema)
-        all_errors.extend(errors)
-        all_warnings.extend(warnings)
-    
-    print("Checking config structure...")
-    errors, warnings = validate_structure(config)
-    all_errors.extend(errors)
-    all_warnings.extend(warnings)
-    
-    if samba_schema:
-        print("Checking attributes against Samba schema...")
-        errors, warnings = validate_attributes(config, samba_schema)
-        all_errors.extend(errors)
-        all_warnings.extend(warnings)
-    
-    print("Checking module settings...")
-    errors, warnings = validate_module_settings(config)
-    all_errors.extend(errors)
-    all_warnings.extend(warnings)
+    result = {"path": config_file, "errors": all_errors, "warnings": all_warnings, "exit_status": 0,
+              "elapsed": 0.0, "size_bytes": config_path.stat().st_size, "timings": {}}
+    timings = result["timings"]
+    started = time.perf_counter()
+    
+    results_cache = open_result_cache(args)
+    key = None
+    if results_cache is not None:
+        from result_cache import result_key
+        key = result_key(config_bytes, schema_hash(args.lam_schema, args.samba_schema), validator_key())
+    
+    with phase("validate"):
+        cached = results_cache.get(key, config_file) if results_cache is not None else None
+        if cached:
+            print("Using cached results (config, schemas and validator unchanged)...")
+            all_errors.extend(cached["errors"])
+            all_warnings.extend(cached["warnings"])
+            result["cached"] = True
+        else:
+            errors, warnings = validate_config(config, index, timings,
+                                               progress=lambda rule: print(rule.label))
+            all_errors.extend(errors)
+            all_warnings.extend(warnings)
+    
+            if results_cache is not None:
+                results_cache.put(key, {"errors": all_errors, "warnings": all_warnings,
+                                        "exit_status": 1 if all_errors else 0,
+                                        "size_bytes": result["size_bytes"]})
+                results_cache.save()
+    
+        if args.live_ldap_url:
+            print(f"Checking attributes against {args.live_ldap_url}...")
+            session, cache = open_live_session(args)
+            errors, warnings = run_check(timings, "live_attributes", validate_live_attributes,
+                                         config, session, cache, args.live_sample)
+            all_errors.extend(errors)
+            all_warnings.extend(warnings)
+            
+            if args.check_admins:
+                print("Resolving Admins DNs...")
+                errors, warnings = run_check(timings, "admin_dns", validate_admin_dns,
+                                             config, open_admin_resolver(args, session))
+                all_errors.extend(errors)
+                all_warnings.extend(warnings)
+    
+    result["elapsed"] = time.perf_counter() - started
+    result["exit_status"] = 1 if all_errors else 0
+    emit_result_events([result], result["elapsed"], 1)
     
     # Report results
     print(f"\n{'='*70}")
@@ -254,6 +923,11 @@ def main():
     
     print(f"{'='*70}\n")
     
+    if args.timings:
+        print_check_timings(collector.summary())
+    if args.cache_stats and results_cache is not None:
+        print_cache_stats(results_cache.stats())
+    
     # Exit with error code if validation failed
     sys.exit(1 if all_errors else 0)
 
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Structured validation results and the instrumentation hook for timings/counters
+Findings stay plain strings for the text report but carry fields for JSON output
+"""
+
+import contextlib
+import importlib
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+SEVERITY_ERROR = "error"
+SEVERITY_WARNING = "warning"
+
+_ICONS = ("❌", "⚠️", "✅", "✓")
+
+class Finding(str):
+    """One validation message; str() is the human-readable text shown in reports"""
+
+    def __new__(cls, message: str, check: str, severity: str, pointer: str = "", fix: str = ""):
+        finding = super().__new__(cls, message)
+        finding.check = check
+        finding.severity = severity
+        finding.pointer = pointer
+        finding.fix = fix
+        return finding
+
+    def __reduce__(self):
+        # Keep the fields when results cross process boundaries (batch workers)
+        return (Finding, (str(self), self.check, self.severity, self.pointer, self.fix))
+
+    def to_dict(self, path: Optional[str] = None) -> Dict[str, Any]:
+        summary, *details = str(self).split('\n')
+        for icon in _ICONS:
+            if summary.startswith(icon):
+                summary = summary[len(icon):].strip()
+                break
+        record = {
+            "check": self.check,
+            "severity": self.severity,
+            "pointer": self.pointer,
+            "message": summary,
+            "details": [line.strip() for line in details if line.strip()],
+            "fix": self.fix,
+        }
+        if path is not None:
+            record = {"path": path, **record}
+        return record
+
+def error(check: str, pointer: str, message: str, fix: str = "") -> Finding:
+    return Finding(message, check, SEVERITY_ERROR, pointer, fix)
+
+def warning(check: str, pointer: str, message: str, fix: str = "") -> Finding:
+    return Finding(message, check, SEVERITY_WARNING, pointer, fix)
+
+def json_pointer(*parts: Any) -> str:
+    """RFC 6901 pointer into the config, e.g. ('typeSettings', 'attr_user')"""
+    return ''.join('/' + str(p).replace('~', '~0').replace('/', '~1') for p in parts)
+
+def finding_dict(message: str, path: Optional[str] = None) -> Dict[str, Any]:
+    """to_dict() for a Finding; plain strings (from older callers) get minimal fields"""
+    if not isinstance(message, Finding):
+        severity = SEVERITY_ERROR if message.startswith("❌") else SEVERITY_WARNING
+        message = Finding(message, "unknown", severity)
+    return message.to_dict(path)
+
+# -- Instrumentation -------------------------------------------------------
+
+Hook = Callable[[Dict[str, Any]], None]
+_hooks: List[Hook] = []
+
+def add_hook(hook: Hook):
+    """Register a callable receiving every instrumentation event (a dict with an "event" key)
+
+    Events: "check" (one check on one file: check, path, seconds, errors,
+    warnings), "file" (path, seconds, size_bytes, status, cached, errors, warnings),
+    "phase" (phase, seconds: load_schemas, validate, report) and "run"
+    (files, seconds, jobs).
+    """
+    _hooks.append(hook)
+
+def remove_hook(hook: Hook):
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+def emit(event: Dict[str, Any]):
+    for hook in _hooks:
+        hook(event)
+
+@contextlib.contextmanager
+def phase(name: str):
+    """Time one stage of a run and emit it as a "phase" event"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        emit({"event": "phase", "phase": name, "seconds": time.perf_counter() - started})
+
+def load_hook(spec: str) -> Hook:
+    """Import a hook given as 'module:callable' (the module must be importable)"""
+    module_name, _, attribute = spec.partition(':')
+    if not module_name or not attribute:
+        raise ValueError(f"Hook must be 'module:callable', got {spec!r}")
+    hook = getattr(importlib.import_module(module_name), attribute)
+    if not callable(hook):
+        raise ValueError(f"{spec} is not callable")
+    return hook
+
+class TimingCollector:
+    """Built-in hook: per-check call counts, total/max time and finding counters"""
+
+    def __init__(self):
+        self.checks: Dict[str, Dict[str, float]] = {}
+        self.files = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def __call__(self, event: Dict[str, Any]):
+        if event["event"] == "check":
+            stats = self.checks.setdefault(event["check"], {
+                "calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "errors": 0, "warnings": 0
+            })
+            stats["calls"] += 1
+            stats["total_seconds"] += event["seconds"]
+            stats["max_seconds"] = max(stats["max_seconds"], event["seconds"])
+            stats["errors"] += event["errors"]
+            stats["warnings"] += event["warnings"]
+        elif event["event"] == "file":
+            self.files += 1
+            self.bytes += event.get("size_bytes", 0)
+        elif event["event"] == "run":
+            self.seconds = event["seconds"]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "config_bytes": self.bytes,
+            "wall_seconds": self.seconds,
+            "checks": {
+                name: dict(stats, mean_seconds=stats["total_seconds"] / stats["calls"])
+                for name, stats in sorted(self.checks.items())
+            },
+        }
+
+def emit_result_events(results: List[Dict], elapsed: float, jobs: int):
+    """Replay per-file results (which may come from pool workers) as hook events"""
+    for result in results:
+        for check, timing in result.get("timings", {}).items():
+            emit({"event": "check", "check": check, "path": result["path"], **timing})
+        emit({
+            "event": "file",
+            "path": result["path"],
+            "seconds": result["elapsed"],
+            "size_bytes": result.get("size_bytes", 0),
+            "status": result_status(result),
+            "cached": result.get("cached", False),
+            "errors": len(result["errors"]),
+            "warnings": len(result["warnings"]),
+        })
+    emit({"event": "run", "files": len(results), "seconds": elapsed, "jobs": jobs})
+
+def result_status(result: Dict) -> str:
+    if result["exit_status"] != 0:
+        return "FAIL"
+    return "WARN" if result["warnings"] else "PASS"
+
+def file_record(result: Dict) -> Dict[str, Any]:
+    """Machine-readable form of one validate_file() result"""
+    return {
+        "path": result["path"],
+        "status": result_status(result),
+        "exit_status": result["exit_status"],
+        "elapsed": result["elapsed"],
+        "size_bytes": result.get("size_bytes", 0),
+        "timings": result.get("timings", {}),
+        "cached": result.get("cached", False),
+        "findings": [finding_dict(m) for m in result["errors"] + result["warnings"]],
+    }
+
+def write_json(results: List[Dict], summary: Dict[str, Any], stream):
+    json.dump({"files": [file_record(r) for r in results], "summary": summary}, stream, indent=2)
+    stream.write("\n")
+
+def write_jsonl(results: List[Dict], summary: Dict[str, Any], stream):
+    """One line per finding, one per file and a final summary line, for log shippers"""
+    for result in results:
+        record = file_record(result)
+        for finding in record.pop("findings"):
+            stream.write(json.dumps({"type": "finding", "path": result["path"], **finding}) + "\n")
+        stream.write(json.dumps({"type": "file", **record}) + "\n")
+    stream.write(json.dumps({"type": "summary", **summary}) + "\n")
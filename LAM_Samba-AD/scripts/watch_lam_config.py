@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Watch the LAM config directory and re-validate profiles as they change
+Keeps the compiled schema index in memory so each re-validation takes milliseconds
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import json
+import os
+import select
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from schema_index import CACHE_DIR, SchemaIndex, load_schema_index
+from validate_lam_config import (LAM_SCHEMA_FILE, SAMBA_SCHEMA_FILE, load_rule_dirs, load_schemas,
+                                 validate_file)
+from validation_results import error, result_status
+
+LAM_CONFIG_DIR = "/var/www/html/lam/config"
+
+# inotify(7) event bits: file written and closed, moved in/out, created, deleted
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct('iIII')
+
+class InotifyWatcher:
+    """Kernel change notifications for one directory (Linux only)"""
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> Set[str]:
+        """Block up to timeout seconds; return the names of files that changed"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        names = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            _, _, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback for non-Linux hosts and filesystems without inotify (e.g. some bind mounts)"""
+
+    def __init__(self, directory: Path, interval: float):
+        self.directory = directory
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        snapshot = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return snapshot
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # Removed between listing and stat
+            snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout: float) -> Set[str]:
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        changed = {name for name in current.keys() | self.snapshot.keys()
+                   if current.get(name) != self.snapshot.get(name)}
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+def open_watcher(directory: Path, poll_interval: float, force_polling: bool = False):
+    if not force_polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({e}), polling every {poll_interval}s", file=sys.stderr)
+    return PollingWatcher(directory, poll_interval)
+
+class ValidationState:
+    """Latest result per profile, shared between the watch loop and socket clients"""
+
+    def __init__(self, status_file: Optional[str] = None):
+        self.lock = threading.Lock()
+        self.results: Dict[str, Dict] = {}
+        self.status_file = Path(status_file) if status_file else None
+
+    def update(self, name: str, result: Optional[Dict]):
+        with self.lock:
+            if result is None:
+                self.results.pop(name, None)
+            else:
+                self.results[name] = result
+
+    def snapshot(self, name: Optional[str] = None) -> Dict:
+        with self.lock:
+            files = {k: v for k, v in self.results.items() if name in (None, k)}
+        return {
+            "updated": time.time(),
+            "ok": all(r["exit_status"] == 0 for r in files.values()),
+            "files": files
+        }
+
+    def write_status_file(self):
+        if not self.status_file:
+            return
+        tmp_file = self.status_file.with_name(self.status_file.name + '.tmp')
+        try:
+            self.status_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'w') as f:
+                json.dump(self.snapshot(), f, indent=2)
+            tmp_file.replace(self.status_file)  # Readers never see a partial file
+        except OSError as e:
+            print(f"⚠️  Could not write status file {self.status_file}: {e}", file=sys.stderr)
+
+class _StatusHandler(socketserver.StreamRequestHandler):
+    """One request per connection: an optional profile name line, answered with JSON"""
+
+    def handle(self):
+        name = self.rfile.readline(4096).decode('utf-8', errors='replace').strip() or None
+        reply = json.dumps(self.server.state.snapshot(name)) + "\n"
+        self.wfile.write(reply.encode('utf-8'))
+
+class _StatusServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def start_socket_server(path: str, state: ValidationState) -> _StatusServer:
+    socket_path = Path(path)
+    if socket_path.exists():
+        socket_path.unlink()  # Left over from a previous run
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    server = _StatusServer(str(socket_path), _StatusHandler)
+    os.chmod(socket_path, 0o660)
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def query_socket(path: str, name: Optional[str] = None, timeout: float = 5.0) -> Dict:
+    """Ask a running watcher for its current results"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(((name or "") + "\n").encode('utf-8'))
+        with client.makefile('rb') as reply:
+            return json.loads(reply.readline())
+
+def print_result(name: str, result: Dict):
+    status = result_status(result)
+    icon = {"PASS": "✓", "WARN": "⚠️ ", "FAIL": "❌"}[status]
+    print(f"{icon} {name} {status} ({len(result['errors'])} error(s), "
+          f"{len(result['warnings'])} warning(s), {result['elapsed'] * 1000:.1f} ms)", flush=True)
+    for message in result["errors"]:
+        print(f"      {message.replace(chr(10), chr(10) + '      ')}", flush=True)
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Watch the LAM config directory and re-validate changed profiles"
+    )
+    parser.add_argument("config_dir", nargs="?", default=LAM_CONFIG_DIR,
+                        help=f"Directory to watch (default: {LAM_CONFIG_DIR})")
+    parser.add_argument("--pattern", default="*.conf",
+                        help="Profile file name pattern (default: *.conf)")
+    parser.add_argument("--socket", help="Serve results on this Unix socket")
+    parser.add_argument("--status-file", help="Keep a JSON status file of the latest results")
+    parser.add_argument("--poll", action="store_true",
+                        help="Poll instead of using inotify")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="Seconds between polls in polling mode (default: 1.0)")
+    parser.add_argument("--debounce", type=float, default=0.05,
+                        help="Seconds to wait for further events after a change (default: 0.05)")
+    parser.add_argument("--query", nargs="?", const="", metavar="PROFILE",
+                        help="Print results from a running watcher (--socket) and exit "
+                             "non-zero if any profile fails")
+    parser.add_argument("--lam-schema", default=LAM_SCHEMA_FILE,
+                        help=f"LAM schema file (default: {LAM_SCHEMA_FILE})")
+    parser.add_argument("--samba-schema", default=SAMBA_SCHEMA_FILE,
+                        help=f"Samba schema file (default: {SAMBA_SCHEMA_FILE})")
+    parser.add_argument("--no-index-cache", action="store_true",
+                        help="Rebuild the compiled schema index instead of using the on-disk cache")
+    parser.add_argument("--rules-dir", action="append", default=[], metavar="DIR",
+                        help="Load site rules from the *.py files in this directory (repeatable)")
+    return parser.parse_args()
+
+def main_query(args: argparse.Namespace):
+    if not args.socket:
+        print("❌ --query requires --socket", file=sys.stderr)
+        sys.exit(2)
+    try:
+        status = query_socket(args.socket, args.query or None)
+    except OSError as e:
+        print(f"❌ No watcher listening on {args.socket}: {e}", file=sys.stderr)
+        sys.exit(2)
+    for name, result in sorted(status["files"].items()):
+        print_result(name, result)
+    if not status["files"]:
+        print("⚠️  No matching profiles have been validated")
+    sys.exit(0 if status["ok"] else 1)
+
+def _schema_stamp(*schema_files: str) -> tuple:
+    return tuple(os.stat(f).st_mtime_ns if os.path.exists(f) else None for f in schema_files)
+
+def file_error_result(path: Path, e: Exception) -> Dict:
+    """Result record for a profile that could not be read (removed mid-save, not UTF-8)"""
+    return {
+        "path": str(path),
+        "errors": [error("file.read", "", f"❌ Cannot read config file: {e}")],
+        "warnings": [],
+        "exit_status": 1,
+        "elapsed": 0.0,
+        "size_bytes": 0,
+        "timings": {}
+    }
+
+def reload_index(args: argparse.Namespace, previous: SchemaIndex, previous_stamp: tuple,
+                 stamp: tuple) -> SchemaIndex:
+    """Rebuild the index after a schema change, keeping the previous one if that fails
+
+    A schema that disappeared or does not parse (an extractor mid-write) must not
+    leave the watcher validating against a partial index or exit the daemon.
+    """
+    vanished = [f for f, before, now in zip((args.lam_schema, args.samba_schema), previous_stamp, stamp)
+                if before is not None and now is None]
+    if vanished:
+        print(f"⚠️  Schema file missing: {', '.join(vanished)}; keeping the previous index",
+              file=sys.stderr, flush=True)
+        return previous
+    try:
+        index = load_schema_index(args.lam_schema, args.samba_schema,
+                                  cache_dir=None if args.no_index_cache else CACHE_DIR)
+    except (OSError, ValueError) as e:  # ValueError covers JSONDecodeError and BinarySchemaError
+        print(f"⚠️  Could not reload schemas ({e}); keeping the previous index",
+              file=sys.stderr, flush=True)
+        return previous
+    if index is None:
+        print("⚠️  No schemas found; keeping the previous index", file=sys.stderr, flush=True)
+        return previous
+    return index
+
+def main():
+    args = parse_args()
+    if args.query is not None:
+        main_query(args)
+
+    config_dir = Path(args.config_dir)
+    if not config_dir.is_dir():
+        print(f"❌ Config directory not found: {config_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    load_rule_dirs(args.rules_dir)
+    index = load_schemas(args.lam_schema, args.samba_schema, not args.no_index_cache)
+    stamp = _schema_stamp(args.lam_schema, args.samba_schema)
+    state = ValidationState(args.status_file)
+
+    def revalidate(names):
+        for name in sorted(names):
+            if not fnmatch.fnmatch(name, args.pattern):
+                continue
+            path = config_dir / name
+            if not path.is_file():
+                state.update(name, None)
+                print(f"• {name} removed", flush=True)
+                continue
+            try:
+                result = validate_file(path, index)
+            except (OSError, UnicodeDecodeError) as e:
+                result = file_error_result(path, e)
+            result["checked_at"] = time.time()
+            state.update(name, result)
+            print_result(name, result)
+        state.write_status_file()
+
+    print(f"Validating profiles in {config_dir}...")
+    revalidate(entry.name for entry in os.scandir(config_dir))
+
+    server = start_socket_server(args.socket, state) if args.socket else None
+    watcher = open_watcher(config_dir, args.poll_interval, args.poll)
+    mode = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"\nWatching {config_dir} ({mode}); press Ctrl+C to stop", flush=True)
+
+    # systemd/docker stop sends SIGTERM; exit through the same cleanup as Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            changed = watcher.wait(1.0)
+            if changed:
+                # Editors save in several steps (truncate, write, rename); settle first
+                deadline = time.monotonic() + args.debounce
+                while time.monotonic() < deadline:
+                    changed |= watcher.wait(max(0.0, deadline - time.monotonic()))
+                revalidate(changed)
+
+            current = _schema_stamp(args.lam_schema, args.samba_schema)
+            if current != stamp:
+                print("Schemas changed, reloading index and re-validating all profiles...", flush=True)
+                index = reload_index(args, index, stamp, current)
+                stamp = current  # A failed reload is retried when the schema changes again
+                revalidate(entry.name for entry in os.scandir(config_dir))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        if server:
+            server.shutdown()
+            server.server_close()
+            Path(args.socket).unlink(missing_ok=True)
+        print("\n✓ Watcher stopped")
+
+if __name__ == "__main__":
+    main()